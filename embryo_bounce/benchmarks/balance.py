@@ -0,0 +1,55 @@
+"""
+Plays seeded headless games with a scripted paddle policy instead of hand
+detection, and reports score, rally length and speed at death, so gameplay
+settings can be tuned without a webcam. Doesn't use pygame.
+
+Run from the embryo_bounce directory:
+
+    python -m benchmarks.balance [--games 2000] [--policy intercept] [--speed-increment 2]
+
+Settings default to the ones in utils/constants.py.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+#constants.CWD is taken from sys.argv[0], so point it at the embryo_bounce
+#folder like the game
+sys.argv[0] = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+from game.simulation.batch import POLICIES, get_report, run_games
+from game.simulation.simulation import SimulationSettings
+from utils import constants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=2000, help="number of games")
+    parser.add_argument("--policy", choices=POLICIES, default="intercept",
+                        help="paddle policy")
+    parser.add_argument("--seed", type=int, default=0, help="seed of first game")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes, one per CPU by default")
+    parser.add_argument("--max-steps", type=int, default=constants.SIMULATION_MAX_STEPS,
+                        help="games are stopped after this many simulation steps")
+    parser.add_argument("--speed-increment", type=float, default=constants.SPEED_INCREMENT,
+                        help="ball speed increase in pixels/step")
+    parser.add_argument("--frames-no-speed", type=int, default=constants.FRAMES_NO_SPEED,
+                        help="simulation steps between ball speed increases")
+    parser.add_argument("--angle-range", type=float, default=constants.PADDLE_ANGLE_RANGE,
+                        help="range in radians of angles ball bounces off paddle at")
+    args = parser.parse_args()
+    settings = SimulationSettings(speed_increment=args.speed_increment,
+                                  frames_no_speed=args.frames_no_speed,
+                                  angle_range=args.angle_range)
+    start = time.perf_counter()
+    results = run_games(args.games, args.policy, settings, args.seed, args.workers, args.max_steps)
+    duration = time.perf_counter() - start
+    print(get_report(results, args.max_steps))
+    print(f"games/minute: {len(results)/duration*60:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark of the hand detection pipeline on a webcam recording.
+
+Record a session by setting CAMERA_RECORD_PATH in utils/constants.py and
+playing the game, then run from the embryo_bounce directory:
+
+    python -m benchmarks.detection_benchmark recording.frames [--realtime]
+
+Without --realtime, every frame is detected as fast as possible, which
+measures detection throughput. With --realtime, frames are streamed at the
+recorded cadence, which measures dropped frames and latency as in a game.
+"""
+
+import argparse
+import time
+
+from utils.camera import RecordedCam
+from utils.hand_detection import HandDetector
+from utils.latency_tracer import LatencyTracer
+
+#time in seconds to wait for last results after recording ends
+RESULT_WAIT_S = 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", help="recording made with HandCam(record_path=...)")
+    parser.add_argument("--realtime", action="store_true",
+                        help="stream frames at recorded cadence")
+    args = parser.parse_args()
+    hand_detector = HandDetector()
+    hand_detector.tracer = LatencyTracer()
+    start_time = time.perf_counter()
+    hand_detector.set_landmarker()
+    print(f"landmarker loaded in {time.perf_counter() - start_time:.2f} s")
+    hand_cam = RecordedCam(hand_detector, args.recording, is_realtime=args.realtime)
+    start_time = time.perf_counter()
+    hand_cam.start()
+    hand_cam.join()
+    hand_detector.wait_for_slot(RESULT_WAIT_S)
+    duration = time.perf_counter() - start_time
+    detections = hand_detector.tracer.histograms["detection"].count
+    num_frames = len(hand_cam.recording)
+    print(f"frames: {num_frames}, detected: {detections}, dropped: {hand_cam.dropped_frames}")
+    print(f"duration: {duration:.2f} s, detections/s: {detections/duration:.1f}")
+    print(hand_detector.tracer.get_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark of Gameplay.manage_events driven by a hand landmark recording, so
+it runs without MediaPipe or a webcam.
+
+Record landmarks by setting LANDMARK_RECORD_PATH in utils/constants.py and
+playing the game, then run from the embryo_bounce directory:
+
+    python -m benchmarks.gameplay_benchmark landmarks.npz [--seconds 10] [--renderer] [--balls N] [--games N]
+
+Frame rate is uncapped, and one simulation step is run and the recording
+advances one result per frame, so runs are deterministic. With --games, games
+are played one after another like Play Again does, each for up to --seconds.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+start_time = time.perf_counter()
+#constants.CWD is taken from sys.argv[0], so point it at the embryo_bounce
+#folder so that assets are found when run with python -m
+sys.argv[0] = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+#run without a window or sound device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
+from game.assets.border import Borders
+from game.assets.paddle import Paddle
+from game.managers import DisplayManager, RendererDisplayManager, PositionManager, CollisionManager, HighScoreManager, SoundManager
+from game.managers.mode_managers import Gameplay, MultiBallGameplay
+from game.mode import Mode
+from utils.landmark_recording import ReplayHandDetector, ReplayCam
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording", help="npz recording made with LANDMARK_RECORD_PATH")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of benchmark")
+    parser.add_argument("--renderer", action="store_true",
+                        help="draw with SDL2 renderer instead of surface blits")
+    parser.add_argument("--balls", type=int, default=0,
+                        help="play multi-ball mode starting with this many balls")
+    parser.add_argument("--games", type=int, default=1, help="number of games played in a row")
+    args = parser.parse_args()
+    pygame.init()
+    hand_detector = ReplayHandDetector(args.recording, is_realtime=False)
+    hand_cam = ReplayCam(hand_detector)
+    paddle = Paddle()
+    ball = None if args.balls else Ball()
+    ball_store = BallStore(args.balls) if args.balls else None
+    borders = Borders()
+    sound_manager = SoundManager(Mode.GAMEPLAY)
+    display_manager_class = RendererDisplayManager if args.renderer else DisplayManager
+    display_manager = display_manager_class(hand_detector, hand_cam, paddle, ball, borders, ball_store)
+    collision_manager = CollisionManager(ball, paddle, borders, sound_manager, ball_store)
+    position_manager = PositionManager(hand_detector, paddle, ball, borders, collision_manager,
+                                       ball_store=ball_store)
+    managers = dict(paddle=paddle,
+                    borders=borders,
+                    position_manager=position_manager,
+                    display_manager=display_manager,
+                    sound_manager=sound_manager,
+                    collision_manager=collision_manager,
+                    high_score_manager=HighScoreManager())
+    hand_detector.set_landmarker()
+    startup_s = time.perf_counter() - start_time
+    print(f"startup: {startup_s*1000:.0f} ms")
+    for game_num in range(args.games):
+        if args.balls:
+            gameplay = MultiBallGameplay(ball_store=ball_store, **managers)
+            #balls start together and aren't replaced until all are out
+            gameplay.simulation.init_ball_count = args.balls
+        else:
+            #every game starts with a new ball, like in Game.main
+            gameplay = Gameplay(ball=ball if game_num == 0 else Ball(), **managers)
+        #0 doesn't limit frame rate
+        gameplay.framerate = 0
+        gameplay.is_realtime = False
+        _play(gameplay, args.seconds)
+    pygame.quit()
+
+
+def _play(gameplay: Gameplay, seconds: float):
+    """
+    plays gameplay until it's over or seconds have passed, and prints its
+    results
+    """
+    #escape ends gameplay after given duration
+    escape = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE)
+    pygame.time.set_timer(escape, int(seconds*1000), loops=1)
+    gameplay_start = time.perf_counter()
+    gameplay.manage_events()
+    duration = time.perf_counter() - gameplay_start
+    #game may end before escape is sent, so it mustn't end the next one
+    pygame.time.set_timer(escape, 0)
+    pygame.event.clear(pygame.KEYDOWN)
+    print(f"frames: {gameplay.frame_num}, steps: {gameplay.step_num}, "
+          f"score: {gameplay.score}, lives: {gameplay.lives}")
+    print(f"frames/s: {gameplay.frame_num/duration:.0f}, "
+          f"mean frame time: {duration/max(gameplay.frame_num, 1)*1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
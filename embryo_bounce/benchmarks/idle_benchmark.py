@@ -0,0 +1,96 @@
+"""
+Benchmark of CPU usage of idle screens (main menu, high scores, high score
+entry and play again). Each screen is left without input for a while and the
+CPU time used by the game loop is compared to IDLE_CPU_TARGET in
+utils/constants.py. Run from the embryo_bounce directory:
+
+    python -m benchmarks.idle_benchmark [--seconds 5]
+
+Hand detection is replaced by a blank landmark replay, so only the game loop
+is measured. Exits with status 1 if any screen is over target.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+#constants.CWD is taken from sys.argv[0], so point it at the embryo_bounce
+#folder so that assets are found when run with python -m
+sys.argv[0] = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+#run without a window or sound device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from game.assets.ball import Ball
+from game.assets.border import Borders
+from game.assets.paddle import Paddle
+from game.managers import DisplayManager, HighScoreManager
+from game.managers.mode_managers import HighScores, MainMenu, HighScoreEntry, PlayAgain
+from utils import constants
+from utils.landmark_recording import ReplayHandDetector, ReplayCam
+
+
+def post_keys(keys: list[tuple[int, str]], delay_s: float):
+    """
+    posts KEYDOWN events for (key, unicode) pairs after delay_s, from a
+    separate thread like real input would arrive
+    """
+    def post():
+        for key, unicode in keys:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode))
+    threading.Timer(delay_s, post).start()
+
+
+def measure(mode_manager, keys: list[tuple[int, str]], seconds: float) -> float:
+    """
+    runs mode_manager until keys end it after seconds, and returns fraction
+    of one CPU core used
+    """
+    post_keys(keys, seconds)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    mode_manager.manage_events()
+    return (time.process_time() - cpu_start)/(time.perf_counter() - wall_start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=5, help="duration of each screen")
+    args = parser.parse_args()
+    #high score entry writes a score, so don't touch the real file
+    constants.HS_CFG_PATH = os.path.join(tempfile.mkdtemp(), "highscores.cfg")
+    recording = os.path.join(tempfile.mkdtemp(), "blank.npz")
+    np.savez(recording,
+             landmarks=np.full((1, 21, 3), np.nan, np.float32),
+             timestamps_s=np.zeros(1))
+    pygame.init()
+    hand_detector = ReplayHandDetector(recording)
+    hand_cam = ReplayCam(hand_detector)
+    display_manager = DisplayManager(hand_detector, hand_cam, Paddle(), Ball(), Borders())
+    high_score_manager = HighScoreManager()
+    hand_detector.set_landmarker()
+    screens = [("main menu", MainMenu(display_manager), [(pygame.K_RETURN, "\r")]),
+               ("high scores", HighScores(display_manager, high_score_manager),
+                [(pygame.K_ESCAPE, "\x1b")]),
+               ("high score entry", HighScoreEntry(display_manager, high_score_manager, 1),
+                [(pygame.K_RETURN, "\r")]),
+               ("play again", PlayAgain(display_manager),
+                [(pygame.K_n, "n"), (pygame.K_RETURN, "\r")])]
+    is_over_target = False
+    for name, mode_manager, keys in screens:
+        cpu = measure(mode_manager, keys, args.seconds)
+        is_over_target |= cpu > constants.IDLE_CPU_TARGET
+        print(f"{name:<18}cpu: {cpu*100:5.1f}% of one core "
+              f"(target {constants.IDLE_CPU_TARGET*100:.0f}%)")
+    pygame.quit()
+    sys.exit(1 if is_over_target else 0)
+
+
+if __name__ == "__main__":
+    main()
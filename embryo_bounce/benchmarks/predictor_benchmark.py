@@ -0,0 +1,137 @@
+"""
+Benchmark of paddle predictors in utils.paddle_predictor.
+
+Replays a hand trace through a simulated detection pipeline with latency and
+measurement jitter, and reports how far behind the hand each predictor's
+output is. Effective latency is the delay that best aligns predictor output
+with the true hand position.
+
+Run from the embryo_bounce directory:
+
+    python -m benchmarks.predictor_benchmark [trace.npz]
+
+trace.npz must contain "timestamps_s" and either "y" (normalized hand y
+coordinate) or "landmarks" arrays, like recordings made with
+LANDMARK_RECORD_PATH. If no trace is given, a synthetic trace is used.
+"""
+
+import argparse
+
+import numpy as np
+
+from utils import constants
+from utils.paddle_predictor import PREDICTORS
+
+#rate that ground truth is sampled at to measure effective latency
+TRUTH_HZ = 1000
+#lags tested when measuring effective latency
+MAX_LAG_S = 0.3
+
+
+def load_trace(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    returns (timestamps_s, y) arrays of trace at path. Landmark recordings
+    made with LANDMARK_RECORD_PATH use landmark 9 y, without lost frames.
+    """
+    with np.load(path) as trace:
+        timestamps = np.asarray(trace["timestamps_s"], dtype=np.float64)
+        if "landmarks" in trace:
+            y = np.asarray(trace["landmarks"][:, 9, 1], dtype=np.float64)
+        else:
+            y = np.asarray(trace["y"], dtype=np.float64)
+    is_tracked = ~np.isnan(y)
+    timestamps = timestamps[is_tracked]
+    return timestamps - timestamps[0], y[is_tracked]
+
+
+def make_synthetic_trace(duration_s: float, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    returns (timestamps_s, y) of hand moving up and down with a mix of slow
+    sweeps and fast flicks, like tracking a ball.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0, duration_s, 1/TRUTH_HZ)
+    y = 0.5 + 0.2*np.sin(2*np.pi*0.4*timestamps)
+    #fast movements to new targets, smoothed so they take ~150 ms
+    targets = rng.uniform(-0.15, 0.15, int(duration_s))
+    steps = np.repeat(targets, TRUTH_HZ)[:timestamps.size]
+    kernel = np.hanning(int(0.15*TRUTH_HZ))
+    y += np.convolve(steps, kernel/kernel.sum(), mode="same")
+    return timestamps, y
+
+
+def simulate(predictor,
+             timestamps: np.ndarray,
+             y: np.ndarray,
+             detection_hz: float,
+             latency_s: float,
+             jitter: float,
+             seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    returns (render_times, outputs) of predictor when frames are captured at
+    detection_hz, results arrive latency_s after capture with gaussian jitter
+    and the paddle is rendered at constants.FRAMERATE.
+    """
+    rng = np.random.default_rng(seed)
+    capture_times = np.arange(0, timestamps[-1], 1/detection_hz)
+    measurements = np.interp(capture_times, timestamps, y)
+    measurements += rng.normal(0, jitter, measurements.size)
+    arrival_times = capture_times + latency_s
+    render_times = np.arange(latency_s, timestamps[-1], 1/constants.FRAMERATE)
+    outputs = np.empty(render_times.size)
+    next_result = 0
+    for index, render_time in enumerate(render_times):
+        while next_result < arrival_times.size and arrival_times[next_result] <= render_time:
+            predictor.update(measurements[next_result], capture_times[next_result])
+            next_result += 1
+        #frame is displayed one render frame after paddle is updated
+        display_time = render_time + constants.PREDICTOR_RENDER_LEAD_S
+        prediction = predictor.predict(display_time)
+        outputs[index] = np.nan if prediction is None else prediction
+    return render_times + constants.PREDICTOR_RENDER_LEAD_S, outputs
+
+
+def measure(timestamps, y, display_times, outputs) -> tuple[float, float]:
+    """
+    returns (rmse, effective_latency_s) of outputs compared to true trace
+    """
+    valid = ~np.isnan(outputs)
+    display_times = display_times[valid]
+    outputs = outputs[valid]
+    truth = np.interp(display_times, timestamps, y)
+    rmse = float(np.sqrt(np.mean((outputs - truth)**2)))
+    lags = np.arange(0, MAX_LAG_S, 1/TRUTH_HZ)
+    errors = [np.mean((outputs - np.interp(display_times - lag, timestamps, y))**2)
+              for lag in lags]
+    return rmse, float(lags[int(np.argmin(errors))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("trace", nargs="?", help="npz hand trace")
+    parser.add_argument("--detection-hz", type=float, default=30)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter", type=float, default=0.005,
+                        help="std of measurement noise in normalized coords")
+    parser.add_argument("--duration", type=float, default=60,
+                        help="duration of synthetic trace in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.trace:
+        timestamps, y = load_trace(args.trace)
+    else:
+        timestamps, y = make_synthetic_trace(args.duration, args.seed)
+    print(f"trace: {timestamps[-1]:.1f} s, detection: {args.detection_hz:g} Hz, "
+          f"pipeline latency: {args.latency_ms:g} ms, jitter: {args.jitter:g}")
+    print(f"{'predictor':<12}{'rmse (px)':>12}{'effective latency (ms)':>26}")
+    for name, predictor_class in PREDICTORS.items():
+        display_times, outputs = simulate(predictor_class(), timestamps, y,
+                                          args.detection_hz, args.latency_ms/1000,
+                                          args.jitter, args.seed)
+        rmse, lag = measure(timestamps, y, display_times, outputs)
+        rmse_px = rmse*constants.GAME_Y_SIZE*constants.HAND_POSITION_SCALING
+        print(f"{name:<12}{rmse_px:>12.1f}{lag*1000:>26.0f}")
+
+
+if __name__ == "__main__":
+    main()
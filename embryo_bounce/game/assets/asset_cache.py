@@ -0,0 +1,156 @@
+"""
+This module contains the AssetCache class which keeps decoded and scaled
+images on disk as raw pixels so they load quickly, and shares decoded images
+and sounds in memory, and asset_cache, the cache used by the game.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+
+import pygame
+
+from utils import constants
+
+
+class AssetCache(object):
+    """
+    Loads images, scaled to a target size, from a cache of raw pixel files.
+
+    Each cache file holds the pixels of one image at one size, as written by
+    pygame.image.tobytes(), and is named by the SHA-1 of the source file, the
+    size and the pixel format. So changing an image or its size just makes a
+    new cache file. When an image isn't cached yet, it's decoded, scaled and
+    written to the cache.
+
+    Loaded images and sounds are kept in memory and shared, so each one is
+    only read from disk once per process, and creating a Ball or changing an
+    image_path doesn't do any I/O. Once a display mode is set, images are
+    handed out converted to the display format, so blitting them doesn't
+    convert pixels. Each image is converted once.
+
+    Constructor Parameters:
+
+    cache_dir: str | None
+        folder of cache files. If None, images are always decoded.
+    """
+    #formats tried in order when looking for cache file
+    _FORMATS = ("RGBA", "RGB")
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir
+        #(path, size): surface
+        self._surfaces: dict[tuple[str, tuple[int, int]], pygame.Surface] = {}
+        #(path, size): surface converted to display format
+        self._converted: dict[tuple[str, tuple[int, int]], pygame.Surface] = {}
+        #path: sound
+        self._sounds: dict[str, pygame.mixer.Sound] = {}
+
+    def load(self, path: str, size: tuple[int, int] = None) -> pygame.Surface:
+        """
+        returns image at path scaled to size, or at its own size if size is
+        None, converted to display format if a display mode is set. Returned
+        surface is shared, so it shouldn't be modified.
+        """
+        key = (path, size)
+        surface = self._converted.get(key)
+        if surface is not None:
+            return surface
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self._load(path, size)
+            self._surfaces[key] = surface
+        if pygame.display.get_surface() is not None:
+            surface = self._convert(surface)
+            self._converted[key] = surface
+        return surface
+
+    def load_sound(self, path: str) -> pygame.mixer.Sound:
+        """
+        returns sound at path. Returned sound is shared.
+        """
+        sound = self._sounds.get(path)
+        if sound is None:
+            sound = pygame.mixer.Sound(path)
+            self._sounds[path] = sound
+        return sound
+
+    def preload(self, assets: list[tuple[str, tuple[int, int]]]):
+        """
+        loads (path, size) assets so later load() calls return immediately.
+        Assets that aren't cached are decoded in parallel on a thread pool.
+        """
+        assets = [asset for asset in assets if asset not in self._surfaces]
+        if not assets:
+            return
+        with ThreadPoolExecutor(constants.ASSET_DECODE_THREADS) as executor:
+            surfaces = executor.map(lambda asset: self._load(*asset), assets)
+            self._surfaces.update(zip(assets, surfaces))
+
+    def _load(self, path: str, size: tuple[int, int]) -> pygame.Surface:
+        if self.cache_dir is None:
+            return self._decode(path, size)
+        digest = self._get_digest(path)
+        for pixel_format in AssetCache._FORMATS:
+            surface = self._read(digest, size, pixel_format)
+            if surface is not None:
+                return surface
+        surface = self._decode(path, size)
+        self._write(digest, size, surface)
+        return surface
+
+    def _convert(self, surface: pygame.Surface) -> pygame.Surface:
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def _decode(self, path: str, size: tuple[int, int]) -> pygame.Surface:
+        surface = pygame.image.load(path)
+        if size is not None and surface.get_size() != tuple(size):
+            surface = pygame.transform.scale(surface, size)
+        return surface
+
+    def _read(self, digest: str, size: tuple[int, int], pixel_format: str) -> pygame.Surface:
+        """
+        returns cached surface, or None if it isn't in cache. Size of cached
+        surface is read from file name, since size can be None.
+        """
+        prefix = f"{digest}_{self._get_size_name(size)}_"
+        suffix = f".{pixel_format.lower()}"
+        try:
+            file_names = os.listdir(self.cache_dir)
+        except OSError:
+            return None
+        for file_name in file_names:
+            if file_name.startswith(prefix) and file_name.endswith(suffix):
+                width, height = file_name[len(prefix):-len(suffix)].split("x")
+                with open(os.path.join(self.cache_dir, file_name), "rb") as cache_file:
+                    pixels = cache_file.read()
+                return pygame.image.frombytes(pixels, (int(width), int(height)), pixel_format)
+        return None
+
+    def _write(self, digest: str, size: tuple[int, int], surface: pygame.Surface):
+        pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+        width, height = surface.get_size()
+        file_name = (f"{digest}_{self._get_size_name(size)}_{width}x{height}"
+                     f".{pixel_format.lower()}")
+        path = os.path.join(self.cache_dir, file_name)
+        #cache is only an optimization, so game still starts if it can't be
+        #written. Written to temporary file first so a partly written file is
+        #never read.
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(f"{path}.tmp", "wb") as cache_file:
+                cache_file.write(pygame.image.tobytes(surface, pixel_format))
+            os.replace(f"{path}.tmp", path)
+        except OSError:
+            pass
+
+    def _get_digest(self, path: str) -> str:
+        with open(path, "rb") as source_file:
+            return hashlib.sha1(source_file.read()).hexdigest()
+
+    def _get_size_name(self, size: tuple[int, int]) -> str:
+        return "source" if size is None else f"{size[0]}x{size[1]}"
+
+
+asset_cache = AssetCache(constants.ASSET_CACHE_DIR)
@@ -3,16 +3,25 @@ This module contains the Game class which is the main class created to start
 game
 """
 
+from threading import Event, Thread
+
 import pygame
 
+from game.assets.asset_cache import asset_cache
 from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
 from game.assets.border import Borders
 from game.assets.paddle import Paddle
-from game.managers import DisplayManager, PositionManager, CollisionManager, HighScoreManager, SoundManager
-from game.managers.mode_managers import Gameplay, HighScores, Exit, MainMenu, HighScoreEntry, PlayAgain
+from game.managers import DisplayManager, RendererDisplayManager, PositionManager, CollisionManager, HighScoreManager, SoundManager
+from game.managers.mode_managers import Gameplay, MultiBallGameplay, HighScores, Exit, MainMenu, HighScoreEntry, PlayAgain
 from game.mode import Mode
-from utils.camera import HandCam
+from utils.camera import HandCam, RecordedCam
+from utils import constants
+from utils.detection_process import DetectionProcess
 from utils.hand_detection import HandDetector
+from utils.landmark_recording import ReplayHandDetector, ReplayCam
+from utils.paddle_predictor import create_predictor
+from utils.startup_timer import startup_timer
 
 
 class Game(object):
@@ -26,41 +35,95 @@ class Game(object):
     
     main()
         Initializes webcam and hand detection, and then starts game loop
+
+    Hand detection model takes seconds to build, so it's built on a
+    background thread while assets are loaded and the main menu is shown.
+    Gameplay waits for it.
     """
     def __init__(self):
         #pygame.init() must be called
         pygame.init()
+        startup_timer.mark("pygame init")
         self.mode = Mode.MAIN_MENU
         #initialize utils
-        self.hand_detector = HandDetector()
-        self.hand_cam = HandCam(self.hand_detector)
+        if constants.LANDMARK_REPLAY_PATH:
+            self.hand_detector = ReplayHandDetector(constants.LANDMARK_REPLAY_PATH)
+            self.hand_cam = ReplayCam(self.hand_detector)
+        elif constants.CAMERA_REPLAY_PATH:
+            self.hand_detector = HandDetector()
+            self.hand_cam = RecordedCam(self.hand_detector,
+                                        constants.CAMERA_REPLAY_PATH,
+                                        is_realtime=constants.CAMERA_REPLAY_REALTIME,
+                                        is_looped=True)
+        elif constants.DETECTION_IN_PROCESS:
+            self.detection_process = DetectionProcess()
+            self.hand_detector = self.detection_process.hand_detector
+            self.hand_cam = self.detection_process.hand_cam
+        else:
+            self.hand_detector = HandDetector()
+            self.hand_cam = HandCam(self.hand_detector, 
+                                    record_path=constants.CAMERA_RECORD_PATH)
+        startup_timer.mark("camera opened")
+        self._is_menu_shown = Event()
+        #exception raised while starting detection, raised again on main
+        #thread when gameplay waits for detection
+        self._detection_error: Exception = None
+        self._detection_thread = Thread(target=self._start_detection, daemon=True)
+        self._detection_thread.start()
+        #images are decoded in parallel while landmarker is built
+        asset_cache.preload(DisplayManager.get_assets()
+                            + [(constants.EMBRYO_IMAGE_PATH, None), (constants.FISH_IMAGE_PATH, None)])
+        startup_timer.mark("assets loaded")
         #initialize objects
         self.paddle = Paddle()
-        self.ball = Ball()
+        #multi-ball mode keeps its balls in ball_store instead of ball
+        if constants.MULTI_BALL_MODE:
+            self.ball = None
+            self.ball_store = BallStore(constants.MULTI_BALL_MAX)
+        else:
+            self.ball = Ball()
+            self.ball_store = None
         self.borders = Borders()
         #initialize managers
         self.sound_manager = SoundManager(self.mode)
-        self.display_manager = DisplayManager(
+        display_manager_class = RendererDisplayManager if constants.SDL2_RENDERER else DisplayManager
+        self.display_manager = display_manager_class(
             self.hand_detector, self.hand_cam, self.paddle, self.ball, 
-            self.borders)
+            self.borders, self.ball_store)
         self.collision_manager = CollisionManager(
-            self.ball, self.paddle, self.borders, self.sound_manager)
+            self.ball, self.paddle, self.borders, self.sound_manager, self.ball_store)
         self.position_manager = PositionManager(
             self.hand_detector, self.paddle, self.ball, self.borders, 
-            self.collision_manager)
+            self.collision_manager, create_predictor(constants.PADDLE_PREDICTOR),
+            self.ball_store)
         self.high_score_manager = HighScoreManager()
+        startup_timer.mark("assets and managers")
 
     def main(self):
         """
-        game loop. First has to initial webcam and hand detection and then
-        enters game loop.
+        game loop. Shows main menu while hand detection starts in background
+        and then enters game loop.
         """
-        self.hand_detector.set_landmarker()
-        self.hand_cam.start()
         self.sound_manager.play_menu_song()
+        self.display_manager.menu_update(0)
+        startup_timer.mark("menu shown")
+        self._is_menu_shown.set()
         while True:
             #Depending on mode of game, selects display and event management.
-            if self.mode == Mode.GAMEPLAY:
+            if self.mode == Mode.GAMEPLAY and constants.MULTI_BALL_MODE:
+                gameplay = MultiBallGameplay(ball_store=self.ball_store,
+                                             paddle=self.paddle,
+                                             borders=self.borders,
+                                             position_manager=self.position_manager,
+                                             display_manager=self.display_manager,
+                                             sound_manager=self.sound_manager,
+                                             collision_manager=self.collision_manager,
+                                             high_score_manager=self.high_score_manager)
+                mode = gameplay.manage_events()
+                score = gameplay.score
+            elif self.mode == Mode.GAMEPLAY:
+                #last game's ball is off screen, so every game gets a new one
+                self.ball = Ball()
                 gameplay = Gameplay(ball=self.ball,
                                     paddle=self.paddle,
                                     borders=self.borders,
@@ -74,9 +137,10 @@ class Game(object):
             elif self.mode == Mode.HIGH_SCORES:
                 high_scores = HighScores(display_manager=self.display_manager,
                                          high_score_manager=self.high_score_manager)
-                high_scores.manage_events()
-                mode = Mode.MAIN_MENU
+                mode = high_scores.manage_events()
             elif self.mode == Mode.EXIT:
+                #detection can't be stopped while it's still starting
+                self._detection_thread.join()
                 #named exit manager to avoid exit keyword
                 exit_manager = Exit(self.hand_cam)
                 exit_manager.manage_events()
@@ -84,15 +148,15 @@ class Game(object):
                 main_menu = MainMenu(self.display_manager)
                 mode = main_menu.manage_events()
             elif self.mode == Mode.HIGH_SCORE_ENTRY:
+                mode = Mode.PLAY_AGAIN
                 try:
                     hs_entry = HighScoreEntry(display_manager=self.display_manager,
                                               high_score_manager=self.high_score_manager,
                                               score=score)
-                    hs_entry.manage_events()
+                    mode = hs_entry.manage_events()
                 #if score hasn't been initialized
                 except AttributeError:
                     pass
-                mode = Mode.PLAY_AGAIN
             elif self.mode == Mode.PLAY_AGAIN:
                 play_again = PlayAgain(self.display_manager)
                 mode = play_again.manage_events()
@@ -100,10 +164,35 @@ class Game(object):
             #clock tick is to increment variables and run game at consistent
             #frame rate
 
+    def _start_detection(self):
+        """
+        builds hand detection model and starts webcam stream. Run on
+        background thread so menu doesn't wait for it.
+        """
+        try:
+            self.hand_detector.set_landmarker()
+            startup_timer.mark("landmarker ready")
+            self.hand_cam.start()
+        except Exception as error:
+            #threading would only print it, and game would start with a
+            #paddle that never moves
+            self._detection_error = error
+            return
+        startup_timer.mark("camera streaming")
+        if constants.STARTUP_REPORT:
+            #report once every step has been marked
+            self._is_menu_shown.wait()
+            print(startup_timer.get_report(constants.STARTUP_BUDGETS_MS))
+
     def _change_mode(self, mode):
         """
         changes current mode to mode.
         """
+        if mode == Mode.GAMEPLAY:
+            #paddle can't move until hand detection is running
+            self._detection_thread.join()
+            if self._detection_error:
+                raise self._detection_error
         #This condition is to avoid switching music when switching between
         #high scores and menu
         if self.mode == Mode.HIGH_SCORES:
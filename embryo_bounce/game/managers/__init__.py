@@ -3,4 +3,5 @@ from game.managers.display_manager import DisplayManager
 from game.managers.draw_manager import DrawManager
 from game.managers.high_score_manager import HighScoreManager
 from game.managers.position_manager import PositionManager
+from game.managers.renderer_display_manager import RendererDisplayManager
 from game.managers.sound_manager import SoundManager
\ No newline at end of file
@@ -9,75 +9,38 @@ from game.assets.ball import Ball
 from game.assets.border import Borders
 from game.assets.paddle import Paddle
 from game.managers.sound_manager import SoundManager
+from game.simulation.ball_store import BallStore
+from game.simulation.physics import CollisionResponse
 
 
-class CollisionManager(object):
+class CollisionManager(CollisionResponse):
     """
-    Manages collision of objects.
+    Manages collision of objects. Balls bounce as in CollisionResponse, and
+    paddle hits play a sound.
+
+    Constructor Parameters:
+
+    Same as CollisionResponse, and
+
+    sound_manager: SoundManager
+        SoundManager instance used by game
     """
-    #angle range of ball-paddle collision
-    ANGLE_RANGE = np.pi/2
-    #min angle from ball-paddle-collision
-    MIN_ANGLE = -ANGLE_RANGE/2
-    #max angle from ball-paddle-collision
-    MAX_ANGLE = ANGLE_RANGE/2
     def __init__(self,
                  ball: Ball,
                  fish_paddle: Paddle,
                  borders: Borders,
-                 sound_manager: SoundManager):
-        self.ball = ball
-        self.paddle = fish_paddle
-        self.borders = borders
+                 sound_manager: SoundManager,
+                 ball_store: BallStore = None):
+        super().__init__(ball, fish_paddle, borders, ball_store)
         self.sound_manager = sound_manager
 
-    def top_border_collision(self):
-        """
-        called when ball-top border collision occurs
-        """
-        #on top and bottom border collision, only vertical velocity changes.
-        self.ball.y_vel = -self.ball.y_vel
-
-    def back_border_collision(self):
-        """
-        called when ball-back border collision occurs
-        """
-        #on back border, only horizantal velocity changes.
-        self.ball.x_vel = -self.ball.x_vel
-
-    def bottom_border_collision(self):
-        """
-        called when ball-bottom border collision occurs
-        """
-        self.ball.y_vel = -self.ball.y_vel
-
     def paddle_collision(self):
         """
         called when ball-paddle collision occurs
         """
-        #center right coordinate of paddle
-        cent_coords = self.paddle.cent_coords
-        #difference between center coord y and ball y positions
-        dy = cent_coords[1] - self.ball.y
-        #angle factor taken as ratio of dy and paddle height
-        angle_fact = dy/self.paddle.height
-        #angle factor multiplied by ANGLE_RANGE to get angle change
-        angle = angle_fact*CollisionManager.ANGLE_RANGE
-        #ensures angle is within accetable range
-        angle = self._get_corrected_angle(angle)
-        #velocities are changed byased on angle
-        self.ball.x_vel = self.ball.speed*np.cos(angle)
-        self.ball.y_vel = -self.ball.speed*np.sin(angle)
+        super().paddle_collision()
         self.sound_manager.play_paddle_sound()
 
-    def _get_corrected_angle(self, angle):
-        """
-        makes sure angle is within range (MIN_ANGLE, MAX_ANGLE)
-        """
-        if angle <= CollisionManager.MIN_ANGLE:
-            return CollisionManager.MIN_ANGLE
-        elif angle >= CollisionManager.MAX_ANGLE:
-            return CollisionManager.MAX_ANGLE
-        else:
-            return angle
-        
\ No newline at end of file
+    def paddle_collisions(self, indices: np.ndarray):
+        super().paddle_collisions(indices)
+        self.sound_manager.play_paddle_sound()
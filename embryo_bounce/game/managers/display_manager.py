@@ -3,17 +3,21 @@ This module contains the DisplayManager class which manages the pygame
 display and its surfaces
 """
 
-import cv2
+import time
+
 import numpy as np
 import pygame
 
 from game.assets.paddle import Paddle
 from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
 from game.assets.border import Borders
+from game.assets.asset_cache import asset_cache
 from game.managers.draw_manager import DrawManager
 from utils.hand_detection import HandDetector
 from utils.camera import HandCam
 from utils import constants
+from utils.preview import get_preview_size
 
 
 class DisplayManager():
@@ -36,27 +40,43 @@ class DisplayManager():
 
     borders: Borders
         Borders instance used by game
+
+    ball_store: BallStore | None
+        balls of multi-ball mode
     """
+    #size of display and of game background image
+    SIZE = (800, 720)
+    BG_SIZE = (800, 720)
     def __init__(self,
                  hand_detector: HandDetector,
                  hand_cam: HandCam,
                  paddle: Paddle,
                  ball: Ball,
-                 borders: Borders):
+                 borders: Borders,
+                 ball_store: BallStore = None):
         #game objects
         self.hand_detector = hand_detector
         self.hand_cam = hand_cam
         self.paddle = paddle
         self.ball = ball
         self.borders = borders
+        self.ball_store = ball_store
         #coords and sizes
-        self.size = (800, 720)
+        self.size = DisplayManager.SIZE
         self.cam_size = self._init_cam_size()
         self.cam_coords = (0, 0)
         self.bg_coords = (0, 0)
-        self.bg_size = (800, 720)
+        self.bg_size = DisplayManager.BG_SIZE
         self.game_coords = (0, self.cam_size[1])
-        self.display = pygame.display.set_mode(self.size)
+        self.display = self._init_display()
+        #camera preview is drawn into the same surface whenever hand detector
+        #has a new image. White until first image arrives.
+        self.cam_surface = pygame.Surface(self.cam_size)
+        self.cam_surface.fill(constants.WHITE)
+        self.cam_preview_fps = constants.CAM_PREVIEW_FPS
+        self._cam_preview_seq = 0
+        self._cam_update_time = -np.inf
+        self._is_cam_updated = True
         #init copies so we only have to load them once
         self.bg_surface_copy = self._init_bg_surface_copy()
         self.game_surface_copy = self._init_game_surface_copy()
@@ -64,6 +84,28 @@ class DisplayManager():
         self.bg_surface = self.bg_surface_copy.copy()
         self.game_surface = self.game_surface_copy.copy()
         self.menu_surface = self.menu_surface_copy.copy()
+        #dirty rect rendering of gameplay. Only regions of display that change
+        #are redrawn and updated.
+        self.is_dirty_rect_enabled = constants.DIRTY_RECT_RENDERING
+        self.game_rect = pygame.Rect(self.game_coords, (self.size[0], self.size[1] - self.game_coords[1]))
+        self.hud_rect = pygame.Rect(0, 0, self.size[0], self.game_coords[1])
+        self.game_view = self.display.subsurface(self.game_rect)
+        self.game_static_surface = self._init_game_static_surface()
+        #set when another display is shown so next gameplay frame is redrawn
+        #in full
+        self._is_full_redraw = True
+        #rects of display drawn on in previous gameplay frame
+        self._sprite_rects: list[pygame.Rect] = []
+        self._hud_rects: list[pygame.Rect] = []
+        self._hud_state: tuple[int, int] = None
+
+    @classmethod
+    def get_assets(cls) -> list[tuple[str, tuple[int, int]]]:
+        """
+        returns (path, size) of each image loaded by DisplayManager, so they
+        can be preloaded
+        """
+        return [(constants.BG_IMAGE_PATH, cls.BG_SIZE), (constants.MENU_IMAGE_PATH, cls.SIZE)]
 
     def game_update(self, lives: int, score: int):
         """
@@ -78,13 +120,9 @@ class DisplayManager():
             score in game
         """
         self._set_cam_surface()
-        self._draw_game(lives, score)
-        #order is important for bg_surface to be blit before
-        #game_surface since they're overlayed based on order
-        self._blit_bg_surface()
-        self._blit_cam_surface()
-        self._blit_game_surface()
-        pygame.display.update()
+        self._render_game(lives, score)
+        if self.hand_detector.tracer:
+            self.hand_detector.tracer.mark(self.hand_detector.result_frame_id, "display")
 
     def high_score_entry_update(self, name: str):
         """
@@ -95,12 +133,13 @@ class DisplayManager():
         name: str
             name in entry
         """
+        self._is_full_redraw = True
         self._set_cam_surface()
         self._draw_high_score_entry(name)
         self._blit_bg_surface()
         self._blit_cam_surface()
         self._blit_game_surface()
-        pygame.display.update()
+        self._present()
 
     def high_score_update(self, entries: list[tuple[str, int]]):
         """
@@ -112,9 +151,10 @@ class DisplayManager():
             entries from high score manager. Entries are in the format
             (name, score)
         """
+        self._is_full_redraw = True
         self._draw_high_scores(entries)
         self._blit_bg_surface()
-        pygame.display.update()
+        self._present()
 
     def play_again_update(self, response: str):
         """
@@ -125,12 +165,13 @@ class DisplayManager():
         response: str
             response to play again
         """
+        self._is_full_redraw = True
         self._set_cam_surface()
         self._draw_play_again(response)
         self._blit_bg_surface()
         self._blit_cam_surface()
         self._blit_game_surface()
-        pygame.display.update()
+        self._present()
 
     def menu_update(self, button_num: int):
         """
@@ -139,38 +180,135 @@ class DisplayManager():
         button_num: int
             button number selected
         """
+        self._is_full_redraw = True
         self._draw_menu(button_num)
         self._blit_menu_surface()
-        pygame.display.update()
+        self._present()
+
+    def _init_display(self) -> pygame.Surface:
+        """
+        returns surface that screens are drawn on
+        """
+        return pygame.display.set_mode(self.size)
+
+    def _present(self, rects: list[pygame.Rect] = None):
+        """
+        shows what has been drawn on display. If rects is given, only those
+        regions are updated.
+        """
+        if rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
 
     def _init_cam_size(self):
         #CAM_H is constant and x is determined by aspect ratio of camera so
-        #it looks good!
-        aspect_ratio = self.hand_cam.aspect_ratio
-        return (int(constants.CAM_H*aspect_ratio), constants.CAM_H)
+        #it looks good! Same size as hand detector previews.
+        return get_preview_size(self.hand_cam.shape)
 
     def _set_cam_surface(self):
-        if self.hand_detector.image is not None:
-            frame = self.hand_detector.image
-            #resize webcam image to standardized size
-            frame = cv2.resize(frame, self.cam_size)
-            #frame requires rotation to match pygame orientation
-            frame = np.rot90(frame)
-            #cv2 cap uses BGR instead of RGB, but pygame uses RGB
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            self.cam_surface = pygame.surfarray.make_surface(frame)
+        """
+        draws newest hand detector preview into cam_surface if there's a new
+        one and preview rate allows it. Sets self._is_cam_updated.
+        """
+        self._is_cam_updated = False
+        preview_seq = self.hand_detector.preview_seq
+        if preview_seq == self._cam_preview_seq:
+            return
+        now = time.perf_counter()
+        if self.cam_preview_fps and now - self._cam_update_time < 1/self.cam_preview_fps:
+            return
+        #preview is already resized, RGB and rotated by hand detector
+        preview = self.hand_detector.get_preview()
+        if preview is None:
+            return
+        pygame.surfarray.blit_array(self.cam_surface, preview)
+        self._cam_preview_seq = preview_seq
+        self._cam_update_time = now
+        self._is_cam_updated = True
+
+    def _render_game(self, lives: int, score: int):
+        """
+        draws and shows gameplay display
+        """
+        if self.is_dirty_rect_enabled:
+            self._update_game_rects(lives, score)
+        else:
+            self._draw_game(lives, score)
+            #order is important for bg_surface to be blit before
+            #game_surface since they're overlayed based on order
+            self._blit_bg_surface()
+            self._blit_cam_surface()
+            self._blit_game_surface()
+            self._present()
+
+    def _update_game_rects(self, lives: int, score: int):
+        """
+        redraws regions of gameplay display that changed since last frame and
+        updates only those regions
+        """
+        if self._is_full_redraw:
+            self._redraw_game(lives, score)
+            return
+        dirty_rects = []
+        #restore background under ball and paddle at previous positions. With
+        #many balls, one blit of the whole game area is faster.
+        if len(self._sprite_rects) > constants.MAX_DIRTY_RECTS:
+            self.display.blit(self.game_static_surface, self.game_coords)
+            dirty_rects.append(self.game_rect)
         else:
-            #Only occurs before webcam stream initializes
-            #3 for number of color channels
-            shape = (self.cam_size[0], self.cam_size[1], 3)
-            frame = np.ones(shape)*constants.WHITE
-            self.cam_surface = pygame.surfarray.make_surface(frame)
+            for rect in self._sprite_rects:
+                area = rect.move(-self.game_coords[0], -self.game_coords[1])
+                self.display.blit(self.game_static_surface, rect, area)
+            dirty_rects.extend(self._sprite_rects)
+        #HUD only changes when lives or score do
+        if (lives, score) != self._hud_state:
+            hud_rects = self._hud_rects
+            self._draw_hud(lives, score)
+            hud_rects = hud_rects + self._hud_rects
+            for rect in hud_rects:
+                self.display.blit(self.bg_surface, rect, rect)
+            dirty_rects.extend(hud_rects)
+        if self._is_cam_updated:
+            dirty_rects.append(self._blit_cam_surface())
+        self._sprite_rects = self._draw_sprites()
+        if len(self._sprite_rects) > constants.MAX_DIRTY_RECTS:
+            dirty_rects.append(self.game_rect)
+        else:
+            dirty_rects.extend(self._sprite_rects)
+        self._present(dirty_rects)
+
+    def _redraw_game(self, lives: int, score: int):
+        """
+        draws whole gameplay display and updates whole display
+        """
+        self._draw_hud(lives, score, is_full_redraw=True)
+        self._blit_bg_surface()
+        self._blit_cam_surface()
+        self.display.blit(self.game_static_surface, self.game_coords)
+        self._sprite_rects = self._draw_sprites()
+        self._present()
+        self._is_full_redraw = False
+
+    def _draw_sprites(self) -> list[pygame.Rect]:
+        """
+        draws ball and paddle straight onto display and returns display rects
+        drawn on
+        """
+        rects = []
+        if self.ball:
+            rects.append(DrawManager.draw_ball(self.game_view, self.ball))
+        if self.ball_store:
+            rects.extend(DrawManager.draw_balls(self.game_view, self.ball_store))
+        rects.append(DrawManager.draw_paddle(self.game_view, self.paddle))
+        #rects are relative to game_view
+        return [rect.move(self.game_coords) for rect in rects]
 
     def _blit_bg_surface(self):
         self.display.blit(self.bg_surface, self.bg_coords)
 
     def _blit_cam_surface(self):
-        self.display.blit(self.cam_surface, self.cam_coords)
+        return self.display.blit(self.cam_surface, self.cam_coords)
     
     def _blit_game_surface(self):
         self.display.blit(self.game_surface, self.game_coords)
@@ -193,24 +331,41 @@ class DisplayManager():
         
     def _draw_game(self, lives: int, score: int):
         self.game_surface = self.game_surface_copy.copy()
-        self.bg_surface = self.bg_surface_copy.copy()
         DrawManager.draw_border(self.game_surface, self.borders.top)
         DrawManager.draw_border(self.game_surface, self.borders.back)
         DrawManager.draw_border(self.game_surface, self.borders.bot)
         if self.ball:
             DrawManager.draw_ball(self.game_surface, self.ball)
+        if self.ball_store:
+            DrawManager.draw_balls(self.game_surface, self.ball_store)
         DrawManager.draw_paddle(self.game_surface, self.paddle)
-        DrawManager.draw_lives(self.bg_surface, self.paddle, lives)
-        DrawManager.draw_text_box(surface=self.bg_surface,
-                                  text=f"Score: {score}",
-                                  x=constants.SCORE_BOX_X,
-                                  y=constants.SCORE_BOX_Y,
-                                  font_size=constants.GAME_UI_F_SIZE)
-        DrawManager.draw_text_box(surface=self.bg_surface,
-                                  text="Lives",
-                                  x=constants.LIVES_TEXT_X,
-                                  y=constants.LIVES_TEXT_Y,
-                                  font_size=constants.GAME_UI_F_SIZE)
+        self._draw_hud(lives, score, is_full_redraw=True)
+
+    def _draw_hud(self, lives: int, score: int, is_full_redraw: bool = False):
+        """
+        draws lives and score on bg_surface and keeps rects drawn on. Only
+        rects of previous HUD are restored from bg_surface_copy, since score
+        changes every step, unless is_full_redraw.
+        """
+        if is_full_redraw:
+            self.bg_surface.blit(self.bg_surface_copy, (0, 0))
+        else:
+            for rect in self._hud_rects:
+                self.bg_surface.blit(self.bg_surface_copy, rect, rect)
+        rects = [DrawManager.draw_lives(self.bg_surface, self.paddle, lives),
+                 DrawManager.draw_text_box(surface=self.bg_surface,
+                                           text=f"Score: {score}",
+                                           x=constants.SCORE_BOX_X,
+                                           y=constants.SCORE_BOX_Y,
+                                           font_size=constants.GAME_UI_F_SIZE),
+                 DrawManager.draw_text_box(surface=self.bg_surface,
+                                           text="Lives",
+                                           x=constants.LIVES_TEXT_X,
+                                           y=constants.LIVES_TEXT_Y,
+                                           font_size=constants.GAME_UI_F_SIZE)]
+        #game surface is drawn over bg_surface below hud_rect
+        self._hud_rects = [rect.clip(self.hud_rect) for rect in rects if rect is not None]
+        self._hud_state = (lives, score)
 
     def _draw_high_score_entry(self, name):
         self.game_surface = self.game_surface_copy.copy()
@@ -220,7 +375,7 @@ class DisplayManager():
             self.game_surface, f"Enter Name: {name}", y=constants.HS_ENTRY_Y)
     
     def _draw_high_scores(self, high_score_entries):
-        self.bg_surface = self.bg_surface_copy.copy()
+        self.bg_surface.blit(self.bg_surface_copy, (0, 0))
         DrawManager.draw_text_box(surface=self.bg_surface,
                                   text="High Scores",
                                   y=constants.HS_TITLE_Y)
@@ -248,16 +403,25 @@ class DisplayManager():
             self.game_surface, f"Type y or n: {response}", y=constants.PLAY_RESP_Y)
 
     def _init_bg_surface_copy(self):
-        #3 for number of color channels
-        bg_shape = (self.size[0], self.size[1], 3)
-        bg_array = np.ones(bg_shape)*constants.LIGHT_BLUE
-        return pygame.surfarray.make_surface(bg_array)
+        bg_surface = pygame.Surface(self.size)
+        bg_surface.fill(constants.LIGHT_BLUE)
+        return bg_surface
+
+    def _init_game_static_surface(self):
+        """
+        returns game surface with borders, converted to display format, that
+        dirty rects are restored from
+        """
+        game_surface = self.game_surface_copy.convert(self.display)
+        DrawManager.draw_border(game_surface, self.borders.top)
+        DrawManager.draw_border(game_surface, self.borders.back)
+        DrawManager.draw_border(game_surface, self.borders.bot)
+        return game_surface
 
     def _init_game_surface_copy(self):
-        game_surface = pygame.image.load(constants.BG_IMAGE_PATH)
-        return pygame.transform.scale(game_surface, self.bg_size)
+        #surface copies are never drawn on, so cached image is used as is
+        return asset_cache.load(constants.BG_IMAGE_PATH, self.bg_size)
     
     def _init_menu_surface_copy(self):
-        menu_surface =  pygame.image.load(constants.MENU_IMAGE_PATH)
-        return pygame.transform.scale(menu_surface, self.size)
+        return asset_cache.load(constants.MENU_IMAGE_PATH, self.size)
     
\ No newline at end of file
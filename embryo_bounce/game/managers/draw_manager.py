@@ -5,9 +5,13 @@ draws objects on pygame surfaces
 
 import pygame
 
+from game.assets.asset_cache import asset_cache
 from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
 from game.assets.paddle import Paddle
 from game.assets.border import Border
+from game.managers.sprite_cache import SpriteCache
+from game.managers.text_cache import TextCache
 from utils import constants
 
 class DrawManager(object):
@@ -16,7 +20,11 @@ class DrawManager(object):
     """
     #angle needed to rotate imported images
     IMAGE_ANGLE = -90
-    
+    #scaled and rotated images of paddle, ball and lives
+    sprite_cache = SpriteCache(constants.SPRITE_CACHE_SIZE)
+    #fonts and rendered text of HUD and menus
+    text_cache = TextCache(constants.TEXT_CACHE_SIZE)
+
     @classmethod
     def draw_border(cls, surface: pygame.Surface, border: Border):
         """
@@ -79,7 +87,7 @@ class DrawManager(object):
     @classmethod
     def draw_paddle(cls, surface: pygame.Surface, paddle: Paddle):
         """
-        Draws paddle object on surface
+        Draws paddle object on surface and returns rect that was drawn on
 
         Parameters:
 
@@ -89,17 +97,13 @@ class DrawManager(object):
         paddle: Paddle
             Paddle object to be drawn
         """
-        width = paddle.width
-        height = paddle.height
-        image = paddle.image
-        image = pygame.transform.scale(paddle.image, (height, width))
-        image = pygame.transform.rotate(image, cls.IMAGE_ANGLE)
-        surface.blit(image, paddle.get_coords())
+        image = cls._get_paddle_sprite(paddle)
+        return surface.blit(image, paddle.get_coords())
 
     @classmethod
     def draw_ball(cls, surface: pygame.Surface, ball: Ball):
         """
-        Draws ball object on surface
+        Draws ball object on surface and returns rect that was drawn on
 
         Parameters:
 
@@ -110,22 +114,48 @@ class DrawManager(object):
             Ball object to be drawn
         """
         diameter = ball.radius*2
-        image = ball.image
-        image = pygame.transform.scale(image, (diameter, diameter))
-        x, y = ball.get_coords()
+        image = cls.sprite_cache.get(ball.image, (diameter, diameter))
+        x, y = ball.get_render_coords()
         x = int(x - ball.radius)
         y = int(y - ball.radius)
-        surface.blit(image, (x,y))
+        return surface.blit(image, (x,y))
+    
+    @classmethod
+    def draw_balls(cls, surface: pygame.Surface, ball_store: BallStore) -> list[pygame.Rect]:
+        """
+        Draws every ball in ball_store on surface in one batch and returns
+        rects that were drawn on
+
+        Parameters:
+
+        surface: pygame.Surface
+            pygame surface to be drawn on
+
+        ball_store: BallStore
+            balls to be drawn
+        """
+        x, y = ball_store.get_render_coords()
+        radius = ball_store.radius[:ball_store.count]
+        left = (x - radius).astype(int).tolist()
+        top = (y - radius).astype(int).tolist()
+        diameters = (radius*2).astype(int).tolist()
+        ball_image = asset_cache.load(constants.EMBRYO_IMAGE_PATH)
+        images = {}
+        for diameter in set(diameters):
+            images[diameter] = cls.sprite_cache.get(ball_image, (diameter, diameter))
+        return surface.blits([(images[diameter], (x, y)) for diameter, x, y in zip(diameters, left, top)])
     
     @classmethod
     def draw_text_box(cls, surface: pygame.Surface, 
                       text: str, 
                       x: int = None,
                       y: int= None, 
-                      font_size: int=constants.DEF_F_SIZE):
+                      font_size: int=constants.DEF_F_SIZE,
+                      color: tuple[int, int, int] = constants.BLACK):
         """
         draws text box with given text at coordinate (x,y). If no x or no y
-        is given, that coordinate is centered on the surface.
+        is given, that coordinate is centered on the surface. Returns rect
+        that was drawn on.
 
         parameters:
 
@@ -145,21 +175,25 @@ class DrawManager(object):
 
         font_size: int
             font size. Default is set by constants.DEF_F_SIZE.
+
+        color: tuple[int, int, int]
+            color tuple in RGB. Default is constants.BLACK.
         """
-        font = pygame.font.Font(None, font_size)
-        text_surface = font.render(text, True, constants.BLACK)
+        #rendered text is cached, so unchanged text isn't rendered again
+        text_surface = cls.text_cache.render(text, font_size, color)
         # Blit the text.
         size = surface.get_size()
         if x is None:
             x = size[0]/2 - text_surface.get_width()/2
         if y is None:
             y = size[0]/2 - text_surface.get_height()/2
-        surface.blit(text_surface, (x, y))
+        return surface.blit(text_surface, (x, y))
 
     @classmethod
     def draw_lives(cls, surface: pygame.Surface, paddle: Paddle, lives: int):
         """
         Draws paddle object lives times to indicate number of lives remaining.
+        Returns rect that was drawn on, or None if nothing was drawn.
 
         Parameters:
 
@@ -172,13 +206,19 @@ class DrawManager(object):
         lives: int
             number of lives remaining
         """
-        width = paddle.width
-        height = paddle.height
-        image = paddle.image
-        image = pygame.transform.scale(paddle.image, (height, width))
-        image = pygame.transform.rotate(image, cls.IMAGE_ANGLE)
+        image = cls._get_paddle_sprite(paddle)
+        rect = None
         for life in range(lives-1):
             x = constants.LIVES_IMAGE_X-life*constants.LIVES_IMAGE_X_INCR
             y = constants.LIVES_IMAGE_Y
-            surface.blit(image, (x, y))
-    
\ No newline at end of file
+            life_rect = surface.blit(image, (x, y))
+            rect = life_rect if rect is None else rect.union(life_rect)
+        return rect
+
+    @classmethod
+    def _get_paddle_sprite(cls, paddle: Paddle) -> pygame.Surface:
+        """
+        returns paddle image scaled and rotated to paddle size
+        """
+        #image is scaled before rotation, so width and height are swapped
+        return cls.sprite_cache.get(paddle.image, (paddle.height, paddle.width), cls.IMAGE_ANGLE)
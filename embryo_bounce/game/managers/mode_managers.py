@@ -5,20 +5,28 @@ Enum class.
 """
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 import sys
+import time
 
 import pygame
 
 from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
 from game.assets.border import Borders
 from game.assets.paddle import Paddle
 from game.managers import DisplayManager, PositionManager, CollisionManager, HighScoreManager, SoundManager
 from game.mode import Mode
+from game.simulation import Simulation, MultiBallSimulation
 from utils import constants
 from utils.camera import HandCam
 
 
 class ModeManager(ABC):
+    #events idle screens wake up for. Other events are blocked so things like
+    #mouse movement don't cause redraws. TEXTINPUT is needed for KEYDOWN
+    #events to have their unicode character.
+    INPUT_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.TEXTINPUT, pygame.WINDOWEXPOSED]
 
     @abstractmethod
     def manage_events(self) -> Mode:
@@ -27,10 +35,46 @@ class ModeManager(ABC):
         """
         return Mode
 
+    @contextmanager
+    def _allow_input_events_only(self):
+        """
+        blocks every event but INPUT_EVENTS while in with block, and restores
+        previously blocked events afterwards
+        """
+        blocked = [event_type for event_type in range(pygame.NUMEVENTS)
+                   if pygame.event.get_blocked(event_type)]
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(ModeManager.INPUT_EVENTS)
+        try:
+            yield
+        finally:
+            pygame.event.set_allowed(None)
+            if blocked:
+                pygame.event.set_blocked(blocked)
+
+    def _wait_for_events(self, timeout_ms: int) -> list[pygame.event.Event]:
+        """
+        sleeps until an event arrives or timeout_ms passes, and returns events
+        in queue. Returns empty list on timeout. Used by idle screens instead
+        of polling so they don't use a whole CPU core.
+        """
+        event = pygame.event.wait(timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
 
 class Gameplay(ModeManager):
     """
-    manages events while in GAMEPLAY mode
+    manages events while in GAMEPLAY mode.
+
+    The rules of the game are played by a Simulation, in fixed steps of
+    1/constants.SIMULATION_RATE seconds, independent of the frame rate. Each
+    rendered frame runs however many steps of real time have passed since the
+    last one, up to constants.MAX_STEPS_PER_FRAME, and the ball is drawn
+    interpolated between its last two step positions. So physics and score
+    are the same whether frames are rendered slower or faster than the
+    simulation.
     """
     def __init__(self,
                  ball: Ball,
@@ -52,33 +96,82 @@ class Gameplay(ModeManager):
         #initialize game settings and variables
         self.clock = pygame.time.Clock()
         self.framerate = constants.FRAMERATE
-        self.lives = constants.INIT_LIVES
+        self.step_s = 1/constants.SIMULATION_RATE
+        #if False, one step is simulated per rendered frame, regardless of
+        #time, so runs driven by recordings are deterministic
+        self.is_realtime = True
+        #number of rendered frames
         self.frame_num = 0
-        self.frames_since_speed = 0
-        self.frames_no_ball = 0
-        self.is_ball_out = False
-        self.score = 0
+        #simulation time not yet stepped, in seconds
+        self._accumulator = 0.0
+        self._step_time: float = None
+        self.simulation = self._init_simulation()
+        self.simulation.ball_out_listener = self.sound_manager.play_mistake_sound
+        self.simulation.new_ball_listener = self._on_new_ball
+        #managers may still have last game's ball, which is drawn off screen
+        self._on_new_ball(self.simulation.ball)
+
+    @property
+    def lives(self) -> int:
+        return self.simulation.lives
+
+    @property
+    def score(self) -> int:
+        return self.simulation.score
+
+    @property
+    def step_num(self) -> int:
+        """
+        number of simulation steps
+        """
+        return self.simulation.step_num
     
     def manage_events(self) -> Mode:
-        while self.lives != 0:
+        #time before gameplay starts isn't simulated
+        self._step_time = time.perf_counter()
+        while not self.simulation.is_over:
             for event in pygame.event.get():
                 if event.type == pygame.KEYDOWN:
                     #escape returns to main menu
                     if event.key == pygame.K_ESCAPE:
                         return Mode.MAIN_MENU
-                    #waits at the beginning of the game for ball to start moving
-            if self.frame_num < constants.INITIAL_WAIT_FRAMES:
-                self._manage_pre_game()
-            #normal game loop with ball moving
-            else:
-                if not self.is_ball_out:
-                    #when ball is still in bounds
-                    self._manage_ball_in()
-                #when ball is out of bounds
-                else:
-                    self._manage_ball_out()
+            #paddle follows hand at render rate, and is used by every step
+            self.position_manager.update_paddle()
+            for _ in range(self._get_num_steps()):
+                self.simulation.step()
+                if self.simulation.is_over:
+                    break
+            if constants.RENDER_INTERPOLATION:
+                self._set_render_fraction(self._accumulator/self.step_s)
+            self.display_manager.game_update(self.lives, self.score)
             self._tick_clock()
         return self._determine_mode()
+
+    def _init_simulation(self) -> Simulation:
+        return Simulation(self.paddle,
+                          self.borders,
+                          ball=self.ball,
+                          new_ball=Ball,
+                          collisions=self.collision_manager)
+
+    def _get_num_steps(self) -> int:
+        """
+        adds time since last call to accumulator and returns number of whole
+        simulation steps in it. Time over constants.MAX_STEPS_PER_FRAME steps
+        is dropped, so a long stall slows the game down rather than making it
+        jump ahead.
+        """
+        if not self.is_realtime:
+            return 1
+        now = time.perf_counter()
+        self._accumulator += now - self._step_time
+        self._step_time = now
+        num_steps = int(self._accumulator/self.step_s)
+        if num_steps > constants.MAX_STEPS_PER_FRAME:
+            num_steps = constants.MAX_STEPS_PER_FRAME
+            self._accumulator = num_steps*self.step_s
+        self._accumulator -= num_steps*self.step_s
+        return num_steps
         
     def _determine_mode(self) -> Mode:
         if self.high_score_manager.is_high_score(self.score):
@@ -86,65 +179,64 @@ class Gameplay(ModeManager):
         else:
             return Mode.PLAY_AGAIN
 
-    def _increase_ball_speed(self):
-        """
-        increase ball speed by constants.SPEED_INCREMENT
-        """
-        if self.frames_since_speed > constants.FRAMES_NO_SPEED:
-            self.ball.speed += constants.SPEED_INCREMENT
-            self.frames_since_speed = 0
-
-    def is_ball_out_update(self):
-        """
-        Updates is_ball_gone flag to position_manager.is_ball_gone().
-        If is_ball_gone is True, plays mistake sound.
-        """
-        self.is_ball_out = self.position_manager.is_ball_out()
-        if self.is_ball_out:
-            self.sound_manager.play_mistake_sound()
-    
-    def _manage_ball_out(self):
-        """
-        event manager when ball is gone
-        """
-        self.position_manager.update(False)
-        self.display_manager.game_update(self.lives, self.score)
-        if self.frames_no_ball > constants.NO_BALL_FRAMES:
-            self.lives -= 1
-            self._spawn_new_ball()
-            self.is_ball_out = False
-
-    def _manage_ball_in(self):
-        self.position_manager.update()
-        self.display_manager.game_update(self.lives, self.score)
-        self._increase_ball_speed()
-        self.is_ball_out_update()
-        self.frames_no_ball = 0
-
-    def _manage_pre_game(self):
-        """
-        manages before game begins
-        """
-        #score shouldn't start until game starts
-        self.score = 0
-        #don't update ball position so it doesn't move
-        self.position_manager.update(False)
-        self.display_manager.game_update(self.lives, self.score)
-
-    def _spawn_new_ball(self):
-        self.ball = Ball()
+    def _on_new_ball(self, ball: Ball):
         #TODO make an event that auto updates ball in managers.
-        self.display_manager.ball = self.ball
-        self.position_manager.ball = self.ball
-        self.collision_manager.ball = self.ball
+        self.ball = ball
+        self.display_manager.ball = ball
+        self.position_manager.ball = ball
                     
+    def _set_render_fraction(self, fraction: float):
+        self.ball.render_fraction = fraction
+
     def _tick_clock(self):
-        #tick(framerate) keeps game at consistent framerate.
+        #tick(framerate) caps framerate. Simulation speed doesn't depend on it.
         self.clock.tick(self.framerate)
         self.frame_num += 1
-        self.frames_since_speed += 1
-        self.frames_no_ball += 1
-        self.score += 1
+
+
+class MultiBallGameplay(Gameplay):
+    """
+    manages events while in GAMEPLAY mode with constants.MULTI_BALL_MODE.
+
+    The rules are played by a MultiBallSimulation. Balls are kept in
+    ball_store and moved, collided and drawn in batches, so managers keep the
+    same store for the whole game.
+    """
+    def __init__(self,
+                 ball_store: BallStore,
+                 paddle: Paddle,
+                 borders: Borders,
+                 position_manager: PositionManager,
+                 display_manager: DisplayManager,
+                 sound_manager: SoundManager,
+                 collision_manager: CollisionManager,
+                 high_score_manager: HighScoreManager):
+        self.ball_store = ball_store
+        super().__init__(ball=None,
+                         paddle=paddle,
+                         borders=borders,
+                         position_manager=position_manager,
+                         display_manager=display_manager,
+                         sound_manager=sound_manager,
+                         collision_manager=collision_manager,
+                         high_score_manager=high_score_manager)
+
+    def manage_events(self) -> Mode:
+        self.simulation.start()
+        return super().manage_events()
+
+    def _init_simulation(self) -> MultiBallSimulation:
+        return MultiBallSimulation(self.paddle,
+                                   self.borders,
+                                   self.ball_store,
+                                   collisions=self.collision_manager)
+
+    def _on_new_ball(self, ball: Ball):
+        #balls are in ball_store, which managers already have
+        pass
+
+    def _set_render_fraction(self, fraction: float):
+        self.ball_store.render_fraction = fraction
 
 
 class HighScores(ModeManager):
@@ -159,13 +251,16 @@ class HighScores(ModeManager):
 
     def manage_events(self):
         entries = self.high_score_manager.get_entries()
-        #just a still image since it's only updated once!
-        self.display_manager.high_score_update(entries)
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        return Mode.MAIN_MENU
+        with self._allow_input_events_only():
+            while True:
+                #just a still image, so it's only redrawn on input or timer
+                self.display_manager.high_score_update(entries)
+                for event in self._wait_for_events(constants.IDLE_REDRAW_INTERVAL_MS):
+                    if event.type == pygame.QUIT:
+                        return Mode.EXIT
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            return Mode.MAIN_MENU
 
 
 class Exit(ModeManager):
@@ -174,9 +269,21 @@ class Exit(ModeManager):
 
     def manage_events(self):
         self.hand_cam.stop_stream()
+        self.hand_cam.hand_detector.close()
+        self._report_latency()
         pygame.quit()
         sys.exit()
 
+    def _report_latency(self):
+        """
+        prints latency report and writes trace if latency tracing is enabled
+        """
+        tracer = self.hand_cam.hand_detector.tracer
+        if tracer:
+            print(tracer.get_report())
+            if constants.LATENCY_TRACE_PATH:
+                tracer.export_chrome_trace(constants.LATENCY_TRACE_PATH)
+
 
 class MainMenu(ModeManager):
     """
@@ -188,10 +295,14 @@ class MainMenu(ModeManager):
         self.button_num = 0
 
     def manage_events(self):
-        while True:
-            self.display_manager.menu_update(self.button_num)
-            for event in pygame.event.get():
-                    if event.type == pygame.KEYDOWN:
+        with self._allow_input_events_only():
+            while True:
+                #menu is redrawn on input or timer
+                self.display_manager.menu_update(self.button_num)
+                for event in self._wait_for_events(constants.IDLE_REDRAW_INTERVAL_MS):
+                    if event.type == pygame.QUIT:
+                        return Mode.EXIT
+                    elif event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_DOWN:
                             #make sure user can only select button that exists
                             if self.button_num < MainMenu.NUM_MENU_BUTTONS:
@@ -219,22 +330,26 @@ class HighScoreEntry(ModeManager):
         self.name = ""
 
     def manage_events(self):
-        while True:
-            self.display_manager.high_score_entry_update(self.name)
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        #on RETURN press, submits score
-                        self.high_score_manager.write_new_high_score(
-                            self.name, self.score)
-                        return
-                    elif event.key == pygame.K_BACKSPACE:
-                        #removes character on backspace
-                        self.name = self.name[:-1]
-                    else:
-                        #adds character
-                        if len(self.name) <= constants.NAME_CHARACTER_LIMIT:
-                            self.name += event.unicode
+        with self._allow_input_events_only():
+            while True:
+                #redrawn on input, and at IDLE_CAM_PREVIEW_FPS for camera preview
+                self.display_manager.high_score_entry_update(self.name)
+                for event in self._wait_for_events(int(1000/constants.IDLE_CAM_PREVIEW_FPS)):
+                    if event.type == pygame.QUIT:
+                        return Mode.EXIT
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_RETURN:
+                            #on RETURN press, submits score
+                            self.high_score_manager.write_new_high_score(
+                                self.name, self.score)
+                            return Mode.PLAY_AGAIN
+                        elif event.key == pygame.K_BACKSPACE:
+                            #removes character on backspace
+                            self.name = self.name[:-1]
+                        else:
+                            #adds character
+                            if len(self.name) <= constants.NAME_CHARACTER_LIMIT:
+                                self.name += event.unicode
 
 
 class PlayAgain(ModeManager):
@@ -246,24 +361,28 @@ class PlayAgain(ModeManager):
         self.try_again = ""
 
     def manage_events(self):
-        while True:
-            self.display_manager.play_again_update(self.try_again)
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        #on enter press, if y or Y is entered, start new game
-                        if self.try_again in ["y", "Y"]:
-                            return Mode.GAMEPLAY
-                        #on enter press, if y or Y is entered, start new game
-                        elif self.try_again in ["n", "N"]:
-                            return Mode.MAIN_MENU
-                        #if neither y nor were entered, reset prompt
+        with self._allow_input_events_only():
+            while True:
+                #redrawn on input, and at IDLE_CAM_PREVIEW_FPS for camera preview
+                self.display_manager.play_again_update(self.try_again)
+                for event in self._wait_for_events(int(1000/constants.IDLE_CAM_PREVIEW_FPS)):
+                    if event.type == pygame.QUIT:
+                        return Mode.EXIT
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_RETURN:
+                            #on enter press, if y or Y is entered, start new game
+                            if self.try_again in ["y", "Y"]:
+                                return Mode.GAMEPLAY
+                            #on enter press, if y or Y is entered, start new game
+                            elif self.try_again in ["n", "N"]:
+                                return Mode.MAIN_MENU
+                            #if neither y nor were entered, reset prompt
+                            else:
+                                self.try_again = ""
+                        elif event.key == pygame.K_BACKSPACE:
+                            #removes character on backspace
+                            self.try_again = self.try_again[:-1]
                         else:
-                            self.try_again = ""
-                    elif event.key == pygame.K_BACKSPACE:
-                        #removes character on backspace
-                        self.try_again = self.try_again[:-1]
-                    else:
-                        #addes character
-                        self.try_again += event.unicode
+                            #addes character
+                            self.try_again += event.unicode
                         
\ No newline at end of file
@@ -1,14 +1,18 @@
 """
 This module contains the PositionManager class which manages object
-positions.
+positions. Balls are moved by the game's Simulation.
 """
 
+import time
+
 from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
 from game.assets.border import Borders
 from game.assets.paddle import Paddle
 from game.managers.collision_manager import CollisionManager
 from utils import constants
 from utils.hand_detection import HandDetector
+from utils.paddle_predictor import PaddlePredictor
 
 
 class PositionManager(object):
@@ -31,6 +35,13 @@ class PositionManager(object):
 
     collision_manager: CollisionManager
         CollisionManager instance used by game
+
+    predictor: PaddlePredictor | None
+        if not None, used to predict hand position at the time the frame is
+        displayed, compensating for detection latency
+
+    ball_store: BallStore | None
+        balls of multi-ball mode
     """
 
     def __init__(self,
@@ -38,84 +49,62 @@ class PositionManager(object):
                  paddle: Paddle,
                  ball: Ball,
                  borders: Borders,
-                 collision_manager: CollisionManager):
+                 collision_manager: CollisionManager,
+                 predictor: PaddlePredictor = None,
+                 ball_store: BallStore = None):
         self.hand_detector = hand_detector
         self.paddle = paddle
         self.ball = ball
         self.borders = borders
         self.collision_manager = collision_manager
+        self.predictor = predictor
+        self.ball_store = ball_store
+        #capture time of last result given to predictor
+        self._predictor_time: float = None
 
-    def update(self, should_update_ball: bool =True):
+    def update_paddle(self):
         """
-        updates game object positions
+        updates paddle position from hand detection. Called once per rendered
+        frame, since hand position doesn't depend on simulation steps.
         """
         self._update_paddle_position()
-        self._update_embryo_position(should_update_ball)
-        self._detect_collisions(should_update_ball)
-    
-    def is_ball_out(self):
-        """
-        returns true if ball position + radius (so it's visually completely
-        off screen) is negative
-        """
-        if self.ball:
-            return self.ball.x + self.ball.radius <= 0
-        
-    def _detect_collisions(self, should_detect_collision: bool):
-        """
-        detect all ball collision events
-        """
-        if should_detect_collision:
-            self._detect_paddle()
-            self._detect_top_border()
-            self._detect_back_border()
-            self._detect_bot_border()
-        
-    def _detect_paddle(self):
-        top_coords = self.paddle.top_coords
-        if (self.ball.x-self.ball.radius - top_coords[0]) <= 1:
-            top_y = self.paddle.y-self.ball.radius
-            bot_y = self.paddle.y+self.paddle.height+self.ball.radius
-            if top_y < self.ball.y < bot_y:
-                self.collision_manager.paddle_collision()
-
-    def _detect_top_border(self):
-        border_y = self.borders.top.y + self.borders.top.height
-        embryo_y = self.ball.y - self.ball.radius
-        if embryo_y - border_y <= 1:
-            self.collision_manager.top_border_collision()
-
-    def _detect_back_border(self):
-        border_x = self.borders.back.x
-        embryo_x = self.ball.x + self.ball.radius
-        if border_x - embryo_x <= 1:
-            self.collision_manager.back_border_collision()
-
-    def _detect_bot_border(self):
-        border_y = self.borders.bot.y
-        embryo_y = self.ball.y + self.ball.radius
-        if border_y - embryo_y <= 1:
-            self.collision_manager.bottom_border_collision()
+        if self.hand_detector.tracer:
+            self.hand_detector.tracer.mark(self.hand_detector.result_frame_id, "position")
 
     def _update_paddle_position(self):
         """
         updates paddle position with hand coordinates
         """
-        hand_coords = self.hand_detector.get_norm_coords()
-        #get_coords() returns None if no detector results
-        if hand_coords:
+        if self.predictor:
+            hand_y = self._get_predicted_hand_y()
+        else:
+            hand_coords = self.hand_detector.get_norm_coords()
+            #get_coords() returns None if no detector results
+            hand_y = hand_coords[1] if hand_coords else None
+        if hand_y is not None:
             #scaling so that user doesn't have to use full webcam field of view
             #to move paddle
             scaling = constants.HAND_POSITION_SCALING
             #offset to correct for scaling
             offset = constants.HAND_COORDS_OFFSET
-            y = (hand_coords[1]*constants.GAME_Y_SIZE)*scaling + offset
+            y = (hand_y*constants.GAME_Y_SIZE)*scaling + offset
             self.paddle.y = y
 
-    def _update_embryo_position(self, should_update_ball):
+    def _get_predicted_hand_y(self) -> float:
         """
-        updates embryo position
+        returns normalized hand y coordinate predicted for the time the frame
+        is displayed, or None if there's no hand.
         """
-        if self.ball and should_update_ball:
-            self.ball.x += self.ball.x_vel
-            self.ball.y += self.ball.y_vel
+        #predictor smooths by itself, so use raw coords
+        hand_coords = self.hand_detector.get_norm_coords(is_interpolated=False)
+        if not hand_coords:
+            self.predictor.reset()
+            self._predictor_time = None
+            return None
+        result_time = self.hand_detector.result_time
+        #only update predictor when there's a new result
+        if result_time is not None and result_time != self._predictor_time:
+            self.predictor.update(hand_coords[1], result_time)
+            self._predictor_time = result_time
+        display_time = time.perf_counter() + constants.PREDICTOR_RENDER_LEAD_S
+        return self.predictor.predict(display_time)
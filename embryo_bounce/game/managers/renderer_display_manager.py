@@ -0,0 +1,185 @@
+"""
+This module contains the RendererDisplayManager class which draws the game
+with SDL2's 2D renderer instead of software surface blits
+"""
+
+from collections import OrderedDict
+
+import pygame
+from pygame._sdl2.video import Renderer, Texture, Window
+
+from game.assets.asset_cache import asset_cache
+from game.assets.paddle import Paddle
+from game.assets.ball import Ball
+from game.simulation.ball_store import BallStore
+from game.assets.border import Borders
+from game.managers.display_manager import DisplayManager
+from game.managers.draw_manager import DrawManager
+from utils.hand_detection import HandDetector
+from utils.camera import HandCam
+from utils import constants
+
+
+class TextureCache(object):
+    """
+    Least recently used cache of textures uploaded from surfaces, so each
+    image is only uploaded once.
+
+    Constructor Parameters:
+
+    renderer: Renderer
+        renderer that textures are created for
+
+    max_size: int
+        max number of textures kept
+    """
+    def __init__(self, renderer: Renderer, max_size: int):
+        self.renderer = renderer
+        self.max_size = max_size
+        #id(surface): (surface, texture)
+        self._textures: OrderedDict[int, tuple[pygame.Surface, Texture]] = OrderedDict()
+
+    def get(self, surface: pygame.Surface) -> Texture:
+        """
+        returns texture of surface. Surface shouldn't be changed after its
+        texture is created.
+        """
+        key = id(surface)
+        entry = self._textures.get(key)
+        #id of a garbage collected surface can be reused, so check surface
+        if entry is not None and entry[0] is surface:
+            self._textures.move_to_end(key)
+            return entry[1]
+        texture = Texture.from_surface(self.renderer, surface)
+        self._textures[key] = (surface, texture)
+        while len(self._textures) > self.max_size:
+            self._textures.popitem(last=False)
+        return texture
+
+
+class RendererDisplayManager(DisplayManager):
+    """
+    DisplayManager that shows the game with a pygame._sdl2.video Renderer.
+
+    During gameplay, the game background with borders is a static texture,
+    the ball and paddle are textured quads scaled and rotated by the renderer,
+    and the HUD and camera preview are streamed into textures only where they
+    changed. Other screens are drawn on a software canvas by DisplayManager
+    and uploaded when shown, since they're only redrawn on input.
+
+    The game is drawn at self.size and scaled to the window by the renderer,
+    so with constants.RENDERER_FULLSCREEN the window covers the desktop
+    without any CPU rescaling. If there's no GPU, SDL's software renderer is
+    used, so it also runs headless.
+
+    Constructor Parameters:
+
+    Same as DisplayManager
+
+    Implements:
+
+    DisplayManager
+    """
+    def __init__(self,
+                 hand_detector: HandDetector,
+                 hand_cam: HandCam,
+                 paddle: Paddle,
+                 ball: Ball,
+                 borders: Borders,
+                 ball_store: BallStore = None):
+        super().__init__(hand_detector, hand_cam, paddle, ball, borders, ball_store)
+        self.textures = TextureCache(self.renderer, constants.SPRITE_CACHE_SIZE)
+        self.canvas_texture = Texture(self.renderer, self.size, streaming=True)
+        self.hud_texture = Texture(self.renderer, self.hud_rect.size, streaming=True)
+        self.cam_texture = Texture(self.renderer, self.cam_size, streaming=True)
+        self.game_texture = Texture.from_surface(self.renderer, self.game_static_surface)
+
+    def _init_display(self) -> pygame.Surface:
+        """
+        creates window and renderer, and returns software canvas that screens
+        other than gameplay are drawn on
+        """
+        self.window = Window(size=self.size, fullscreen_desktop=constants.RENDERER_FULLSCREEN)
+        #-1 uses a GPU renderer if there is one, else the software renderer
+        self.renderer = Renderer(self.window, accelerated=-1)
+        self.renderer.logical_size = self.size
+        return pygame.Surface(self.size)
+
+    def _present(self, rects: list[pygame.Rect] = None):
+        """
+        uploads canvas (or only rects of it) and shows it
+        """
+        if rects is None:
+            self.canvas_texture.update(self.display)
+        else:
+            for rect in rects:
+                if rect.width and rect.height:
+                    self.canvas_texture.update(self.display.subsurface(rect), rect)
+        self.renderer.clear()
+        self.canvas_texture.draw()
+        self.renderer.present()
+
+    def _render_game(self, lives: int, score: int):
+        """
+        draws gameplay display with textures and shows it
+        """
+        if self._is_cam_updated or self._is_full_redraw:
+            self.cam_texture.update(self.cam_surface)
+        if (lives, score) != self._hud_state or self._is_full_redraw:
+            self._update_hud_texture(lives, score)
+        self._is_full_redraw = False
+        #HUD and game texture cover whole display, so no clear is needed
+        self.hud_texture.draw(dstrect=self.hud_rect)
+        self.cam_texture.draw(dstrect=pygame.Rect(self.cam_coords, self.cam_size))
+        self.game_texture.draw(srcrect=pygame.Rect((0, 0), self.game_rect.size),
+                               dstrect=self.game_rect)
+        #viewport clips ball and paddle to game area, like game_surface does
+        self.renderer.set_viewport(self.game_rect)
+        if self.ball:
+            self._draw_ball()
+        if self.ball_store:
+            self._draw_balls()
+        self._draw_paddle()
+        self.renderer.set_viewport(None)
+        self.renderer.present()
+
+    def _update_hud_texture(self, lives: int, score: int):
+        """
+        draws HUD on bg_surface and uploads regions that changed
+        """
+        rects = self._hud_rects
+        self._draw_hud(lives, score, self._is_full_redraw)
+        if self._is_full_redraw:
+            rects = [self.hud_rect]
+        else:
+            rects = rects + self._hud_rects
+        for rect in rects:
+            if rect.width and rect.height:
+                #hud_rect is at (0, 0), so rects are the same in texture
+                self.hud_texture.update(self.bg_surface.subsurface(rect), rect)
+
+    def _draw_ball(self):
+        diameter = self.ball.radius*2
+        x, y = self.ball.get_render_coords()
+        rect = pygame.Rect(int(x - self.ball.radius), int(y - self.ball.radius), diameter, diameter)
+        self.textures.get(self.ball.image).draw(dstrect=rect)
+
+    def _draw_balls(self):
+        texture = self.textures.get(asset_cache.load(constants.EMBRYO_IMAGE_PATH))
+        x, y = self.ball_store.get_render_coords()
+        radius = self.ball_store.radius[:self.ball_store.count]
+        for left, top, diameter in zip((x - radius).astype(int).tolist(),
+                                       (y - radius).astype(int).tolist(),
+                                       (radius*2).astype(int).tolist()):
+            texture.draw(dstrect=(left, top, diameter, diameter))
+
+    def _draw_paddle(self):
+        """
+        draws paddle image rotated to stand upright in paddle's rect
+        """
+        #image is drawn lying down at paddle's center and then rotated around
+        #its center. SDL angles are clockwise and pygame's counterclockwise.
+        rect = pygame.Rect(0, 0, self.paddle.height, self.paddle.width)
+        rect.center = pygame.Rect(self.paddle.get_coords(),
+                                  (self.paddle.width, self.paddle.height)).center
+        self.textures.get(self.paddle.image).draw(dstrect=rect, angle=-DrawManager.IMAGE_ANGLE)
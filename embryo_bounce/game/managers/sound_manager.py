@@ -4,6 +4,7 @@ This module contains the SoundManager class, which controls sound in the game
 
 import pygame
 
+from game.assets.asset_cache import asset_cache
 from game.mode import Mode
 from utils import constants
 
@@ -18,8 +19,8 @@ class SoundManager(object):
         current mode of game
     """
     def __init__(self, mode: Mode):
-        self.paddle_sound = pygame.mixer.Sound(constants.PADDLE_SOUND_PATH)
-        self.mistake_sound = pygame.mixer.Sound(constants.MISTAKE_SOUND_PATH)
+        self.paddle_sound = asset_cache.load_sound(constants.PADDLE_SOUND_PATH)
+        self.mistake_sound = asset_cache.load_sound(constants.MISTAKE_SOUND_PATH)
         self.mode = mode
     
     def update_music(self, mode: Mode):
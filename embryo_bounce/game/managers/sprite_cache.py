@@ -0,0 +1,67 @@
+"""
+This module contains the SpriteCache class which keeps scaled and rotated
+copies of images so they aren't transformed every frame.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+
+class SpriteCache(object):
+    """
+    Least recently used cache of transformed images, keyed by source image,
+    size and angle. Cached sprites are converted to the display format once
+    a display mode is set, so blitting them doesn't convert pixels either.
+
+    Constructor Parameters:
+
+    max_size: int
+        max number of sprites kept. Least recently used sprite is evicted
+        when cache is full.
+
+    instance attributes:
+
+    self.hits: int
+        number of get() calls that returned a cached sprite
+
+    self.misses: int
+        number of get() calls that had to transform image
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        #(id(image), size, angle): (image, sprite)
+        self._sprites: OrderedDict[tuple, tuple[pygame.Surface, pygame.Surface]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def get(self, image: pygame.Surface, size: tuple[int, int], angle: float = 0) -> pygame.Surface:
+        """
+        returns image scaled to size and then rotated by angle in degrees.
+        Returned surface is shared, so it shouldn't be modified.
+        """
+        key = (id(image), size, angle)
+        entry = self._sprites.get(key)
+        #id of a garbage collected image can be reused by a new image, so
+        #check that entry is for this image
+        if entry is not None and entry[0] is image:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        sprite = pygame.transform.scale(image, size)
+        if angle:
+            sprite = pygame.transform.rotate(sprite, angle)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        self._sprites[key] = (image, sprite)
+        self._sprites.move_to_end(key)
+        while len(self._sprites) > self.max_size:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self._sprites.clear()
@@ -0,0 +1,69 @@
+"""
+This module contains the TextCache class which keeps loaded fonts and
+rendered text so text isn't rendered every frame.
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+
+class TextCache(object):
+    """
+    Registry of fonts by size and least recently used cache of rendered text
+    surfaces keyed by text, font size and color.
+
+    Constructor Parameters:
+
+    max_size: int
+        max number of rendered text surfaces kept. Least recently used
+        surface is evicted when cache is full.
+
+    instance attributes:
+
+    self.hits: int
+        number of render() calls that returned a cached surface
+
+    self.misses: int
+        number of render() calls that had to render text
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._fonts: dict[int, pygame.font.Font] = {}
+        self._surfaces: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def get_font(self, font_size: int) -> pygame.font.Font:
+        """
+        returns default font at font_size, loading it on first use
+        """
+        font = self._fonts.get(font_size)
+        if font is None:
+            font = pygame.font.Font(None, font_size)
+            self._fonts[font_size] = font
+        return font
+
+    def render(self, text: str, font_size: int, color: tuple[int, int, int]) -> pygame.Surface:
+        """
+        returns antialiased surface of text. Returned surface is shared, so it
+        shouldn't be modified.
+        """
+        key = (text, font_size, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = self.get_font(font_size).render(text, True, color)
+        self._surfaces[key] = surface
+        while len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
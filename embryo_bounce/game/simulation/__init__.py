@@ -0,0 +1,4 @@
+from game.simulation.ball_store import BallStore
+from game.simulation.bodies import BallBody, PaddleBody
+from game.simulation.physics import CollisionResponse
+from game.simulation.simulation import Simulation, MultiBallSimulation, SimulationSettings
@@ -0,0 +1,128 @@
+"""
+This module contains the BallStore class which holds the balls of the
+multi-ball game mode as arrays
+"""
+
+import numpy as np
+
+
+class BallStore(object):
+    """
+    Struct-of-arrays store of balls, so that all of them can be moved,
+    collided and drawn with batched array operations instead of one Python
+    object per ball. Balls are kept in the first count elements of each
+    array, and removing balls moves the rest down so they stay contiguous.
+
+    Units are the same as Ball's.
+
+    Constructor Parameters:
+
+    capacity: int
+        max number of balls
+
+    instance attributes:
+
+    self.x, self.y: np.ndarray
+        positions in pixels
+
+    self.prev_x, self.prev_y: np.ndarray
+        positions in pixels before last simulation step
+
+    self.x_vel, self.y_vel: np.ndarray
+        velocities, in pixels/simulation step
+
+    self.speed: np.ndarray
+        speeds, in pixels/simulation step
+
+    self.radius: np.ndarray
+        radii in pixels
+
+    self.count: int
+        number of balls in store
+
+    self.render_fraction: float = 1.0
+        fraction of simulation step between previous and current positions
+        that balls are drawn at
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)
+        self.prev_y = np.zeros(capacity)
+        self.x_vel = np.zeros(capacity)
+        self.y_vel = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.radius = np.zeros(capacity)
+        self.count = 0
+        self.render_fraction: float = 1.0
+        self._arrays = [self.x, self.y, self.prev_x, self.prev_y,
+                        self.x_vel, self.y_vel, self.speed, self.radius]
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x: float, y: float, speed: float, angle: float, radius: float = 20) -> bool:
+        """
+        adds ball at (x, y) moving at speed in direction angle, in radians
+        counterclockwise from the positive x axis. Returns False if store is
+        full.
+        """
+        if self.count == self.capacity:
+            return False
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.x_vel[i] = speed*np.cos(angle)
+        self.y_vel[i] = -speed*np.sin(angle)
+        self.speed[i] = speed
+        self.radius[i] = radius
+        self.count += 1
+        return True
+
+    def remove(self, mask: np.ndarray):
+        """
+        removes balls where mask, of length count, is True
+        """
+        keep = ~mask
+        num_kept = int(np.count_nonzero(keep))
+        for array in self._arrays:
+            array[:num_kept] = array[:self.count][keep]
+        self.count = num_kept
+
+    def clear(self):
+        self.count = 0
+
+    def set_speed(self, value: float):
+        """
+        sets speed of every ball, keeping their directions
+        """
+        n = self.count
+        scale = value/self.speed[:n]
+        self.x_vel[:n] *= scale
+        self.y_vel[:n] *= scale
+        self.speed[:n] = value
+
+    def save_coords(self):
+        """
+        saves current positions as previous positions, before they're updated
+        """
+        self.prev_x[:self.count] = self.x[:self.count]
+        self.prev_y[:self.count] = self.y[:self.count]
+
+    def get_out_mask(self) -> np.ndarray:
+        """
+        returns mask of balls that are completely off the left of the screen
+        """
+        return self.x[:self.count] + self.radius[:self.count] <= 0
+
+    def get_render_coords(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        returns (x, y) arrays of positions interpolated between previous and
+        current positions by render_fraction
+        """
+        n = self.count
+        fraction = self.render_fraction
+        x = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n])*fraction
+        y = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n])*fraction
+        return (x, y)
@@ -0,0 +1,127 @@
+"""
+This module plays many seeded headless games across processes and reports
+their statistics, so gameplay settings can be compared without a webcam
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+
+import numpy as np
+
+from game.assets.border import Borders
+from game.simulation.bodies import PaddleBody
+from game.simulation.policies import InterceptPolicy, PaddlePolicy, TrackingPolicy
+from game.simulation.simulation import Simulation, SimulationSettings
+from utils import constants
+
+#paddle policies by name
+POLICIES: dict[str, type[PaddlePolicy]] = {"intercept": InterceptPolicy,
+                                           "tracking": TrackingPolicy}
+
+
+class GameResult(object):
+    """
+    statistics of one headless game
+
+    Constructor Parameters:
+
+    seed: int
+        seed game was played with
+
+    score: int
+        final score
+
+    steps: int
+        simulation steps played
+
+    rally_lengths: list[int]
+        paddle hits of each ball that went out
+
+    death_speeds: list[float]
+        speed in pixels/simulation step of each ball when it went out
+    """
+    def __init__(self,
+                 seed: int,
+                 score: int,
+                 steps: int,
+                 rally_lengths: list[int],
+                 death_speeds: list[float]):
+        self.seed = seed
+        self.score = score
+        self.steps = steps
+        self.rally_lengths = rally_lengths
+        self.death_speeds = death_speeds
+
+
+def play_game(seed: int,
+              policy_name: str = "intercept",
+              settings: SimulationSettings = None,
+              max_steps: int = constants.SIMULATION_MAX_STEPS) -> GameResult:
+    """
+    plays one game with paddle moved by policy seeded with seed, until it's
+    over or max_steps have been played
+    """
+    simulation = Simulation(PaddleBody(), Borders(), settings=settings)
+    policy = POLICIES[policy_name](seed=seed)
+    while not simulation.is_over and simulation.step_num < max_steps:
+        policy.update(simulation)
+        simulation.step()
+    return GameResult(seed,
+                      simulation.score,
+                      simulation.step_num,
+                      simulation.rally_lengths,
+                      simulation.death_speeds)
+
+
+def run_games(num_games: int,
+              policy_name: str = "intercept",
+              settings: SimulationSettings = None,
+              seed: int = 0,
+              workers: int = None,
+              max_steps: int = constants.SIMULATION_MAX_STEPS) -> list[GameResult]:
+    """
+    plays num_games games with seeds seed to seed + num_games - 1 across
+    workers processes, or one per CPU if None, and returns their results in
+    seed order
+    """
+    workers = workers or os.cpu_count()
+    play = partial(play_game, policy_name=policy_name, settings=settings, max_steps=max_steps)
+    seeds = range(seed, seed + num_games)
+    #games are short, so they're sent to workers in chunks
+    chunksize = max(1, num_games//(workers*4))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(play, seeds, chunksize=chunksize))
+
+
+def get_report(results: list[GameResult], max_steps: int = constants.SIMULATION_MAX_STEPS) -> str:
+    """
+    returns distributions of score, rally length and speed at death of
+    results as text
+    """
+    scores = np.array([result.score for result in results])
+    rallies = np.array([length for result in results for length in result.rally_lengths])
+    speeds = np.array([speed for result in results for speed in result.death_speeds])
+    num_unfinished = sum(result.steps >= max_steps for result in results)
+    lines = [f"games: {len(results)}, stopped at max steps: {num_unfinished}",
+             _get_distribution("score", scores),
+             _get_distribution("rally length (paddle hits)", rallies),
+             _get_distribution("speed at death (px/step)", speeds),
+             "score histogram:"]
+    lines.extend(_get_histogram(scores))
+    return "\n".join(lines)
+
+
+def _get_distribution(name: str, values: np.ndarray) -> str:
+    if not len(values):
+        return f"{name}: none"
+    p10, p50, p90 = np.percentile(values, [10, 50, 90])
+    return (f"{name}: mean {values.mean():.1f}, p10 {p10:.1f}, median {p50:.1f}, "
+            f"p90 {p90:.1f}, max {values.max():.1f}")
+
+
+def _get_histogram(values: np.ndarray, bins: int = 10, width: int = 40) -> list[str]:
+    counts, edges = np.histogram(values, bins=bins)
+    scale = width/max(counts.max(), 1)
+    return [f"{edges[i]:8.0f}-{edges[i + 1]:<8.0f} {'#'*int(round(count*scale))} {count}"
+            for i, count in enumerate(counts)]
@@ -0,0 +1,184 @@
+"""
+This module contains the BallBody and PaddleBody classes, the physical state
+of the ball and paddle without their images, so they can be simulated
+without pygame
+"""
+
+from utils import constants
+
+
+class BallBody(object):
+    """
+    physical state of ball.
+
+    instance attributes:
+
+    self.x: int
+        x position in pixels
+
+    self.y: int
+        y position in pixels
+
+    self.speed: int
+        ball speed, in pixels/simulation step
+
+    self.x_vel: int
+        x velocity, in pixels/simulation step
+
+    self.y_vel: int = 0
+        y velocity, in pixels/simulation step
+
+    self.prev_x: int
+        x position in pixels before last simulation step
+
+    self.prev_y: int
+        y position in pixels before last simulation step
+
+    self.render_fraction: float = 1.0
+        fraction of simulation step between previous and current position
+        that ball is drawn at
+
+    self.radius: int = 20
+        radius of ball in pixels
+    """
+    _MIN_SPEED = 1
+    def __init__(self):
+        self.x: int = 400
+        self.y: int = 300
+        self.prev_x: int = self.x
+        self.prev_y: int = self.y
+        self.render_fraction: float = 1.0
+        self._speed: int = 5
+        self.x_vel: int = -self.speed
+        self.y_vel: int = 0
+        self.radius: int = 20
+
+    @property
+    def speed(self):
+        return self._speed
+    
+    @speed.setter
+    def speed(self, value):
+        x_fact = self.x_vel/self.speed
+        y_fact = self.y_vel/self.speed
+        self.x_vel = int(x_fact*value)
+        self.y_vel = int(y_fact*value)
+        self._speed = value
+
+    def get_coords(self):
+        """
+        returns coords as (x, y) tuple
+        """
+        return (self.x, self.y)
+
+    def get_render_coords(self):
+        """
+        returns coords as (x, y) tuple, interpolated between previous and
+        current position by render_fraction
+        """
+        fraction = self.render_fraction
+        return (self.prev_x + (self.x - self.prev_x)*fraction,
+                self.prev_y + (self.y - self.prev_y)*fraction)
+
+    def save_coords(self):
+        """
+        saves current position as previous position, before it's updated
+        """
+        self.prev_x = self.x
+        self.prev_y = self.y
+
+    def set_pos_from_coords(self, coords: tuple[float, float]):
+        """
+        arguments:
+
+        coords: tuple[float, float]
+            normalized coords (x, y)
+        """
+        if coords:
+            self.x , self.y = coords
+
+
+class PaddleBody(object):
+    """
+    physical state of paddle.
+
+    x: int
+        x position in pixels
+
+    y: int
+        y position in pixels
+
+    height: int
+        height in pixels
+
+    width: int:
+        width in pixels
+    """
+    def __init__(self):
+        self.x: int = 0
+        self._y: int = constants.GAME_Y_SIZE/2
+        self.height = 80
+        self.width = 20
+
+    @property
+    def y(self):
+        return self._y
+    
+    #so that paddle position can't be outside of game boundary
+    @y.setter
+    def y(self, value):
+        if value <= self.min_y:
+            self._y = self.min_y
+        elif self.max_y <= value:
+            self._y = self.max_y
+        else:
+            self._y = value
+            
+    @property
+    def max_y(self):
+        return constants.GAME_Y_SIZE - self.height
+    
+    @property
+    def min_y(self):
+        return 0
+    
+    #coords of top right corner
+    @property
+    def top_coords(self):
+        return (self.width+self.x, self.y)
+    
+    #coords of center right
+    @property
+    def cent_coords(self):
+        return (self.width+self.x, self.height/2+self.y)
+    
+    #coords of bottom right corner
+    @property
+    def bot_coords(self):
+        return (self.width+self.x, self.height+self.y)
+    
+    def set_pos_from_norm_coords(self, coords: tuple[float, float]):
+        """
+        arguments:
+
+        coords: tuple[float, float]
+            normalized coords (x,y)
+        """
+        if coords:
+            x = int(constants.GAME_X_SIZE*coords[0])
+            y = int(constants.GAME_Y_SIZE*coords[1])
+            self.x = x
+            self.y = y
+
+    def set_pos_from_coords(self, coords: tuple[float, float]):
+        """
+        arguments:
+
+        coords: tuple[float, float]
+            normalized coords (x,y)
+        """
+        if coords:
+            self.x, self.y = coords
+
+    def get_coords(self):
+        return (self.x, self.y)
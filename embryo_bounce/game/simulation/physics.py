@@ -0,0 +1,240 @@
+"""
+This module contains the CollisionResponse class, which bounces balls off
+the paddle and borders, and functions that move balls with swept collision
+detection. They don't use pygame, so they're shared by the game and
+headless simulations.
+"""
+
+import numpy as np
+
+from game.assets.border import Borders
+from game.simulation.ball_store import BallStore
+from game.simulation.bodies import BallBody, PaddleBody
+from utils import constants
+from utils.swept_collision import get_time_of_impact, get_times_of_impact
+
+
+class CollisionResponse(object):
+    """
+    Changes ball velocities when balls collide with objects.
+
+    Methods named *_collisions() handle collisions of the balls at given
+    indices of ball_store at once, the same way as the single ball ones.
+
+    Constructor Parameters:
+
+    ball: BallBody
+        ball that single ball collisions change
+
+    paddle: PaddleBody
+        paddle balls bounce off
+
+    borders: Borders
+        borders balls bounce off
+
+    ball_store: BallStore | None
+        balls that *_collisions() change
+
+    angle_range: float
+        range in radians of angles ball can bounce off paddle at
+    """
+    #angle range of ball-paddle collision
+    ANGLE_RANGE = constants.PADDLE_ANGLE_RANGE
+    #min angle from ball-paddle-collision
+    MIN_ANGLE = -ANGLE_RANGE/2
+    #max angle from ball-paddle-collision
+    MAX_ANGLE = ANGLE_RANGE/2
+    def __init__(self,
+                 ball: BallBody,
+                 paddle: PaddleBody,
+                 borders: Borders,
+                 ball_store: BallStore = None,
+                 angle_range: float = ANGLE_RANGE):
+        self.ball = ball
+        self.paddle = paddle
+        self.borders = borders
+        self.ball_store = ball_store
+        self.angle_range = angle_range
+        #number of times balls have hit paddle
+        self.paddle_hits = 0
+
+    def get_colliders(self) -> list:
+        """
+        returns (object, handler of ball collisions with it) for each object
+        ball can hit, as used by move_ball()
+        """
+        return [(self.paddle, self.paddle_collision),
+                (self.borders.top, self.top_border_collision),
+                (self.borders.back, self.back_border_collision),
+                (self.borders.bot, self.bottom_border_collision)]
+
+    def get_store_colliders(self) -> list:
+        """
+        returns (object, handler of ball_store collisions with it) for each
+        object balls can hit, as used by move_balls()
+        """
+        return [(self.paddle, self.paddle_collisions),
+                (self.borders.top, self.top_border_collisions),
+                (self.borders.back, self.back_border_collisions),
+                (self.borders.bot, self.bottom_border_collisions)]
+
+    def top_border_collision(self):
+        """
+        called when ball-top border collision occurs
+        """
+        #on top and bottom border collision, only vertical velocity changes.
+        self.ball.y_vel = -self.ball.y_vel
+
+    def back_border_collision(self):
+        """
+        called when ball-back border collision occurs
+        """
+        #on back border, only horizantal velocity changes.
+        self.ball.x_vel = -self.ball.x_vel
+
+    def bottom_border_collision(self):
+        """
+        called when ball-bottom border collision occurs
+        """
+        self.ball.y_vel = -self.ball.y_vel
+
+    def paddle_collision(self):
+        """
+        called when ball-paddle collision occurs
+        """
+        self.ball.x_vel, self.ball.y_vel = self._get_paddle_bounce(self.ball.y, self.ball.speed)
+        self.paddle_hits += 1
+
+    def top_border_collisions(self, indices: np.ndarray):
+        self.ball_store.y_vel[indices] *= -1
+
+    def back_border_collisions(self, indices: np.ndarray):
+        self.ball_store.x_vel[indices] *= -1
+
+    def bottom_border_collisions(self, indices: np.ndarray):
+        self.ball_store.y_vel[indices] *= -1
+
+    def paddle_collisions(self, indices: np.ndarray):
+        store = self.ball_store
+        store.x_vel[indices], store.y_vel[indices] = self._get_paddle_bounce(
+            store.y[indices], store.speed[indices])
+        self.paddle_hits += len(indices)
+
+    def _get_paddle_bounce(self, y, speed):
+        """
+        returns (x_vel, y_vel) of ball at y bouncing off paddle at speed. The
+        further from the paddle center ball hits, the steeper it bounces.
+        Works on floats and arrays.
+        """
+        #center right coordinate of paddle
+        cent_coords = self.paddle.cent_coords
+        #difference between center coord y and ball y positions
+        dy = cent_coords[1] - y
+        #angle factor taken as ratio of dy and paddle height
+        angle_fact = dy/self.paddle.height
+        #angle factor multiplied by angle_range to get angle change, kept
+        #within range
+        max_angle = self.angle_range/2
+        angle = np.clip(angle_fact*self.angle_range, -max_angle, max_angle)
+        #velocities are changed byased on angle
+        return (speed*np.cos(angle), -speed*np.sin(angle))
+
+
+def get_rect(obj) -> tuple[float, float, float, float]:
+    """
+    returns (left, top, right, bottom) of paddle or border
+    """
+    return (obj.x, obj.y, obj.x + obj.width, obj.y + obj.height)
+
+
+def is_ball_out(ball: BallBody) -> bool:
+    """
+    returns true if ball position + radius (so it's visually completely
+    off screen) is negative
+    """
+    return ball.x + ball.radius <= 0
+
+
+def move_ball(ball: BallBody, colliders: list):
+    """
+    moves ball by its velocity, bouncing it off objects at the exact time it
+    hits them. Ball can bounce up to constants.MAX_BOUNCES_PER_STEP times per
+    step, so it can't pass through objects however fast it is. If it would
+    bounce more, it stops at the last bounce for the rest of the step.
+
+    Parameters:
+
+    ball: BallBody
+        ball to move
+
+    colliders: list[tuple[object, Callable[[], None]]]
+        (object, collision handler) of each object ball can hit, where
+        object has x, y, width and height and handler changes ball velocity
+    """
+    #fraction of step left to move
+    remaining = 1.0
+    for _ in range(constants.MAX_BOUNCES_PER_STEP):
+        dx = ball.x_vel*remaining
+        dy = ball.y_vel*remaining
+        #time of first hit and its handler
+        first_t = None
+        for obj, on_collision in colliders:
+            hit = get_time_of_impact(ball.x, ball.y, dx, dy, ball.radius, get_rect(obj))
+            if hit and (first_t is None or hit[0] < first_t):
+                first_t = hit[0]
+                first_on_collision = on_collision
+        if first_t is None:
+            ball.x += dx
+            ball.y += dy
+            return
+        ball.x += dx*first_t
+        ball.y += dy*first_t
+        #changes ball velocity
+        first_on_collision()
+        remaining *= 1 - first_t
+
+
+def move_balls(store: BallStore, colliders: list):
+    """
+    move_ball() for every ball in store at once, with batched array
+    operations.
+
+    Parameters:
+
+    store: BallStore
+        balls to move
+
+    colliders: list[tuple[object, Callable[[np.ndarray], None]]]
+        (object, collision handler) of each object balls can hit, where
+        handler changes velocities of balls at given indices
+    """
+    #indices of balls that still have part of step left to move
+    indices = np.arange(store.count)
+    remaining = np.ones(store.count)
+    for _ in range(constants.MAX_BOUNCES_PER_STEP):
+        dx = store.x_vel[indices]*remaining
+        dy = store.y_vel[indices]*remaining
+        x = store.x[indices]
+        y = store.y[indices]
+        radius = store.radius[indices]
+        #time of first impact of each ball, and which object it hits
+        first_t = np.full(len(indices), np.inf)
+        first_obj = np.zeros(len(indices), dtype=int)
+        for obj_num, (obj, _) in enumerate(colliders):
+            t, _, _ = get_times_of_impact(x, y, dx, dy, radius, get_rect(obj))
+            is_first = t < first_t
+            first_t[is_first] = t[is_first]
+            first_obj[is_first] = obj_num
+        is_hit = np.isfinite(first_t)
+        t = np.where(is_hit, first_t, 1.0)
+        store.x[indices] = x + dx*t
+        store.y[indices] = y + dy*t
+        if not is_hit.any():
+            return
+        for obj_num, (_, on_collisions) in enumerate(colliders):
+            hit_indices = indices[is_hit & (first_obj == obj_num)]
+            if len(hit_indices):
+                #changes velocities of balls that hit obj
+                on_collisions(hit_indices)
+        remaining = remaining[is_hit]*(1 - t[is_hit])
+        indices = indices[is_hit]
@@ -0,0 +1,138 @@
+"""
+This module contains paddle policies, which move the paddle of a headless
+Simulation in place of hand detection
+"""
+
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+
+from game.assets.border import Border
+from game.simulation.simulation import Simulation
+from utils import constants
+
+
+class PaddlePolicy(ABC):
+    """
+    Moves paddle towards a target each simulation step, no faster than
+    max_speed, like a player's hand would.
+
+    Constructor Parameters:
+
+    max_speed: float
+        max paddle speed in pixels/simulation step
+
+    seed: int | None
+        seed of policy's random errors
+    """
+    def __init__(self,
+                 max_speed: float = constants.POLICY_PADDLE_MAX_SPEED,
+                 seed: int = None):
+        self.max_speed = max_speed
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, simulation: Simulation):
+        """
+        moves paddle of simulation towards target. Called before each step.
+        """
+        paddle = simulation.paddle
+        target_y = self.get_target_y(simulation) - paddle.height/2
+        dy = min(max(target_y - paddle.y, -self.max_speed), self.max_speed)
+        paddle.y = paddle.y + dy
+
+    @abstractmethod
+    def get_target_y(self, simulation: Simulation) -> float:
+        """
+        returns y in pixels that paddle center should move to
+        """
+        return float
+
+
+class TrackingPolicy(PaddlePolicy):
+    """
+    Follows ball y as it was delay steps ago, with gaussian noise, like a
+    player who reacts to the ball without anticipating it.
+
+    Constructor Parameters:
+
+    Same as PaddlePolicy, and
+
+    delay: int
+        reaction time in simulation steps
+
+    noise: float
+        standard deviation in pixels of error of each target
+    """
+    def __init__(self,
+                 max_speed: float = constants.POLICY_PADDLE_MAX_SPEED,
+                 seed: int = None,
+                 delay: int = 12,
+                 noise: float = 10):
+        super().__init__(max_speed, seed)
+        self.noise = noise
+        self._seen_y = deque(maxlen=delay + 1)
+
+    def get_target_y(self, simulation: Simulation) -> float:
+        self._seen_y.append(simulation.ball.y)
+        return self._seen_y[0] + float(self.rng.normal(0, self.noise))
+
+
+class InterceptPolicy(PaddlePolicy):
+    """
+    Predicts where ball will reach paddle, reflecting its path off the top
+    and bottom borders, and moves there to aim_offset from paddle center
+    plus a random error drawn once per approach. Returns to center while
+    ball moves away.
+
+    Constructor Parameters:
+
+    Same as PaddlePolicy, and
+
+    aim_error: float
+        standard deviation in pixels of error of where ball hits paddle
+
+    aim_offset: float
+        where paddle aims to be hit, in pixels below its center
+    """
+    def __init__(self,
+                 max_speed: float = constants.POLICY_PADDLE_MAX_SPEED,
+                 seed: int = None,
+                 aim_error: float = 20,
+                 aim_offset: float = 0):
+        super().__init__(max_speed, seed)
+        self.aim_error = aim_error
+        self.aim_offset = aim_offset
+        self._error = 0.0
+        self._is_approaching = False
+        self._ball = None
+
+    def get_target_y(self, simulation: Simulation) -> float:
+        ball = simulation.ball
+        is_approaching = ball.x_vel < 0
+        #new ball or ball turned back towards paddle
+        if is_approaching and (not self._is_approaching or ball is not self._ball):
+            self._error = float(self.rng.normal(0, self.aim_error))
+        self._is_approaching = is_approaching
+        self._ball = ball
+        if not is_approaching:
+            return constants.GAME_Y_SIZE/2
+        return self._get_intercept_y(simulation) - self.aim_offset + self._error
+
+    def _get_intercept_y(self, simulation: Simulation) -> float:
+        """
+        returns y of ball center when it reaches paddle face
+        """
+        ball = simulation.ball
+        paddle = simulation.paddle
+        steps = (ball.x - (paddle.x + paddle.width + ball.radius))/-ball.x_vel
+        y = ball.y + ball.y_vel*max(steps, 0)
+        #ball center bounces between these, so its path is unfolded into a
+        #triangle wave
+        low = Border.DEF_SHORT + ball.radius
+        high = constants.GAME_Y_SIZE - Border.DEF_SHORT - ball.radius
+        span = high - low
+        y = (y - low) % (2*span)
+        if y > span:
+            y = 2*span - y
+        return low + y
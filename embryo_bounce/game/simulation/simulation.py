@@ -0,0 +1,329 @@
+"""
+This module contains the Simulation and MultiBallSimulation classes, which
+play the rules of the game one simulation step at a time without pygame, and
+SimulationSettings, the tuning values they use
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from game.assets.border import Borders
+from game.simulation.ball_store import BallStore
+from game.simulation.bodies import BallBody, PaddleBody
+from game.simulation.physics import CollisionResponse, is_ball_out, move_ball, move_balls
+from utils import constants
+
+
+class SimulationSettings(object):
+    """
+    gameplay tuning values. Defaults are the ones in utils.constants, and
+    they can be changed per simulation so headless runs can compare them.
+
+    Constructor Parameters:
+
+    speed_increment: float
+        ball speed increase in pixels/step
+
+    frames_no_speed: int
+        simulation steps between ball speed increases
+
+    angle_range: float
+        range in radians of angles ball bounces off paddle at
+
+    init_lives: int
+        lives at start of game
+
+    initial_wait_frames: int
+        simulation steps before ball starts moving
+
+    no_ball_frames: int
+        simulation steps after ball goes out before next one spawns
+    """
+    def __init__(self,
+                 speed_increment: float = constants.SPEED_INCREMENT,
+                 frames_no_speed: int = constants.FRAMES_NO_SPEED,
+                 angle_range: float = constants.PADDLE_ANGLE_RANGE,
+                 init_lives: int = constants.INIT_LIVES,
+                 initial_wait_frames: int = constants.INITIAL_WAIT_FRAMES,
+                 no_ball_frames: int = constants.NO_BALL_FRAMES):
+        self.speed_increment = speed_increment
+        self.frames_no_speed = frames_no_speed
+        self.angle_range = angle_range
+        self.init_lives = init_lives
+        self.initial_wait_frames = initial_wait_frames
+        self.no_ball_frames = no_ball_frames
+
+
+class Simulation(object):
+    """
+    Rules of the game, advanced one simulation step at a time by step(). The
+    paddle is moved by whoever runs the simulation, by hand detection in
+    Gameplay or a PaddlePolicy in headless runs.
+
+    The ball waits settings.initial_wait_frames steps, then moves and speeds
+    up every settings.frames_no_speed steps. When it goes out, a life is
+    lost and a new ball spawns settings.no_ball_frames steps later. Score is
+    the number of steps played since the ball first moved.
+
+    Constructor Parameters:
+
+    paddle: PaddleBody
+        paddle ball bounces off
+
+    borders: Borders
+        borders ball bounces off
+
+    ball: BallBody | None
+        ball at start of game. If None, new_ball() is used.
+
+    settings: SimulationSettings | None
+        tuning values. If None, defaults are used.
+
+    new_ball: Callable[[], BallBody]
+        creates ball at start of each life
+
+    collisions: CollisionResponse | None
+        bounces balls off paddle and borders. If None, a CollisionResponse
+        is created. CollisionManager is given in game, so collisions play
+        sounds.
+
+    instance attributes:
+
+    self.ball_out_listener: Callable[[], None] | None
+        called when ball goes out
+
+    self.new_ball_listener: Callable[[BallBody], None] | None
+        called with new ball when it spawns
+
+    self.rally_lengths: list[int]
+        number of paddle hits of each ball that went out
+
+    self.death_speeds: list[float]
+        speed of each ball when it went out
+    """
+    def __init__(self,
+                 paddle: PaddleBody,
+                 borders: Borders,
+                 ball: BallBody = None,
+                 settings: SimulationSettings = None,
+                 new_ball: Callable[[], BallBody] = BallBody,
+                 collisions: CollisionResponse = None):
+        self.paddle = paddle
+        self.borders = borders
+        self.settings = settings if settings else SimulationSettings()
+        self.new_ball = new_ball
+        self.ball = ball if ball else new_ball()
+        if collisions is None:
+            collisions = CollisionResponse(self.ball, paddle, borders)
+        self.collisions = collisions
+        self.collisions.ball = self.ball
+        self.collisions.angle_range = self.settings.angle_range
+        self.lives = self.settings.init_lives
+        self.step_num = 0
+        self.frames_since_speed = 0
+        self.frames_no_ball = 0
+        self.is_ball_out = False
+        self.score = 0
+        self.ball_out_listener: Callable[[], None] = None
+        self.new_ball_listener: Callable[[BallBody], None] = None
+        #statistics of each ball for balancing
+        self.rally_lengths: list[int] = []
+        self.death_speeds: list[float] = []
+        self._rally_start_hits = 0
+
+    @property
+    def is_over(self) -> bool:
+        return self.lives == 0
+
+    def step(self):
+        """
+        advances game by one simulation step
+        """
+        #waits at the beginning of the game for ball to start moving
+        if self.step_num < self.settings.initial_wait_frames:
+            self._manage_pre_game()
+        #normal game loop with ball moving
+        else:
+            if not self.is_ball_out:
+                #when ball is still in bounds
+                self._manage_ball_in()
+            #when ball is out of bounds
+            else:
+                self._manage_ball_out()
+        self.step_num += 1
+        self.frames_since_speed += 1
+        self.frames_no_ball += 1
+        self.score += 1
+
+    def _increase_ball_speed(self):
+        """
+        increase ball speed by settings.speed_increment
+        """
+        if self.frames_since_speed > self.settings.frames_no_speed:
+            self.ball.speed += self.settings.speed_increment
+            self.frames_since_speed = 0
+
+    def _is_ball_out_update(self):
+        """
+        Updates is_ball_out flag. If ball went out, records its statistics
+        and calls ball_out_listener.
+        """
+        self.is_ball_out = is_ball_out(self.ball)
+        if self.is_ball_out:
+            self.rally_lengths.append(self.collisions.paddle_hits - self._rally_start_hits)
+            self.death_speeds.append(self.ball.speed)
+            if self.ball_out_listener:
+                self.ball_out_listener()
+
+    def _manage_ball_out(self):
+        """
+        manages steps while ball is gone
+        """
+        self.ball.save_coords()
+        if self.frames_no_ball > self.settings.no_ball_frames:
+            self.lives -= 1
+            self._spawn_new_ball()
+            self.is_ball_out = False
+
+    def _manage_ball_in(self):
+        self.ball.save_coords()
+        move_ball(self.ball, self.collisions.get_colliders())
+        self._increase_ball_speed()
+        self._is_ball_out_update()
+        self.frames_no_ball = 0
+
+    def _manage_pre_game(self):
+        """
+        manages steps before game begins
+        """
+        #score shouldn't start until game starts
+        self.score = 0
+        #don't update ball position so it doesn't move
+        self.ball.save_coords()
+
+    def _spawn_new_ball(self):
+        self.ball = self.new_ball()
+        self.collisions.ball = self.ball
+        self._rally_start_hits = self.collisions.paddle_hits
+        if self.new_ball_listener:
+            self.new_ball_listener(self.ball)
+
+
+class MultiBallSimulation(Simulation):
+    """
+    Simulation of multi-ball mode.
+
+    Starts with init_ball_count balls and spawns another every
+    constants.MULTI_BALL_SPAWN_FRAMES steps, up to max_ball_count. Balls that
+    go out are removed, and a life is lost when all of them are out. Balls
+    are kept in ball_store and moved and collided in batches, and the same
+    store is used for the whole game.
+
+    Constructor Parameters:
+
+    paddle: PaddleBody
+        paddle balls bounce off
+
+    borders: Borders
+        borders balls bounce off
+
+    ball_store: BallStore
+        store balls are kept in
+
+    settings: SimulationSettings | None
+        tuning values. If None, defaults are used.
+
+    collisions: CollisionResponse | None
+        bounces balls off paddle and borders. If None, a CollisionResponse
+        is created.
+
+    seed: int | None
+        seed of random angles new balls start at
+    """
+    def __init__(self,
+                 paddle: PaddleBody,
+                 borders: Borders,
+                 ball_store: BallStore,
+                 settings: SimulationSettings = None,
+                 collisions: CollisionResponse = None,
+                 seed: int = None):
+        if collisions is None:
+            collisions = CollisionResponse(None, paddle, borders, ball_store)
+        collisions.ball_store = ball_store
+        #new balls start where and as fast as a single ball does
+        super().__init__(paddle, borders, BallBody(), settings, collisions=collisions)
+        self.ball_store = ball_store
+        self.init_ball_count = constants.MULTI_BALL_INIT_COUNT
+        self.max_ball_count = min(constants.MULTI_BALL_MAX, ball_store.capacity)
+        self.frames_since_spawn = 0
+        self.speed = self.ball.speed
+        self.rng = np.random.default_rng(seed)
+
+    def start(self):
+        """
+        replaces balls in store with init_ball_count new ones. Called before
+        first step, after init_ball_count is set.
+        """
+        self._spawn_new_ball()
+
+    def _increase_ball_speed(self):
+        if self.frames_since_speed > self.settings.frames_no_speed:
+            self.speed += self.settings.speed_increment
+            self.ball_store.set_speed(self.speed)
+            self.frames_since_speed = 0
+
+    def _is_ball_out_update(self):
+        """
+        removes balls that are out, calling ball_out_listener if there were
+        any, and sets is_ball_out if there are none left
+        """
+        is_out = self.ball_store.get_out_mask()
+        if is_out.any():
+            self.ball_store.remove(is_out)
+            self.death_speeds.extend([self.speed]*int(np.count_nonzero(is_out)))
+            if self.ball_out_listener:
+                self.ball_out_listener()
+        self.is_ball_out = len(self.ball_store) == 0
+
+    def _manage_ball_out(self):
+        if self.frames_no_ball > self.settings.no_ball_frames:
+            self.lives -= 1
+            self._spawn_new_ball()
+            self.is_ball_out = False
+
+    def _manage_ball_in(self):
+        self.ball_store.save_coords()
+        move_balls(self.ball_store, self.collisions.get_store_colliders())
+        self._increase_ball_speed()
+        self._is_ball_out_update()
+        self._spawn_extra_ball()
+        self.frames_no_ball = 0
+
+    def _manage_pre_game(self):
+        self.score = 0
+        #balls don't move, so they're drawn where they are
+        self.ball_store.save_coords()
+
+    def _spawn_new_ball(self):
+        """
+        replaces balls in store with init_ball_count new ones
+        """
+        self.ball_store.clear()
+        for _ in range(min(self.init_ball_count, self.max_ball_count)):
+            self._add_ball()
+
+    def _spawn_extra_ball(self):
+        self.frames_since_spawn += 1
+        if self.frames_since_spawn > constants.MULTI_BALL_SPAWN_FRAMES:
+            if len(self.ball_store) < self.max_ball_count:
+                self._add_ball()
+            self.frames_since_spawn = 0
+
+    def _add_ball(self):
+        """
+        adds ball moving left at a random angle within paddle bounce range
+        """
+        max_angle = self.settings.angle_range/2
+        angle = np.pi + self.rng.uniform(-max_angle, max_angle)
+        self.ball_store.add(self.ball.x, self.ball.y, self.speed, angle, self.ball.radius)
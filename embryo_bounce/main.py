@@ -2,7 +2,10 @@
 This module provides an entry point for the game
 """
 
+#imported first so that startup is timed from launch
+from utils.startup_timer import startup_timer
 from game.game import Game
 
 if __name__ == "__main__":
+    startup_timer.mark("imports")
     Game().main()
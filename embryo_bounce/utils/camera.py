@@ -1,102 +1,370 @@
 """
 This module contains all implementation of the webcam interface.
+
+Classes:
+
+FrameStream: Base class of threads that stream images to hand detection
+
+HandCam: Streams images from webcam
+
+RecordedCam: Streams images from a recording made with HandCam
 """
 
+from abc import ABC, abstractmethod
 from threading import Thread
+import time
 
 import cv2
+import numpy as np
 
+from utils import constants
+from utils.frame_buffer import FramePool
+from utils.frame_mailbox import FrameMailbox
+from utils.frame_recording import FrameRecorder, FrameRecording
 from utils.hand_detection import HandDetector
 
 
-class HandCam(Thread):
+class FrameStream(Thread, ABC):
     """
-    Handcam streams images from the webcam and sends them to the hand detector
-    to be processed by hand tracking.
+    Base class of threads that stream images to the hand detector to be
+    processed by hand tracking.
+
+    Each image is converted from OpenCV's BGR to RGB once, into a frame of a
+    reusable FramePool, and that RGB image is used by both hand detection and
+    the camera preview. A frame is given back to the pool only once it's
+    dropped from the mailbox, skipped, or hand detection is done with it, so
+    it's never overwritten while detection or a result callback uses it. If
+    every frame is still in use, the captured image is dropped. Recordings
+    are made of the raw BGR images.
+
+    Streamed images are put in a FrameMailbox. A separate detection thread
+    takes the newest image from the mailbox whenever the hand detector has a
+    free slot, so frames captured while detection is busy are dropped instead
+    of piling up in the landmarker.
 
     Constructor Parameters:
 
     hand_detector: utils.HandDetector
         hand_detector that images are streamed to
 
-    index: int = 0
-        index of webcam to be used
+    record_path: str | None
+        if not None, every streamed image is recorded to a FrameRecorder file
+        at record_path
 
     Implements:
-    
+
     thread.Thread
     """
-    def __init__(self, hand_detector: HandDetector, index: int = 0):
+    def __init__(self, hand_detector: HandDetector, record_path: str = None):
         #Thread init() must be called or else exception is raised
         super().__init__()
-        self.cap = cv2.VideoCapture(index)
-        self._fps = self._init_fps()
-        self._shape = self._init_shape()
-        self._dtype = self._init_dtype()
-        self._aspect_ratio = self._init_aspect_ratio()
         self.is_stopped = False
         self.hand_detector = hand_detector
-    
+        #enough frames for those in mailbox, in hand detection, and being
+        #converted, plus one for a result callback still copying its image
+        self.rgb_frames = FramePool(constants.FRAME_MAILBOX_SIZE + hand_detector.max_in_flight + 2)
+        self.mailbox = FrameMailbox(constants.FRAME_MAILBOX_SIZE, drop_listener=self._release_frame)
+        hand_detector.image_release_listener = self.rgb_frames.release
+        self.record_path = record_path
+        self.recorder: FrameRecorder = None
+        self._detection_thread = Thread(target=self._detect_frames, daemon=True)
+        #set if detection stopped after constants.MAX_DETECTION_FAILURES
+        #submissions in a row failed
+        self.detection_error: Exception = None
+
     #@property to make them read-only
     @property
     def fps(self):
         return self._fps
-    
+
     @property
     def shape(self):
         return self._shape
-    
+
     @property
     def dtype(self):
-        return self._dtype 
-    
+        return self._dtype
+
     @property
     def aspect_ratio(self):
-        return self._aspect_ratio 
+        return self._aspect_ratio
+
+    @property
+    def dropped_frames(self):
+        return self.mailbox.dropped_count + self.rgb_frames.exhausted_count
 
     def start_stream(self):
         """
         Starts capturing of images and sends stream to hand_detection.
         """
+        if self.record_path:
+            self.recorder = FrameRecorder(self.record_path, self.fps)
+        self._detection_thread.start()
+        frame_num = 0
         while not self.is_stopped:
-            captured, image = self.cap.read()
+            captured, image = self._read()
             if captured:
-                self.hand_detector.detect_async(image)
+                capture_time = time.perf_counter()
+                if self.recorder:
+                    self.recorder.write(image, capture_time)
+                if self.hand_detector.tracer:
+                    self.hand_detector.tracer.begin_frame(frame_num, capture_time)
+                rgb_image = self.rgb_frames.acquire(image.shape, image.dtype)
+                #every frame is still used by detection, so this one is dropped
+                if rgb_image is not None:
+                    cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb_image)
+                    self.mailbox.put((frame_num, capture_time, rgb_image))
+                frame_num += 1
         #release when feed is stopped by is_stopped flag
+        self._release()
+        if self.recorder:
+            self.recorder.close()
+
+    def stop_stream(self):
+        """
+        Sets self.is_stopped to True to stop image stream.
+        """
+        self.is_stopped = True
+        self.mailbox.close()
+
+    def run(self):
+        """
+        starts stream. Should be called by Thread.start() method to run in
+        separate thread.
+        """
+        self.start_stream()
+
+    @abstractmethod
+    def _read(self) -> tuple[bool, np.ndarray]:
+        """
+        returns (captured, image) like cv2.VideoCapture.read()
+        """
+        pass
+
+    def _release(self):
+        """
+        releases image source when stream is stopped
+        """
+        pass
+
+    def _detect_frames(self):
+        """
+        sends newest image in mailbox to hand_detector whenever the number of
+        images being processed is below hand_detector.max_in_flight. A
+        failed submission is printed and detection goes on with the next
+        frame, unless constants.MAX_DETECTION_FAILURES fail in a row.
+        """
+        num_failures = 0
+        while not self.is_stopped:
+            if not self.hand_detector.wait_for_slot(constants.DETECTION_SLOT_TIMEOUT_S):
+                #landmarker didn't return results in time, so assume they were
+                #lost rather than stalling detection
+                self.hand_detector.reset_in_flight()
+                continue
+            frame = self.mailbox.get_latest(constants.FRAME_WAIT_TIMEOUT_S)
+            if frame is None:
+                continue
+            frame_num, capture_time, image = frame
+            if self.hand_detector.should_detect(frame_num, capture_time):
+                #hand_detector releases image once it's done with it
+                try:
+                    self.hand_detector.detect_async(image, capture_time, frame_num)
+                except Exception as error:
+                    num_failures += 1
+                    print(f"hand detection failed on frame {frame_num}: {error!r}")
+                    if num_failures >= constants.MAX_DETECTION_FAILURES:
+                        print("hand detection stopped after repeated failures")
+                        self.detection_error = error
+                        return
+                else:
+                    num_failures = 0
+            else:
+                self.rgb_frames.release(image)
+
+    def _release_frame(self, frame: tuple):
+        """
+        gives image of (frame_num, capture_time, image) frame dropped from
+        mailbox back to rgb_frames
+        """
+        self.rgb_frames.release(frame[2])
+
+    def _init_aspect_ratio(self):
+        return self.shape[1]/self.shape[0]
+
+
+class HandCam(FrameStream):
+    """
+    Handcam streams images from the webcam and sends them to the hand detector
+    to be processed by hand tracking.
+
+    Constructor Parameters:
+
+    hand_detector: utils.HandDetector
+        hand_detector that images are streamed to
+
+    index: int = 0
+        index of webcam to be used
+
+    record_path: str | None
+        if not None, webcam images are recorded to record_path so that they
+        can be replayed with RecordedCam
+
+    Capture resolution, FOURCC, fps and buffer size are requested from
+    CAMERA_* constants. The format the camera actually accepted is stored in
+    self.capture_format.
+
+    Implements:
+
+    FrameStream
+    """
+    #capture properties that can be requested with constants
+    _FORMAT_PROPS = {"width": cv2.CAP_PROP_FRAME_WIDTH,
+                     "height": cv2.CAP_PROP_FRAME_HEIGHT,
+                     "fps": cv2.CAP_PROP_FPS,
+                     "buffer_size": cv2.CAP_PROP_BUFFERSIZE}
+    def __init__(self, hand_detector: HandDetector, index: int = 0, record_path: str = None):
+        super().__init__(hand_detector, record_path)
+        self.cap = cv2.VideoCapture(index)
+        self.capture_format = self._configure()
+        self._fps = self._init_fps()
+        self._shape, self._dtype = self._probe()
+        self._aspect_ratio = self._init_aspect_ratio()
+
+    def _read(self):
+        return self.cap.read()
+
+    def _release(self):
         self.cap.release()
 
+    def _configure(self) -> dict:
+        """
+        requests capture format in constants from camera and returns format
+        camera accepted. Settings that are None are left at camera defaults.
+        """
+        requested = {"width": constants.CAMERA_WIDTH,
+                     "height": constants.CAMERA_HEIGHT,
+                     "fourcc": constants.CAMERA_FOURCC,
+                     "fps": constants.CAMERA_FPS,
+                     "buffer_size": constants.CAMERA_BUFFER_SIZE}
+        #FOURCC has to be set before resolution for some backends to accept
+        #resolutions only available in that format
+        if requested["fourcc"] is not None:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*requested["fourcc"]))
+        for key in ("width", "height", "fps", "buffer_size"):
+            if requested[key] is not None:
+                self.cap.set(HandCam._FORMAT_PROPS[key], requested[key])
+        accepted = self._get_capture_format()
+        for key, value in requested.items():
+            if value is not None and value != accepted[key]:
+                print(f"camera {key} {value} not accepted, using {accepted[key]}")
+        return accepted
+
+    def _get_capture_format(self) -> dict:
+        """
+        returns current capture format reported by camera
+        """
+        capture_format = {key: self.cap.get(prop) for key, prop in HandCam._FORMAT_PROPS.items()}
+        for key in ("width", "height", "buffer_size"):
+            capture_format[key] = int(capture_format[key])
+        #FOURCC is four characters packed into an int
+        fourcc = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        capture_format["fourcc"] = "".join(chr((fourcc >> 8*i) & 0xFF) for i in range(4)) if fourcc else None
+        capture_format["backend"] = self.cap.getBackendName() if self.cap.isOpened() else None
+        return capture_format
+
     def _init_fps(self):
         """
         returns frames per second of camera
         """
-        return self.cap.get(cv2.CAP_PROP_FPS)
-    
-    def _init_shape(self):
+        return self.capture_format["fps"]
+
+    def _probe(self) -> tuple[tuple, np.dtype]:
         """
-        returns shape of image returned by cam as tuple 
-        (height, width, num_channels)
+        reads one image and returns its (shape, dtype). shape is
+        (height, width, num_channels). Returns (None, None) if nothing is
+        captured.
         """
         captured, image = self.cap.read()
         if captured:
-            return image.shape
-        
-    def _init_aspect_ratio(self):
-        return self.shape[1]/self.shape[0]
-    
-    def _init_dtype(self):
-        captured, image = self.cap.read()
-        if captured:
-            return image.dtype
-        
-    def stop_stream(self):
+            return image.shape, image.dtype
+        return None, None
+
+
+class RecordedCam(FrameStream):
+    """
+    Streams images from a recording made with HandCam(record_path=...) so the
+    detection and rendering pipeline can be run without a webcam.
+
+    Constructor Parameters:
+
+    hand_detector: utils.HandDetector
+        hand_detector that images are streamed to
+
+    path: str
+        path of recording file
+
+    is_realtime: bool = True
+        if True, images are streamed at the cadence they were recorded at. If
+        False, each image is streamed as soon as hand_detector is ready for
+        it, so every image is detected and none are dropped.
+
+    is_looped: bool = False
+        if True, recording restarts when it ends. If False, stream stops and
+        is_finished is set to True.
+
+    Implements:
+
+    FrameStream
+    """
+    def __init__(self,
+                 hand_detector: HandDetector,
+                 path: str,
+                 is_realtime: bool = True,
+                 is_looped: bool = False):
+        super().__init__(hand_detector)
+        self.recording = FrameRecording(path)
+        self.is_realtime = is_realtime
+        self.is_looped = is_looped
+        self.is_finished = False
+        self._fps = self.recording.fps
+        self._shape = self.recording.shape
+        self._dtype = self.recording.dtype
+        self._aspect_ratio = self._init_aspect_ratio()
+        self._index = 0
+        self._start_time: float = None
+
+    def _read(self):
+        if self._index == len(self.recording):
+            if not self.is_looped:
+                self.is_finished = True
+                self.stop_stream()
+                return False, None
+            self._index = 0
+            self._start_time = None
+        if self.is_realtime:
+            self._wait_for_timestamp()
+        else:
+            self._wait_for_detector()
+        image = self.recording.frames[self._index]
+        self._index += 1
+        return not self.is_stopped, image
+
+    def _wait_for_timestamp(self):
         """
-        Sets self.is_stopped to True to stop image stream.
+        sleeps until time of current image relative to start of stream
         """
-        self.is_stopped = True
-        
-    def run(self):
+        if self._start_time is None:
+            self._start_time = time.perf_counter() - self.recording.timestamps[self._index]
+        delay = self._start_time + self.recording.timestamps[self._index] - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _wait_for_detector(self):
         """
-        starts stream. Should be called by Thread.start() method to run in
-        separate thread.
+        waits until previous image has been taken from mailbox and
+        hand_detector has a free slot, so that no images are dropped
         """
-        self.start_stream()
+        while not self.is_stopped:
+            if (self.mailbox.wait_until_empty(constants.FRAME_WAIT_TIMEOUT_S)
+                and self.hand_detector.wait_for_slot(constants.FRAME_WAIT_TIMEOUT_S)):
+                return
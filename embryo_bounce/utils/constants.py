@@ -2,21 +2,151 @@
 constants used throughout the program
 """
 
+import math
 import os
 import sys
 
 #game settings
+#max rendered frames per second
 FRAMERATE = 60
+#simulation steps per second. Ball velocities, score and the frame counts
+#below are per simulation step, so they don't depend on frame rate.
+SIMULATION_RATE = 60
+#max simulation steps run per rendered frame. When rendering falls further
+#behind than this, the game slows down instead of skipping more frames.
+MAX_STEPS_PER_FRAME = 5
+#if True, ball is drawn between its last two simulation positions
+RENDER_INTERPOLATION = True
+#max times ball can bounce in one simulation step
+MAX_BOUNCES_PER_STEP = 4
+#if True, gameplay is multi-ball mode, where balls keep spawning and a life
+#is lost when every ball is out
+MULTI_BALL_MODE = False
+#number of balls at start of multi-ball game and after a life is lost
+MULTI_BALL_INIT_COUNT = 3
+#max number of balls in multi-ball mode
+MULTI_BALL_MAX = 500
+#simulation steps between ball spawns in multi-ball mode
+MULTI_BALL_SPAWN_FRAMES = SIMULATION_RATE
 INIT_LIVES = 3
-INITIAL_WAIT_FRAMES = FRAMERATE*2
-NO_BALL_FRAMES = FRAMERATE*2
-FRAMES_NO_SPEED = FRAMERATE*3
+INITIAL_WAIT_FRAMES = SIMULATION_RATE*2
+NO_BALL_FRAMES = SIMULATION_RATE*2
+FRAMES_NO_SPEED = SIMULATION_RATE*3
+#time in milliseconds between redraws of menu and high scores when there's
+#no input
+IDLE_REDRAW_INTERVAL_MS = 1000
+#camera preview rate of high score entry and play again screens
+IDLE_CAM_PREVIEW_FPS = 10
+#max fraction of one CPU core the game loop should use on idle screens.
+#Checked by benchmarks/idle_benchmark.py.
+IDLE_CPU_TARGET = 0.05
 #speed increase increment
 SPEED_INCREMENT = 2
+#range in radians of angles ball bounces off paddle at, from hitting its
+#bottom to its top
+PADDLE_ANGLE_RANGE = math.pi/2
+#max paddle speed in pixels/simulation step of headless simulation paddle
+#policies, roughly how fast a hand moves the paddle
+POLICY_PADDLE_MAX_SPEED = 12
+#headless simulated games are stopped after this many simulation steps
+SIMULATION_MAX_STEPS = SIMULATION_RATE*60*10
 #scaling for hand position so entire webcam field of view isn't used
 HAND_POSITION_SCALING = 1.8
 #offset to correct scaling
 HAND_COORDS_OFFSET = -220
+#webcam capture format requested from camera. None leaves camera default.
+#resolution in pixels
+CAMERA_WIDTH = None
+CAMERA_HEIGHT = None
+#four character code of capture format, e.g. "MJPG"
+CAMERA_FOURCC = None
+CAMERA_FPS = None
+#number of frames buffered by capture backend. 1 gives the lowest latency on
+#backends that support it.
+CAMERA_BUFFER_SIZE = None
+#number of frames held between webcam capture and hand detection
+FRAME_MAILBOX_SIZE = 1
+#max number of frames being processed by hand detection at once
+MAX_IN_FLIGHT_DETECTIONS = 1
+#time in seconds to wait for a detection result before giving up on it
+DETECTION_SLOT_TIMEOUT_S = 1.0
+#consecutive failed detection submissions after which detection is stopped
+MAX_DETECTION_FAILURES = 30
+#if True, webcam capture and hand detection run in a separate process
+DETECTION_IN_PROCESS = False
+#number of frames in shared memory ring between detection process and game
+DETECTION_PROCESS_RING_SLOTS = 4
+#time in seconds to wait for detection process to exit
+DETECTION_PROCESS_STOP_TIMEOUT_S = 2.0
+#if True, hand detection measures its latency and skips frames to keep up
+ADAPTIVE_DETECTION_RATE = False
+#fraction of each frame interval that hand detection is allowed to use
+DETECTION_LOAD_TARGET = 0.5
+#max number of captured frames per detection in adaptive mode
+MAX_DETECTION_FRAME_SKIP = 3
+#weight of newest measurement in averages of detection latency and frame rate
+DETECTION_RATE_SMOOTHING = 0.1
+#if True, only region of interest around last hand position is detected.
+#The landmarker tracks hands between LIVE_STREAM frames in the coords of the
+#image it's given, so the region is only moved when the hand nears its edge
+#or is lost, and tracking restarts each time it does.
+HAND_ROI_ENABLED = False
+#padding added on each side of hand bounding box, as fraction of its size
+HAND_ROI_MARGIN = 0.5
+#min side of region of interest, as fraction of shortest image side
+HAND_ROI_MIN_FRACTION = 0.3
+#regions of interest covering more of image than this use full image
+HAND_ROI_MAX_AREA_FRACTION = 0.8
+#region of interest is downscaled so that its longest side is at most this
+HAND_ROI_MAX_SIDE = 256
+#region of interest is moved when hand bounding box comes closer to its edge
+#than this fraction of its side
+HAND_ROI_EDGE_FRACTION = 0.1
+#time in seconds detection thread waits for a new frame before rechecking
+FRAME_WAIT_TIMEOUT_S = 0.1
+#predictor used to compensate paddle for detection latency. Options are
+#None, "none", "alpha_beta" and "kalman" (see utils.paddle_predictor)
+PADDLE_PREDICTOR = None
+#time in seconds from paddle update until frame is on screen
+PREDICTOR_RENDER_LEAD_S = 1/FRAMERATE
+#max time in seconds predictions are extrapolated past last detection
+PREDICTOR_MAX_LEAD_S = 0.15
+#alpha-beta filter gains
+ALPHA_BETA_ALPHA = 0.6
+ALPHA_BETA_BETA = 0.2
+#Kalman filter noise variances, in normalized coordinates
+KALMAN_PROCESS_NOISE = 10
+KALMAN_MEASUREMENT_NOISE = 1e-4
+#if True, latency of each frame from capture to display is measured and
+#reported on exit
+LATENCY_TRACING = False
+#number of most recent frames that latency is traced for
+LATENCY_TRACE_MAX_FRAMES = 256
+#max number of events kept for trace export
+LATENCY_TRACE_MAX_EVENTS = 300000
+#latency histogram bin width and upper edge in milliseconds
+LATENCY_HIST_BIN_MS = 5
+LATENCY_HIST_MAX_MS = 500
+#if True, time of each startup step is printed once hand detection starts
+STARTUP_REPORT = False
+#cold start budget in milliseconds since launch of startup steps. Steps over
+#budget are flagged in startup report.
+STARTUP_BUDGETS_MS = {"imports": 600,
+                      "menu shown": 1500,
+                      "camera streaming": 5000}
+#if True, only regions of gameplay display that changed are redrawn
+DIRTY_RECT_RENDERING = True
+#if more sprites than this are drawn, whole game area is redrawn instead of
+#each sprite's rect
+MAX_DIRTY_RECTS = 64
+#if True, game is drawn with SDL2 renderer textures instead of surface blits
+SDL2_RENDERER = False
+#if True and SDL2_RENDERER is True, game is scaled to fill the screen
+RENDERER_FULLSCREEN = False
+#max number of scaled and rotated images kept by DrawManager
+SPRITE_CACHE_SIZE = 32
+#max number of rendered text surfaces kept by DrawManager
+TEXT_CACHE_SIZE = 128
 #character limit for high score name
 NAME_CHARACTER_LIMIT = 12
 #object coords and sizes
@@ -24,6 +154,9 @@ GAME_X_SIZE = 800
 GAME_Y_SIZE = 600
 #camera feed height in game
 CAM_H = 120
+#max times per second camera preview is updated. None updates it whenever
+#hand detection has a new image.
+CAM_PREVIEW_FPS = None
 DEF_F_SIZE = 60
 NEW_HS_Y = 250
 HS_ENTRY_Y = 350
@@ -59,8 +192,8 @@ BLUE = (0, 0, 255)
 LIGHT_BLUE = (187, 244, 247)
 #CWD is initialized on app start
 CWD = os.path.dirname(sys.argv[0])
-FISH_IMAGE_PATH = f"{CWD}/game/assets/images/zebrafish.png"
-EMBRYO_IMAGE_PATH = f"{CWD}/game/assets/images/embryo.png"
+FISH_IMAGE_PATH = f"{CWD}/game/assets/images/zebrafish.PNG"
+EMBRYO_IMAGE_PATH = f"{CWD}/game/assets/images/embryo.PNG"
 BG_IMAGE_PATH = f"{CWD}/game/assets/images/background.jpg"
 MENU_IMAGE_PATH = f"{CWD}/game/assets/images/menu.png"
 GAME_SONG_PATH = f"{CWD}/game/assets/sounds/game_song.mp3"
@@ -69,3 +202,24 @@ MISTAKE_SOUND_PATH = f"{CWD}/game/assets/sounds/mistake_sound.mp3"
 PADDLE_SOUND_PATH = f"{CWD}/game/assets/sounds/paddle_sound.mp3"
 HAND_MODEL_PATH = f"{CWD}/utils/hand_landmarker.task"
 HS_CFG_PATH = f"{CWD}/highscores.cfg"
+#folder of decoded and scaled images. None decodes images on every start.
+ASSET_CACHE_DIR = f"{CWD}/.asset_cache"
+#number of threads images are decoded on when they aren't cached
+ASSET_DECODE_THREADS = 4
+#if not None, webcam images are recorded to this path
+CAMERA_RECORD_PATH = None
+#if not None, images are replayed from this recording instead of the webcam
+CAMERA_REPLAY_PATH = None
+#if True, recording is replayed at original cadence, else as fast as possible
+CAMERA_REPLAY_REALTIME = True
+#if not None, hand landmarks of each detection result are recorded to this
+#npz path
+LANDMARK_RECORD_PATH = None
+#if not None, hand landmarks are replayed from this npz recording instead of
+#using webcam and hand detection
+LANDMARK_REPLAY_PATH = None
+#shape of blank camera image shown when replaying landmarks
+REPLAY_IMAGE_SHAPE = (480, 640, 3)
+#if not None and LATENCY_TRACING is True, Chrome trace of session is written
+#to this path on exit
+LATENCY_TRACE_PATH = None
@@ -0,0 +1,376 @@
+"""
+This module runs webcam capture and hand detection in a separate process so
+that MediaPipe inference doesn't compete with the pygame loop for the GIL.
+
+Frames and their camera previews are passed back to the game process through
+a shared memory ring, and
+landmarks through a small shared array protected by a sequence lock, so
+neither side ever waits on a lock held by the other.
+
+Classes:
+
+DetectionProcess: Starts worker process and owns shared memory
+
+ProcessHandDetector: HandDetector stand-in that reads from shared memory
+
+ProcessHandCam: HandCam stand-in that controls worker process
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import time
+
+import numpy as np
+
+from utils import constants
+from utils.landmarks import NUM_LANDMARKS, LandmarkResult, array_to_result, result_to_array
+from utils.preview import get_preview_size
+
+#layout of landmark array
+_SEQ = 0
+_FRAME_ID = 1
+_CAPTURE_TIME = 2
+_LANDMARKS = 3
+_LANDMARK_ARRAY_SIZE = _LANDMARKS + NUM_LANDMARKS*3
+#layout of frame ring header. Followed by sequence number of each slot.
+_LATEST_SEQ = 0
+_SLOT_SEQS = 1
+#slot sequence number while slot is being written
+_WRITING = -1
+#max attempts to read landmarks while worker is writing them, after which
+#last result is kept
+_MAX_READ_ATTEMPTS = 1000
+
+
+class _SharedState(object):
+    """
+    Shared memory used by both processes. Created by the worker process once
+    the webcam frame shape is known, and attached to by the game process
+    using names.
+
+    Constructor Parameters:
+
+    shape: tuple
+        shape of webcam frames
+
+    dtype: str
+        dtype of webcam frames
+
+    names: dict[str, str] | None
+        names of shared memory blocks to attach to. If None, new blocks are
+        created.
+    """
+    def __init__(self, shape: tuple, dtype: str, names: dict[str, str] = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.num_slots = constants.DETECTION_PROCESS_RING_SLOTS
+        #previews are (width, height, 3) RGB uint8
+        width, height = get_preview_size(self.shape)
+        self.preview_shape = (width, height, 3)
+        frame_bytes = int(np.prod(self.shape))*self.dtype.itemsize
+        preview_bytes = int(np.prod(self.preview_shape))
+        sizes = {"frames": frame_bytes*self.num_slots,
+                 "previews": preview_bytes*self.num_slots,
+                 "header": (_SLOT_SEQS + self.num_slots)*8,
+                 "landmarks": _LANDMARK_ARRAY_SIZE*8}
+        self.is_owner = names is None
+        if self.is_owner:
+            self.blocks = {key: shared_memory.SharedMemory(create=True, size=size)
+                           for key, size in sizes.items()}
+        else:
+            self.blocks = {key: shared_memory.SharedMemory(name=names[key]) for key in sizes}
+        self.frames = np.ndarray((self.num_slots,) + self.shape, self.dtype,
+                                 buffer=self.blocks["frames"].buf)
+        self.previews = np.ndarray((self.num_slots,) + self.preview_shape, np.uint8,
+                                   buffer=self.blocks["previews"].buf)
+        self.header = np.ndarray((_SLOT_SEQS + self.num_slots,), np.int64,
+                                 buffer=self.blocks["header"].buf)
+        self.landmarks = np.ndarray((_LANDMARK_ARRAY_SIZE,), np.float64,
+                                    buffer=self.blocks["landmarks"].buf)
+        if self.is_owner:
+            self.header[:] = 0
+            self.landmarks[:] = 0
+
+    @property
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self):
+        #arrays must be released before shared memory can be closed
+        self.frames = self.previews = self.header = self.landmarks = None
+        for block in self.blocks.values():
+            block.close()
+            if self.is_owner:
+                block.unlink()
+
+
+class _ResultWriter(object):
+    """
+    Used in worker process to write each HandDetector result to shared
+    memory.
+    """
+    def __init__(self, state: _SharedState):
+        self.state = state
+        self.seq = 0
+
+    def write(self, result, image: np.ndarray, preview: np.ndarray, frame_id: int, capture_time: float):
+        state = self.state
+        self.seq += 1
+        #frame goes in next slot of ring. Slot is marked as being written so
+        #readers can tell if it was overwritten while they copied it.
+        slot = self.seq % state.num_slots
+        state.header[_SLOT_SEQS + slot] = _WRITING
+        np.copyto(state.frames[slot], image)
+        np.copyto(state.previews[slot], preview)
+        state.header[_SLOT_SEQS + slot] = self.seq
+        state.header[_LATEST_SEQ] = self.seq
+        #sequence lock: odd while landmarks are being written
+        landmarks = state.landmarks
+        landmarks[_SEQ] += 1
+        landmarks[_FRAME_ID] = -1 if frame_id is None else frame_id
+        landmarks[_CAPTURE_TIME] = capture_time or time.perf_counter()
+        landmarks[_LANDMARKS:] = result_to_array(result).ravel()
+        landmarks[_SEQ] += 1
+
+
+def _run_worker(conn, stop_event, index: int):
+    """
+    entry point of worker process. Opens webcam, sends frame format and
+    shared memory names through conn, waits for "start" before building
+    landmarker, then streams until stop_event is set.
+    """
+    #imported here so game process never imports mediapipe
+    from utils.camera import HandCam
+    from utils.hand_detection import HandDetector
+
+    hand_detector = HandDetector()
+    hand_cam = HandCam(hand_detector, index, record_path=constants.CAMERA_RECORD_PATH)
+    state = _SharedState(hand_cam.shape, hand_cam.dtype.str)
+    hand_detector.result_listener = _ResultWriter(state).write
+    conn.send({"shape": hand_cam.shape,
+               "dtype": hand_cam.dtype.str,
+               "fps": hand_cam.fps,
+               "names": state.names})
+    try:
+        if conn.recv() == "start":
+            hand_detector.set_landmarker()
+            hand_cam.start()
+            conn.send("ready")
+            stop_event.wait()
+    finally:
+        hand_cam.stop_stream()
+        if hand_cam.is_alive():
+            hand_cam.join()
+        hand_detector.result_listener = None
+        hand_detector.close()
+        state.close()
+
+
+class DetectionProcess(object):
+    """
+    Starts worker process that runs HandCam and HandDetector, and provides
+    hand_detector and hand_cam stand-ins that the game uses in their place.
+
+    Constructor Parameters:
+
+    index: int = 0
+        index of webcam to be used
+    """
+    def __init__(self, index: int = 0):
+        #spawn so worker doesn't inherit pygame and threads of game process
+        context = multiprocessing.get_context("spawn")
+        self._conn, worker_conn = context.Pipe()
+        self._stop_event = context.Event()
+        self.process = context.Process(target=_run_worker,
+                                       args=(worker_conn, self._stop_event, index),
+                                       daemon=True)
+        self.process.start()
+        #close worker end here so recv() raises EOFError if worker exits
+        worker_conn.close()
+        info = self._conn.recv()
+        self.state = _SharedState(info["shape"], info["dtype"], info["names"])
+        self.hand_detector = ProcessHandDetector(self)
+        self.hand_cam = ProcessHandCam(self, info["shape"], info["dtype"], info["fps"])
+        self._is_started = False
+        self._is_stopped = False
+
+    def start(self):
+        """
+        builds landmarker in worker process and starts detection. Blocks until
+        worker is ready.
+        """
+        if not self._is_started:
+            self._conn.send("start")
+            self._conn.recv()
+            self._is_started = True
+
+    def stop(self):
+        """
+        stops worker process and releases shared memory
+        """
+        #called by both hand_cam and hand_detector on exit
+        if self._is_stopped:
+            return
+        self._is_stopped = True
+        if not self._is_started and self.process.is_alive():
+            self._conn.send("stop")
+        self._stop_event.set()
+        self.process.join(constants.DETECTION_PROCESS_STOP_TIMEOUT_S)
+        self.state.close()
+
+
+class ProcessHandDetector(object):
+    """
+    Stand-in for HandDetector that reads results written to shared memory by
+    DetectionProcess worker. Has the same result, image, result_time,
+    result_frame_id and get_norm_coords() interface as HandDetector.
+
+    Constructor Parameters:
+
+    detection_process: DetectionProcess
+        process that results are read from
+    """
+    def __init__(self, detection_process: DetectionProcess):
+        self.detection_process = detection_process
+        #tracing is done within a process, so it isn't supported across them
+        self.tracer = None
+        self._state = detection_process.state
+        self._landmarks = np.zeros(_LANDMARK_ARRAY_SIZE, np.float64)
+        self._landmarks_seq = 0
+        self._result: LandmarkResult = None
+        self._image = np.empty(self._state.shape, self._state.dtype)
+        self._image_seq = 0
+        self._preview = np.empty(self._state.preview_shape, np.uint8)
+        self._preview_seq = 0
+
+    @property
+    def result(self) -> LandmarkResult:
+        self._read_landmarks()
+        return self._result
+
+    @property
+    def image(self) -> np.ndarray:
+        self._image_seq = self._read_slot(self._state.frames, self._image, self._image_seq)
+        return self._image if self._image_seq else None
+
+    @property
+    def image_seq(self):
+        header = self._state.header
+        if header is None:
+            return self._image_seq
+        return int(header[_LATEST_SEQ])
+
+    @property
+    def preview_seq(self):
+        #previews are written with images
+        return self.image_seq
+
+    @property
+    def result_time(self):
+        self._read_landmarks()
+        return self._landmarks[_CAPTURE_TIME] if self._landmarks_seq else None
+
+    @property
+    def result_frame_id(self):
+        self._read_landmarks()
+        frame_id = int(self._landmarks[_FRAME_ID])
+        return frame_id if self._landmarks_seq and frame_id >= 0 else None
+
+    def set_landmarker(self):
+        """
+        builds landmarker in worker process and starts detection
+        """
+        self.detection_process.start()
+
+    def get_norm_coords(self, is_interpolated: bool = True) -> tuple[float, float]:
+        """
+        returns normalized (x, y) coords of landmark 9 of latest result, or
+        None if there's no hand. Interpolation isn't done across processes,
+        so is_interpolated is ignored.
+        """
+        result = self.result
+        if result is None:
+            return None
+        for lmarks in result.hand_landmarks:
+            return (lmarks[9].x, lmarks[9].y)
+
+    def get_preview(self) -> np.ndarray:
+        """
+        returns camera preview of current image, or None if there's no image
+        yet
+        """
+        self._preview_seq = self._read_slot(self._state.previews, self._preview, self._preview_seq)
+        return self._preview if self._preview_seq else None
+
+    def close(self):
+        self.detection_process.stop()
+
+    def _read_landmarks(self):
+        """
+        copies landmarks from shared memory if worker has written new ones.
+        Retries if worker was writing them, which only takes microseconds. If
+        they're still being written after _MAX_READ_ATTEMPTS, or worker died
+        while writing them, last result is kept.
+        """
+        shared = self._state.landmarks
+        if shared is None:
+            return
+        for _ in range(_MAX_READ_ATTEMPTS):
+            seq = shared[_SEQ]
+            if seq == self._landmarks_seq:
+                return
+            #odd sequence number means worker is writing
+            if int(seq) % 2:
+                if not self.detection_process.process.is_alive():
+                    return
+                continue
+            np.copyto(self._landmarks, shared)
+            if shared[_SEQ] == seq:
+                break
+        else:
+            return
+        self._landmarks_seq = seq
+        self._result = array_to_result(self._landmarks[_LANDMARKS:].reshape(NUM_LANDMARKS, 3))
+
+    def _read_slot(self, ring: np.ndarray, out: np.ndarray, out_seq: int) -> int:
+        """
+        copies newest slot of ring (frames or previews) into preallocated out
+        if worker has written a new one since out_seq, and returns sequence
+        number of what's in out
+        """
+        header = self._state.header
+        if header is None:
+            return out_seq
+        seq = int(header[_LATEST_SEQ])
+        if seq == out_seq:
+            return out_seq
+        slot = seq % self._state.num_slots
+        np.copyto(out, ring[slot])
+        #slot was overwritten while copying, so keep previous sequence number
+        #and copy again on next read
+        if header[_SLOT_SEQS + slot] != seq:
+            return out_seq
+        return seq
+
+
+class ProcessHandCam(object):
+    """
+    Stand-in for HandCam. Webcam is owned by DetectionProcess worker, so this
+    only reports webcam format and stops the worker.
+    """
+    def __init__(self, detection_process: DetectionProcess, shape: tuple, dtype: str, fps: float):
+        self.detection_process = detection_process
+        self.hand_detector = detection_process.hand_detector
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fps = fps
+        self.aspect_ratio = self.shape[1]/self.shape[0]
+
+    def start(self):
+        """
+        worker starts streaming in ProcessHandDetector.set_landmarker()
+        """
+        pass
+
+    def stop_stream(self):
+        self.detection_process.stop()
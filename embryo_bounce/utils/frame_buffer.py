@@ -0,0 +1,150 @@
+"""
+This module contains the TripleBuffer class which hands frames from a writer
+thread to a reader thread without allocating a new frame for each handoff, and
+the FramePool class which reuses a fixed set of frames for a stream.
+"""
+
+from threading import Lock
+
+import numpy as np
+
+
+class TripleBuffer(object):
+    """
+    Preallocated pool of three frame buffers shared by one writer thread and
+    one reader thread.
+
+    The writer copies each frame into the back buffer in place and then swaps
+    it with the ready buffer. The reader swaps the ready buffer into the front
+    buffer when a newer frame has been written and reads the front buffer
+    directly. The writer never touches the front buffer, so the array returned
+    by read() stays valid until the next call to read().
+
+    Buffers are allocated on the first write and only reallocated if the frame
+    shape or dtype changes.
+
+    instance attributes:
+
+    self.seq: int
+        number of frames written. Can be compared to previous value to check
+        if a new frame has been written.
+    """
+    NUM_BUFFERS = 3
+    def __init__(self):
+        self.seq = 0
+        self._buffers: list[np.ndarray] = None
+        self._back = 0
+        self._ready = 1
+        self._front = 2
+        self._is_ready_new = False
+        self._is_front_valid = False
+        self._lock = Lock()
+
+    def write(self, frame: np.ndarray):
+        """
+        copies frame into back buffer and makes it available to reader.
+
+        parameters:
+
+        frame: np.ndarray
+            frame to be copied. frame isn't referenced after write() returns.
+        """
+        if not self._has_matching_buffers(frame):
+            self._allocate(frame.shape, frame.dtype)
+        np.copyto(self._buffers[self._back], frame)
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._is_ready_new = True
+            self.seq += 1
+
+    def read(self) -> np.ndarray:
+        """
+        returns newest frame written, or None if no frame has been written.
+        Returned array is owned by the TripleBuffer and shouldn't be modified.
+        """
+        with self._lock:
+            if self._is_ready_new:
+                self._front, self._ready = self._ready, self._front
+                self._is_ready_new = False
+                self._is_front_valid = True
+            if not self._is_front_valid:
+                return None
+            return self._buffers[self._front]
+
+    def _has_matching_buffers(self, frame: np.ndarray) -> bool:
+        if self._buffers is None:
+            return False
+        buffer = self._buffers[0]
+        return buffer.shape == frame.shape and buffer.dtype == frame.dtype
+
+    def _allocate(self, shape: tuple, dtype: np.dtype):
+        with self._lock:
+            self._buffers = [np.empty(shape, dtype) for _ in range(TripleBuffer.NUM_BUFFERS)]
+            self._is_ready_new = False
+            self._is_front_valid = False
+
+
+class FramePool(object):
+    """
+    Fixed pool of preallocated frames that a stream writes into. A frame
+    returned by acquire() isn't handed out again until it's given back with
+    release(), so readers can hold frames for as long as they need. When
+    every frame is held, acquire() returns None and the stream should drop
+    the frame it was going to write.
+
+    Frames are allocated on the first call to acquire() and only reallocated
+    if the frame shape or dtype changes. Frames of a previous allocation are
+    ignored when released.
+
+    Constructor Parameters:
+
+    size: int
+        number of frames in pool
+
+    instance attributes:
+
+    self.exhausted_count: int
+        number of acquire() calls that returned None
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.exhausted_count = 0
+        #id(frame): frame, for every frame of current allocation
+        self._frames: dict[int, np.ndarray] = {}
+        self._free: list[np.ndarray] = []
+        self._shape: tuple = None
+        self._dtype: np.dtype = None
+        self._lock = Lock()
+
+    @property
+    def free_count(self):
+        return len(self._free)
+
+    def acquire(self, shape: tuple, dtype: np.dtype) -> np.ndarray:
+        """
+        returns free frame to be written into, or None if all frames are
+        held. Contents are left over from previous use.
+        """
+        with self._lock:
+            if self._shape != shape or self._dtype != dtype:
+                self._allocate(shape, dtype)
+            if not self._free:
+                self.exhausted_count += 1
+                return None
+            return self._free.pop()
+
+    def release(self, frame: np.ndarray):
+        """
+        gives frame back to pool so it can be written into again
+        """
+        with self._lock:
+            #frame may be from a previous allocation, or released twice
+            if self._frames.get(id(frame)) is frame and not any(free is frame for free in self._free):
+                self._free.append(frame)
+
+    def _allocate(self, shape: tuple, dtype: np.dtype):
+        frames = [np.empty(shape, dtype) for _ in range(self.size)]
+        self._frames = {id(frame): frame for frame in frames}
+        self._free = frames
+        self._shape = shape
+        self._dtype = dtype
@@ -0,0 +1,113 @@
+"""
+This module contains the FrameMailbox class which hands webcam frames from
+the capture thread to the hand detection thread.
+"""
+
+from collections import deque
+from threading import Condition
+from typing import Any, Callable
+
+
+class FrameMailbox(object):
+    """
+    Bounded "latest frame wins" mailbox between HandCam and HandDetector.
+
+    The capture thread puts every frame it reads into the mailbox. When the
+    mailbox is full, the oldest frame is discarded and counted as dropped.
+    The detection side always takes the newest frame, so inference never runs
+    on a stale image.
+
+    Constructor Parameters:
+
+    capacity: int = 1
+        max number of frames held in the mailbox
+
+    drop_listener: Callable[[Any], None] | None
+        called with each frame that's discarded, so its buffer can be reused
+
+    instance attributes:
+
+    self.capacity: int
+        max number of frames held in the mailbox
+
+    self.dropped_count: int
+        number of frames that were discarded before being taken
+
+    self.received_count: int
+        number of frames put into mailbox
+    """
+    def __init__(self, capacity: int = 1, drop_listener: Callable[[Any], None] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.drop_listener = drop_listener
+        self.dropped_count = 0
+        self.received_count = 0
+        self._frames = deque(maxlen=capacity)
+        self._condition = Condition()
+        self._is_closed = False
+
+    @property
+    def is_closed(self):
+        return self._is_closed
+
+    def put(self, frame):
+        """
+        puts frame in mailbox. If mailbox is full, oldest frame is dropped.
+        """
+        dropped = []
+        with self._condition:
+            if len(self._frames) == self.capacity:
+                self.dropped_count += 1
+                dropped.append(self._frames.popleft())
+            self._frames.append(frame)
+            self.received_count += 1
+            self._condition.notify_all()
+        self._on_drop(dropped)
+
+    def get_latest(self, timeout: float = None):
+        """
+        waits for a frame and returns newest frame in mailbox. Older frames
+        still in mailbox are dropped. Returns None if timeout is reached or
+        mailbox is closed.
+
+        parameters:
+
+        timeout: float | None
+            max time to wait in seconds. If None, waits until frame is put or
+            mailbox is closed.
+        """
+        with self._condition:
+            has_frame = self._condition.wait_for(
+                lambda: self._frames or self._is_closed, timeout)
+            if not has_frame or not self._frames:
+                return None
+            frame = self._frames.pop()
+            dropped = list(self._frames)
+            self.dropped_count += len(dropped)
+            self._frames.clear()
+            self._condition.notify_all()
+        self._on_drop(dropped)
+        return frame
+
+    def wait_until_empty(self, timeout: float = None) -> bool:
+        """
+        waits until all frames have been taken from mailbox. Returns True if
+        mailbox is empty, False if timeout is reached.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._frames or self._is_closed, timeout)
+
+    def _on_drop(self, frames: list):
+        if self.drop_listener:
+            for frame in frames:
+                self.drop_listener(frame)
+
+    def close(self):
+        """
+        closes mailbox and wakes up any thread waiting on get_latest()
+        """
+        with self._condition:
+            self._is_closed = True
+            self._condition.notify_all()
@@ -0,0 +1,160 @@
+"""
+This module contains the FrameRecorder and FrameRecording classes which write
+and read webcam frames in a memory-mapped recording file.
+
+A recording file is a fixed-size JSON header followed by one record per frame.
+Each record is a float64 capture timestamp in seconds followed by the raw
+frame bytes, so frames can be read straight from the memory map without
+decoding.
+"""
+
+import json
+import os
+
+import numpy as np
+
+#bytes reserved for JSON header at start of recording file
+HEADER_SIZE = 4096
+#number of records file is grown by when it's full
+GROWTH_FRAMES = 256
+
+
+def _get_record_dtype(shape: tuple, dtype: np.dtype) -> np.dtype:
+    return np.dtype([("timestamp", np.float64), ("frame", dtype, shape)])
+
+
+class FrameRecorder(object):
+    """
+    Writes frames and their capture timestamps to a memory-mapped recording
+    file. The file grows as frames are written and is trimmed to the number of
+    frames written on close().
+
+    Constructor Parameters:
+
+    path: str
+        path of recording file. Overwritten if it exists.
+
+    fps: float
+        frames per second of camera, stored in header for information
+    """
+    def __init__(self, path: str, fps: float = 0):
+        self.path = path
+        self.fps = fps
+        self.count = 0
+        self._records: np.memmap = None
+        self._shape: tuple = None
+        self._dtype: np.dtype = None
+        self._start_time: float = None
+
+    def write(self, frame: np.ndarray, capture_time: float):
+        """
+        appends frame to recording.
+
+        parameters:
+
+        frame: np.ndarray
+            frame to record. Every frame must have the same shape and dtype.
+
+        capture_time: float
+            time.perf_counter() time that frame was captured
+        """
+        if self._records is None:
+            self._open(frame.shape, frame.dtype)
+            self._start_time = capture_time
+        elif frame.shape != self._shape or frame.dtype != self._dtype:
+            raise ValueError(f"frame shape {frame.shape} doesn't match recording {self._shape}")
+        if self.count == self._records.shape[0]:
+            self._grow()
+        self._records["timestamp"][self.count] = capture_time - self._start_time
+        self._records["frame"][self.count] = frame
+        self.count += 1
+
+    def close(self):
+        """
+        writes final header and trims file to frames written
+        """
+        if self._records is None:
+            return
+        self._records.flush()
+        itemsize = self._records.dtype.itemsize
+        #release memory map before resizing file
+        self._records = None
+        with open(self.path, "r+b") as recording_file:
+            self._write_header(recording_file)
+            recording_file.truncate(HEADER_SIZE + self.count*itemsize)
+
+    def _open(self, shape: tuple, dtype: np.dtype):
+        self._shape = shape
+        self._dtype = np.dtype(dtype)
+        with open(self.path, "wb") as recording_file:
+            self._write_header(recording_file)
+        self._map(GROWTH_FRAMES)
+
+    def _grow(self):
+        capacity = self._records.shape[0] + GROWTH_FRAMES
+        self._records.flush()
+        self._map(capacity)
+
+    def _map(self, capacity: int):
+        record_dtype = _get_record_dtype(self._shape, self._dtype)
+        #r+ memmap extends file to fit shape
+        self._records = np.memmap(self.path, dtype=record_dtype, mode="r+",
+                                  offset=HEADER_SIZE, shape=(capacity,))
+
+    def _write_header(self, recording_file):
+        header = {"shape": list(self._shape),
+                  "dtype": self._dtype.str,
+                  "count": self.count,
+                  "fps": self.fps}
+        header_bytes = json.dumps(header).encode()
+        recording_file.seek(0)
+        recording_file.write(header_bytes.ljust(HEADER_SIZE, b" "))
+
+
+class FrameRecording(object):
+    """
+    Read-only view of a recording file written by FrameRecorder. Frames are
+    memory-mapped, so opening a recording doesn't load it into memory.
+
+    Constructor Parameters:
+
+    path: str
+        path of recording file
+
+    instance attributes:
+
+    self.timestamps: np.ndarray
+        capture time of each frame in seconds since first frame
+
+    self.frames: np.ndarray
+        array of frames with shape (count, height, width, channels). Frames
+        are copy-on-write, so they can be modified without changing the file.
+
+    self.fps: float
+        frames per second of camera that recording was made with
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as recording_file:
+            header = json.loads(recording_file.read(HEADER_SIZE))
+        self.shape = tuple(header["shape"])
+        self.dtype = np.dtype(header["dtype"])
+        self.fps = header["fps"]
+        record_dtype = _get_record_dtype(self.shape, self.dtype)
+        count = (os.path.getsize(path) - HEADER_SIZE)//record_dtype.itemsize
+        if count == 0:
+            raise ValueError(f"recording {path} has no frames")
+        self._records = np.memmap(path, dtype=record_dtype, mode="c",
+                                  offset=HEADER_SIZE, shape=(count,))
+        #header count is only written on close. If recording wasn't closed,
+        #unwritten records at end of file have timestamps of 0.
+        if header["count"]:
+            self._records = self._records[:header["count"]]
+        else:
+            written = np.flatnonzero(self._records["timestamp"])
+            self._records = self._records[:written[-1] + 1 if written.size else 1]
+        self.timestamps = self._records["timestamp"]
+        self.frames = self._records["frame"]
+
+    def __len__(self):
+        return self._records.shape[0]
@@ -7,16 +7,27 @@ HandDetector: Class used to process images and detect hand presence and
               positions
 """
 
-import copy
+import math
+from threading import Condition
 import time
+from typing import TYPE_CHECKING
 
-import mediapipe as mp
+import cv2
 import numpy as np
-from mediapipe.tasks.python import vision, BaseOptions
-from mediapipe.tasks.python.vision import HandLandmarkerResult, RunningMode
-from mediapipe.framework.formats import landmark_pb2
 
 from utils import constants
+from utils.frame_buffer import TripleBuffer
+from utils.landmark_recording import LandmarkRecorder
+from utils.latency_tracer import LatencyTracer
+from utils.preview import make_preview
+
+#mediapipe takes seconds to import, so it's only imported in methods that use
+#it. Modules that only need HandDetector for type hints then import quickly.
+if TYPE_CHECKING:
+    import mediapipe as mp
+    from mediapipe.tasks.python import vision
+    from mediapipe.tasks.python.vision import HandLandmarkerResult
+    from mediapipe.framework.formats import landmark_pb2
 
 
 class HandDetector():
@@ -27,6 +38,21 @@ class HandDetector():
     properties.
 
     With results, calculates current hand position with normalized coordinates.
+
+    If is_adaptive_rate is True, HandDetector measures its own inference
+    latency and skips frames so that detection only runs as often as the
+    machine can keep up with. Between detections, get_norm_coords()
+    interpolates between the last two results so the paddle still moves
+    smoothly.
+
+    If is_roi_enabled is True, once a hand has been found only a region of
+    interest around its last landmarks is sent to the landmarker, downscaled
+    to at most roi_max_side pixels. Landmarks are mapped back to full image
+    coordinates, and the full image is used again when the hand is lost.
+    The landmarker tracks the hand from one frame to the next in the coords
+    of the image it's given, so the region of interest stays where it is
+    until the hand comes within roi_edge_fraction of its edge, instead of
+    following the hand every frame.
     """
     #hand landmarks to be used in tracking
     LM_1 = 5
@@ -34,15 +60,64 @@ class HandDetector():
     LM_3 = 13
     def __init__(self):
         self._result = None
-        self._image = None
+        #preallocated so results don't allocate a new frame for every image
+        self._image_buffer = TripleBuffer()
+        #camera preview of each result image, made on detection thread so
+        #game loop only has to blit it
+        self._preview_buffer = TripleBuffer()
         self.model_asset_path = constants.HAND_MODEL_PATH
         self.num_hands = 1
         self.min_hand_detection_confidence=0.2
         self.min_hand_presence_confidence=0.2
         self.min_tracking_confidence=0.2
-        self.running_mode = RunningMode.LIVE_STREAM
+        #None is RunningMode.LIVE_STREAM
+        self.running_mode = None
         self.landmarker = None
         self.start_time_ns = time.time_ns()
+        #max number of images submitted to landmarker without a result yet
+        self.max_in_flight = constants.MAX_IN_FLIGHT_DETECTIONS
+        self._in_flight = 0
+        self._in_flight_condition = Condition()
+        #adaptive detection rate settings and measurements
+        self.is_adaptive_rate = constants.ADAPTIVE_DETECTION_RATE
+        self.detection_load = constants.DETECTION_LOAD_TARGET
+        self.max_frame_skip = constants.MAX_DETECTION_FRAME_SKIP
+        self.latency_s: float = None
+        self.frame_interval_s: float = None
+        #(submit time, capture time, frame id, submitted image, preview, roi
+        #rect) for each timestamp that hasn't had a result yet
+        self._pending: dict[int, tuple] = {}
+        self._result_time: float = None
+        self._result_frame_id: int = None
+        #shared with HandCam, PositionManager and DisplayManager
+        self.tracer: LatencyTracer = None
+        if constants.LATENCY_TRACING:
+            self.tracer = LatencyTracer(constants.LATENCY_TRACE_PATH is not None)
+        self.landmark_recorder: LandmarkRecorder = None
+        if constants.LANDMARK_RECORD_PATH:
+            self.landmark_recorder = LandmarkRecorder(constants.LANDMARK_RECORD_PATH)
+        #called with (result, image, preview, frame_id, capture_time) after each
+        #result.
+        #Used to pass results out of a detection process.
+        self.result_listener = None
+        #called with each image given to detect_async() once it's no longer
+        #used, so its buffer can be reused
+        self.image_release_listener = None
+        #(frame_num, capture_time) of last frame offered to detection
+        self._last_offer: tuple[int, float] = None
+        self._last_detected_frame_num = -math.inf
+        #(time, coords) of previous and latest result with a hand in it
+        self._coords_samples: tuple = (None, None)
+        #region of interest settings and normalized (x0, y0, x1, y1) bounding
+        #box of last hand landmarks
+        self.is_roi_enabled = constants.HAND_ROI_ENABLED
+        self.roi_margin = constants.HAND_ROI_MARGIN
+        self.roi_min_fraction = constants.HAND_ROI_MIN_FRACTION
+        self.roi_max_side = constants.HAND_ROI_MAX_SIDE
+        self.roi_edge_fraction = constants.HAND_ROI_EDGE_FRACTION
+        self._hand_bbox: tuple[float, float, float, float] = None
+        #normalized (x, y, width, height) of region of interest in use
+        self._roi_rect: tuple[float, float, float, float] = None
 
     #@property to make them read-only
     @property
@@ -51,7 +126,52 @@ class HandDetector():
     
     @property
     def image(self):
-        return self._image
+        #array is owned by image buffer, so it shouldn't be modified
+        return self._image_buffer.read()
+
+    @property
+    def image_seq(self):
+        """
+        number of images written by results. Changes whenever image does.
+        """
+        return self._image_buffer.seq
+
+    @property
+    def preview_seq(self):
+        """
+        number of previews written by results. Changes whenever preview does.
+        """
+        return self._preview_buffer.seq
+
+    @property
+    def result_time(self):
+        """
+        time.perf_counter() time that image of current result was captured
+        """
+        return self._result_time
+
+    @property
+    def result_frame_id(self):
+        """
+        frame id given to detect_async() for image of current result
+        """
+        return self._result_frame_id
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def frame_skip(self):
+        """
+        number of captured frames per detection. 1 means every frame is
+        detected. Always 1 if is_adaptive_rate is False.
+        """
+        if not self.is_adaptive_rate or not self.latency_s or not self.frame_interval_s:
+            return 1
+        #frames needed so that inference only takes up detection_load of time
+        skip = math.ceil(self.latency_s/(self.frame_interval_s*self.detection_load))
+        return max(1, min(skip, self.max_frame_skip))
 
     def set_landmarker(self):
         """
@@ -59,26 +179,160 @@ class HandDetector():
         """
         #Making this function a class attribute crashes mediapipe without
         #a logged error or exception, so define it here instead.
-        def set_result(result: HandLandmarkerResult,
-                       output_image: mp.Image,
+        from mediapipe.tasks.python import vision
+
+        def set_result(result: "HandLandmarkerResult",
+                       output_image: "mp.Image",
                        timestamp_ms: int):
-            #output image can't be modofied so make modifiable copy
-            self._image = copy.deepcopy(output_image.numpy_view())
+            submit_time, capture_time, frame_id, image, preview, roi_rect = self._pending.pop(
+                timestamp_ms, (None,)*6)
+            submitted_image = image
+            if roi_rect is not None:
+                self._map_landmarks_from_roi(result, roi_rect)
+            if image is None:
+                #output image is only valid during callback, so copy it
+                image = output_image.numpy_view()
+            if preview is None:
+                preview = make_preview(image)
+            #copy full image (not roi) into preallocated buffer
+            self._image_buffer.write(image)
+            self._preview_buffer.write(preview)
+            self._result_time = capture_time
+            self._result_frame_id = frame_id
             self._result = result
+            if self.tracer:
+                self.tracer.mark(frame_id, "detection")
+            if self.landmark_recorder:
+                self.landmark_recorder.write(result, capture_time or time.perf_counter())
+            if self.result_listener:
+                self.result_listener(result, image, preview, frame_id, capture_time)
+            self._update_latency(submit_time)
+            self._update_coords_samples(result)
+            self._update_hand_bbox(result)
+            self._release_image(submitted_image)
+            self._release_slot()
         
         options = self._get_options(result_callback=set_result)
         self.landmarker = vision.HandLandmarker.create_from_options(options)
 
-    def detect_async(self, image):
+    def detect_async(self, image, capture_time: float = None, frame_id: int = None):
         """
         sets detect_async function of landmarker.
+
+        parameters:
+
+        image: np.ndarray
+            image to be detected
+
+        capture_time: float | None
+            time.perf_counter() time that image was captured. If None, time
+            of this call is used.
+
+        frame_id: int | None
+            id of image used for latency tracing
         """
+        import mediapipe as mp
+
         #detection sometimes complains about monotonic increase of times
         #so input nanoseconds so that it's always monotonic
         time_ms = int((time.time_ns() - self.start_time_ns))
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
+        roi_rect = self._get_roi_rect(image.shape)
+        if roi_rect is None:
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
+        else:
+            roi_image = self._get_roi_image(image, roi_rect)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=roi_image)
+        with self._in_flight_condition:
+            self._in_flight += 1
+        submit_time = time.perf_counter()
+        if capture_time is None:
+            capture_time = submit_time
+        #preview is made here, while landmarker is busy, rather than in result
+        #callback
+        preview = make_preview(image)
+        self._pending[time_ms] = (submit_time, capture_time, frame_id, image, preview, roi_rect)
         #Takes image and time in milliseconds as arguments
-        self.landmarker.detect_async(mp_image, time_ms)
+        try:
+            self.landmarker.detect_async(mp_image, time_ms)
+        except Exception:
+            #image was never submitted, so no callback will free its slot
+            self._pending.pop(time_ms, None)
+            self._release_image(image)
+            self._release_slot()
+            raise
+
+    def should_detect(self, frame_num: int, capture_time: float) -> bool:
+        """
+        Should be called for each captured frame before it's detected. Returns
+        False if frame should be skipped based on frame_skip.
+
+        parameters:
+
+        frame_num: int
+            number of frames captured by camera before this frame
+
+        capture_time: float
+            time.perf_counter() time that frame was captured
+        """
+        if self._last_offer is not None:
+            last_frame_num, last_capture_time = self._last_offer
+            if frame_num > last_frame_num:
+                interval = (capture_time - last_capture_time)/(frame_num - last_frame_num)
+                self.frame_interval_s = self._get_average(self.frame_interval_s, interval)
+        self._last_offer = (frame_num, capture_time)
+        if frame_num - self._last_detected_frame_num >= self.frame_skip:
+            self._last_detected_frame_num = frame_num
+            return True
+        return False
+
+    def wait_for_slot(self, timeout: float = None) -> bool:
+        """
+        waits until fewer than max_in_flight images are being processed by
+        landmarker. Returns True if a slot is free, False if timeout is reached.
+
+        parameters:
+
+        timeout: float | None
+            max time to wait in seconds. If None, waits until slot is free.
+        """
+        with self._in_flight_condition:
+            return self._in_flight_condition.wait_for(
+                lambda: self._in_flight < self.max_in_flight, timeout)
+
+    def reset_in_flight(self):
+        """
+        frees all slots. Used if landmarker never returns results for
+        submitted images so that detection doesn't stall forever.
+        """
+        with self._in_flight_condition:
+            self._in_flight = 0
+            #entries are popped one at a time, since a late result callback
+            #may pop one at the same time
+            while self._pending:
+                try:
+                    _, entry = self._pending.popitem()
+                except KeyError:
+                    break
+                self._release_image(entry[3])
+            self._in_flight_condition.notify_all()
+
+    def close(self):
+        """
+        closes landmarker and saves landmark recording
+        """
+        if self.landmarker:
+            self.landmarker.close()
+        if self.landmark_recorder:
+            self.landmark_recorder.close()
+
+    def get_preview(self) -> np.ndarray:
+        """
+        returns camera preview of current image, or None if there's no image
+        yet. Preview is constants.CAM_H high, RGB, and indexed (x, y) like
+        pygame.surfarray, so it can be blitted as is. Array is owned by
+        preview buffer, so it shouldn't be modified.
+        """
+        return self._preview_buffer.read()
 
     def draw_landmarks_on_image(self) -> np.ndarray:
         #This method should go somewhere else. Perhaps just in testing.
@@ -97,6 +351,8 @@ class HandDetector():
             rgb_image with hand landmarks overlayed on it.
             Or, if self.result is None, returns None.
         """
+        import mediapipe as mp
+
         if self.result is None:
             return None
         annotated_image = np.copy(self.image)
@@ -110,18 +366,172 @@ class HandDetector():
             mp.solutions.drawing_styles.get_default_hand_connections_style())
         return annotated_image
         
-    def get_norm_coords(self) -> tuple[float, float]:
+    def get_norm_coords(self, is_interpolated: bool = True) -> tuple[float, float]:
         """
         if self.result is None, returns None. Else, returns normalized coords of 
         hand and returns it as (x,y) tuple.
 
+        If is_adaptive_rate and is_interpolated are True, coords are 
+        interpolated between the last two results so that they change smoothly
+        between detections.
         """
-        for lmarks in self.result.hand_landmarks:
+        if self.result is None:
+            return None
+        if self.is_adaptive_rate and is_interpolated:
+            return self._get_interpolated_coords()
+        return self._get_result_coords(self.result)
+
+    def _get_result_coords(self, result: "HandLandmarkerResult") -> tuple[float, float]:
+        for lmarks in result.hand_landmarks:
             #Index 9 is MIDDLE_FINGER_MCP landmark. 
             #see https://developers.google.com/mediapipe/solutions/vision/hand_landmarker
             return(lmarks[9].x, lmarks[9].y)
-            
-    def _get_normalized_proto(self, hand_landmarks) -> landmark_pb2.NormalizedLandmarkList:
+
+    def _get_interpolated_coords(self) -> tuple[float, float]:
+        """
+        returns coords moved from previous result coords to latest result
+        coords over the time between the two results. This lags one detection
+        behind but doesn't jump when detection runs less often than rendering.
+        """
+        prev_sample, sample = self._coords_samples
+        if sample is None:
+            return None
+        if prev_sample is None:
+            return sample[1]
+        prev_time, prev_coords = prev_sample
+        sample_time, coords = sample
+        interval = sample_time - prev_time
+        if interval <= 0:
+            return coords
+        fraction = min((time.perf_counter() - sample_time)/interval, 1)
+        return (prev_coords[0] + (coords[0] - prev_coords[0])*fraction,
+                prev_coords[1] + (coords[1] - prev_coords[1])*fraction)
+
+    def _update_coords_samples(self, result: "HandLandmarkerResult"):
+        coords = self._get_result_coords(result)
+        if coords is None:
+            #hand was lost, so don't interpolate from old position
+            self._coords_samples = (None, None)
+        else:
+            self._coords_samples = (self._coords_samples[1], (time.perf_counter(), coords))
+
+    def _update_latency(self, submit_time: float):
+        if submit_time is not None:
+            self.latency_s = self._get_average(
+                self.latency_s, time.perf_counter() - submit_time)
+
+    def _update_hand_bbox(self, result: "HandLandmarkerResult"):
+        """
+        sets _hand_bbox to normalized bounding box of first hand in result, or
+        None if there are no hands in result.
+        """
+        self._hand_bbox = None
+        for lmarks in result.hand_landmarks:
+            x_values = [lmark.x for lmark in lmarks]
+            y_values = [lmark.y for lmark in lmarks]
+            self._hand_bbox = (min(x_values), min(y_values), max(x_values), max(y_values))
+            return
+
+    def _get_roi_rect(self, shape: tuple) -> tuple[float, float, float, float]:
+        """
+        returns normalized (x, y, width, height) of region of interest around
+        last hand bounding box, or None if full image should be used. The
+        previous region is kept while the hand is still well inside it.
+        """
+        bbox = self._hand_bbox
+        if not self.is_roi_enabled or bbox is None:
+            self._roi_rect = None
+            return None
+        if self._roi_rect is not None and self._is_inside_roi(bbox, self._roi_rect):
+            return self._roi_rect
+        self._roi_rect = self._get_new_roi_rect(bbox, shape)
+        return self._roi_rect
+
+    def _is_inside_roi(self, bbox: tuple, roi_rect: tuple) -> bool:
+        """
+        returns True if normalized bbox is at least roi_edge_fraction of
+        roi_rect's size away from each of its edges.
+        """
+        x, y, width, height = roi_rect
+        edge_x = width*self.roi_edge_fraction
+        edge_y = height*self.roi_edge_fraction
+        return (bbox[0] >= x + edge_x and bbox[2] <= x + width - edge_x
+                and bbox[1] >= y + edge_y and bbox[3] <= y + height - edge_y)
+
+    def _get_new_roi_rect(self, bbox: tuple, shape: tuple) -> tuple[float, float, float, float]:
+        """
+        returns normalized (x, y, width, height) of region of interest centered
+        on bbox, or None if full image should be used.
+        """
+        height, width = shape[:2]
+        #square region in pixels so hand still fits if it rotates
+        side = max((bbox[2] - bbox[0])*width, (bbox[3] - bbox[1])*height)
+        side = max(side*(1 + 2*self.roi_margin), self.roi_min_fraction*min(width, height))
+        center_x = (bbox[0] + bbox[2])/2*width
+        center_y = (bbox[1] + bbox[3])/2*height
+        left = int(max(center_x - side/2, 0))
+        top = int(max(center_y - side/2, 0))
+        right = int(min(center_x + side/2, width))
+        bottom = int(min(center_y + side/2, height))
+        #no point cropping if roi is (almost) the full image
+        if (right - left)*(bottom - top) >= constants.HAND_ROI_MAX_AREA_FRACTION*width*height:
+            return None
+        if right - left < 2 or bottom - top < 2:
+            return None
+        return (left/width, top/height, (right - left)/width, (bottom - top)/height)
+
+    def _get_roi_image(self, image: np.ndarray, roi_rect: tuple) -> np.ndarray:
+        """
+        returns contiguous crop of image in roi_rect, downscaled so that its
+        longest side is at most roi_max_side.
+        """
+        height, width = image.shape[:2]
+        left = int(round(roi_rect[0]*width))
+        top = int(round(roi_rect[1]*height))
+        right = left + int(round(roi_rect[2]*width))
+        bottom = top + int(round(roi_rect[3]*height))
+        roi_image = image[top:bottom, left:right]
+        longest_side = max(roi_image.shape[:2])
+        if longest_side > self.roi_max_side:
+            scale = self.roi_max_side/longest_side
+            size = (max(int(roi_image.shape[1]*scale), 1), max(int(roi_image.shape[0]*scale), 1))
+            return cv2.resize(roi_image, size, interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(roi_image)
+
+    def _map_landmarks_from_roi(self, result: "HandLandmarkerResult", roi_rect: tuple):
+        """
+        changes normalized landmark coords in result from roi coords to full
+        image coords.
+        """
+        x, y, width, height = roi_rect
+        for lmarks in result.hand_landmarks:
+            for lmark in lmarks:
+                lmark.x = x + lmark.x*width
+                lmark.y = y + lmark.y*height
+
+    def _get_average(self, average: float, value: float) -> float:
+        """
+        returns exponential moving average of value
+        """
+        if average is None:
+            return value
+        weight = constants.DETECTION_RATE_SMOOTHING
+        return average + weight*(value - average)
+
+
+    def _release_image(self, image: np.ndarray):
+        if image is not None and self.image_release_listener:
+            self.image_release_listener(image)
+
+    def _release_slot(self):
+        with self._in_flight_condition:
+            if self._in_flight > 0:
+                self._in_flight -= 1
+            self._in_flight_condition.notify_all()
+
+    def _get_normalized_proto(self, hand_landmarks) -> "landmark_pb2.NormalizedLandmarkList":
+        from mediapipe.framework.formats import landmark_pb2
+
         proto = landmark_pb2.NormalizedLandmarkList()
         proto.landmark.extend([
             landmark_pb2.NormalizedLandmark(
@@ -129,7 +539,7 @@ class HandDetector():
         ])
         return proto
     
-    def _get_options(self, result_callback) -> vision.HandLandmarkerOptions:
+    def _get_options(self, result_callback) -> "vision.HandLandmarkerOptions":
         """
         returns HandLandmarkerOptions instance using instance attributes as 
         arguments.
@@ -145,13 +555,19 @@ class HandDetector():
             returns HandLandmarkerOptions object using instance attributes and
             result_callback as arguments.
         """
+        from mediapipe.tasks.python import vision, BaseOptions
+        from mediapipe.tasks.python.vision import RunningMode
+
+        running_mode = self.running_mode
+        if running_mode is None:
+            running_mode = RunningMode.LIVE_STREAM
         options = vision.HandLandmarkerOptions(
             base_options = BaseOptions(model_asset_path=self.model_asset_path),
             num_hands=self.num_hands,
             min_hand_detection_confidence=self.min_hand_detection_confidence,
             min_hand_presence_confidence=self.min_hand_presence_confidence, 
             min_tracking_confidence=self.min_tracking_confidence,
-            running_mode=self.running_mode,
+            running_mode=running_mode,
             result_callback=result_callback)
         return options
     
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+This module contains classes that record hand landmark results and replay
+them without MediaPipe or a webcam.
+
+Classes:
+
+LandmarkRecorder: Records landmarks of each HandDetector result
+
+ReplayHandDetector: HandDetector stand-in that serves recorded results
+
+ReplayCam: HandCam stand-in used with ReplayHandDetector
+"""
+
+import time
+
+import numpy as np
+
+from utils import constants
+from utils.landmarks import LandmarkResult, array_to_result, result_to_array
+from utils.preview import make_preview
+
+
+class LandmarkRecorder(object):
+    """
+    Records first hand of each result as a (21, 3) float32 array of landmark
+    coords, with the time the result's frame was captured. Results with no
+    hand are recorded as NaN so lost tracking is replayed too.
+
+    Recording is saved to path as an npz file with "landmarks" (N, 21, 3)
+    and "timestamps_s" (N,) arrays on close().
+
+    Constructor Parameters:
+
+    path: str
+        path of npz file
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._landmarks: list[np.ndarray] = []
+        self._timestamps: list[float] = []
+
+    def write(self, result, capture_time: float):
+        """
+        records result.
+
+        parameters:
+
+        result: HandLandmarkerResult | LandmarkResult
+            result to be recorded
+
+        capture_time: float
+            time.perf_counter() time that result's frame was captured
+        """
+        self._landmarks.append(result_to_array(result))
+        self._timestamps.append(capture_time)
+
+    def close(self):
+        """
+        saves recording to path
+        """
+        timestamps = np.array(self._timestamps, dtype=np.float64)
+        if timestamps.size:
+            timestamps -= timestamps[0]
+        landmarks = np.array(self._landmarks, dtype=np.float32).reshape(-1, 21, 3)
+        np.savez(self.path, landmarks=landmarks, timestamps_s=timestamps)
+
+
+class ReplayHandDetector(object):
+    """
+    Stand-in for HandDetector that serves results recorded by LandmarkRecorder
+    through result, image and get_norm_coords(). Doesn't import MediaPipe or
+    use a webcam, so games and benchmarks using it start in milliseconds.
+
+    Constructor Parameters:
+
+    path: str
+        path of npz recording
+
+    is_realtime: bool = True
+        if True, results are replayed at recorded timestamps, starting when
+        set_landmarker() is called. If False, replay advances one result every
+        time get_norm_coords() is called, so gameplay is deterministic.
+
+    is_looped: bool = True
+        if True, replay restarts when recording ends. If False, last result is
+        kept.
+
+    image_shape: tuple = constants.REPLAY_IMAGE_SHAPE
+        shape of blank image returned by image
+    """
+    def __init__(self,
+                 path: str,
+                 is_realtime: bool = True,
+                 is_looped: bool = True,
+                 image_shape: tuple = constants.REPLAY_IMAGE_SHAPE):
+        with np.load(path) as recording:
+            self.landmarks = recording["landmarks"]
+            self.timestamps = recording["timestamps_s"]
+        if not self.timestamps.size:
+            raise ValueError(f"landmark recording {path} has no results")
+        self.is_realtime = is_realtime
+        self.is_looped = is_looped
+        #same attributes that HandDetector shares with other classes
+        self.tracer = None
+        self.result_frame_id = None
+        self._image = np.full(image_shape, 255, dtype=np.uint8)
+        self._preview = np.ascontiguousarray(make_preview(self._image))
+        self._results = [array_to_result(lmarks) for lmarks in self.landmarks]
+        self._index = -1
+        self._start_time: float = None
+
+    @property
+    def result(self) -> LandmarkResult:
+        index, _ = self._get_position()
+        if index < 0:
+            return None
+        return self._results[index]
+
+    @property
+    def image(self):
+        return self._image
+
+    @property
+    def image_seq(self):
+        #blank image never changes
+        return 1
+
+    @property
+    def preview_seq(self):
+        return 1
+
+    @property
+    def result_time(self):
+        """
+        time.perf_counter() time that current result would have been captured
+        """
+        index, loop = self._get_position()
+        if index < 0 or self._start_time is None:
+            return None
+        return self._start_time + self.timestamps[index] + loop*self._get_duration()
+
+    def set_landmarker(self):
+        """
+        starts replay
+        """
+        self._start_time = time.perf_counter()
+        self._index = -1
+
+    def get_preview(self) -> np.ndarray:
+        return self._preview
+
+    def get_norm_coords(self, is_interpolated: bool = True) -> tuple[float, float]:
+        """
+        returns normalized (x, y) coords of landmark 9 of current result, or
+        None if it has no hand. is_interpolated is accepted for compatibility
+        with HandDetector and ignored.
+        """
+        if not self.is_realtime:
+            self._index += 1
+        result = self.result
+        if result is None:
+            return None
+        for lmarks in result.hand_landmarks:
+            return (lmarks[9].x, lmarks[9].y)
+
+    def close(self):
+        pass
+
+    def _get_position(self) -> tuple[int, int]:
+        """
+        returns (index, loop) of current result in recording, where loop is
+        number of times recording has restarted. index is -1 if replay hasn't
+        started.
+        """
+        num_results = len(self.timestamps)
+        if self.is_realtime:
+            if self._start_time is None:
+                return -1, 0
+            elapsed = time.perf_counter() - self._start_time
+            loop = 0
+            if self.is_looped:
+                loop, elapsed = divmod(elapsed, self._get_duration())
+            return int(np.searchsorted(self.timestamps, elapsed, side="right")) - 1, int(loop)
+        if self._index < 0:
+            return -1, 0
+        if self.is_looped:
+            loop, index = divmod(self._index, num_results)
+            return index, loop
+        return min(self._index, num_results - 1), 0
+
+    def _get_duration(self) -> float:
+        #time of last result plus one result interval, so loops don't overlap
+        if len(self.timestamps) < 2:
+            return max(self.timestamps[-1], 1/constants.FRAMERATE)
+        return self.timestamps[-1] + (self.timestamps[-1] - self.timestamps[0])/(len(self.timestamps) - 1)
+
+
+class ReplayCam(object):
+    """
+    Stand-in for HandCam used with ReplayHandDetector, so games can be run
+    without a webcam.
+
+    Constructor Parameters:
+
+    hand_detector: ReplayHandDetector
+        detector whose blank image sets the aspect ratio
+    """
+    def __init__(self, hand_detector: ReplayHandDetector):
+        self.hand_detector = hand_detector
+        self.shape = hand_detector.image.shape
+        self.dtype = hand_detector.image.dtype
+        self.fps = 0
+        self.aspect_ratio = self.shape[1]/self.shape[0]
+        self.dropped_frames = 0
+
+    def start(self):
+        pass
+
+    def stop_stream(self):
+        pass
@@ -0,0 +1,65 @@
+"""
+This module contains lightweight stand-ins for MediaPipe's hand landmark
+results, used where results are replayed or passed between processes without
+importing MediaPipe.
+"""
+
+import numpy as np
+
+#number of landmarks in each hand
+NUM_LANDMARKS = 21
+
+
+class Landmark(object):
+    """
+    normalized landmark with the x, y and z attributes of MediaPipe's
+    NormalizedLandmark
+    """
+    __slots__ = ("x", "y", "z")
+    def __init__(self, x: float, y: float, z: float):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class LandmarkResult(object):
+    """
+    hand landmark result with the hand_landmarks attribute of MediaPipe's
+    HandLandmarkerResult
+
+    Constructor Parameters:
+
+    hand_landmarks: list[list[Landmark]]
+        list of landmarks for each detected hand
+    """
+    def __init__(self, hand_landmarks: list[list[Landmark]]):
+        self.hand_landmarks = hand_landmarks
+
+
+def result_to_array(result) -> np.ndarray:
+    """
+    returns (21, 3) float32 array of x, y, z of each landmark of first hand
+    in result. If result has no hands, array is filled with NaN.
+
+    parameters:
+
+    result: HandLandmarkerResult | LandmarkResult
+        result to be converted
+    """
+    array = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+    for lmarks in result.hand_landmarks:
+        for index, lmark in enumerate(lmarks):
+            array[index] = (lmark.x, lmark.y, lmark.z)
+        break
+    return array
+
+
+def array_to_result(array: np.ndarray) -> LandmarkResult:
+    """
+    returns LandmarkResult from (21, 3) array made by result_to_array(). If
+    array is NaN, result has no hands.
+    """
+    if np.isnan(array[0, 0]):
+        return LandmarkResult([])
+    lmarks = [Landmark(float(x), float(y), float(z)) for x, y, z in array]
+    return LandmarkResult([lmarks])
@@ -0,0 +1,187 @@
+"""
+This module contains the LatencyTracer class which measures how long each
+webcam frame takes to get from capture to the screen.
+"""
+
+from collections import OrderedDict
+import json
+from threading import Lock
+import time
+
+from utils import constants
+
+
+class LatencyHistogram(object):
+    """
+    Fixed-bin histogram of latencies in milliseconds. Latencies larger than
+    the last bin are counted in the last bin.
+
+    Constructor Parameters:
+
+    bin_ms: float
+        width of each bin in milliseconds
+
+    max_ms: float
+        upper edge of histogram in milliseconds
+    """
+    def __init__(self, bin_ms: float, max_ms: float):
+        self.bin_ms = bin_ms
+        self.counts = [0]*int(max_ms/bin_ms)
+        self.count = 0
+        self.total_ms = 0
+        self.max_ms = 0
+
+    @property
+    def mean_ms(self):
+        return self.total_ms/self.count if self.count else 0
+
+    def add(self, latency_ms: float):
+        index = min(int(latency_ms/self.bin_ms), len(self.counts) - 1)
+        self.counts[max(index, 0)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def get_percentile(self, percentile: float) -> float:
+        """
+        returns upper edge of bin that contains percentile (0-100), or 0 if
+        histogram is empty
+        """
+        if not self.count:
+            return 0
+        target = self.count*percentile/100
+        total = 0
+        for index, count in enumerate(self.counts):
+            total += count
+            if total >= target and count:
+                return (index + 1)*self.bin_ms
+        return len(self.counts)*self.bin_ms
+
+
+class LatencyTracer(object):
+    """
+    Records timestamps of each frame as it passes through the game:
+
+    capture: HandCam reads frame from webcam
+    detection: HandDetector result callback for frame
+    position: PositionManager.update uses result of frame
+    display: pygame.display.update() returns after frame's result is drawn
+
+    For each stage, the time since the previous stage of the same frame is
+    added to a histogram, and capture to display time is added to the total
+    histogram. If is_trace_enabled is True, stages are also kept as Chrome
+    trace events that can be opened in chrome://tracing or Perfetto.
+
+    All times are time.perf_counter() times. Methods are thread-safe.
+    """
+    STAGES = ("capture", "detection", "position", "display")
+    TOTAL = "total"
+    #trace thread ids so each stage gets its own row
+    _TRACE_TIDS = {"detection": 1, "position": 2, "display": 3}
+    def __init__(self, is_trace_enabled: bool = False):
+        self.is_trace_enabled = is_trace_enabled
+        self.histograms = {stage: self._new_histogram() for stage in LatencyTracer.STAGES[1:]}
+        self.histograms[LatencyTracer.TOTAL] = self._new_histogram()
+        self.trace_events: list[dict] = []
+        self._start_time = time.perf_counter()
+        #frame_id: {stage: time} for most recent frames
+        self._frames: OrderedDict[int, dict[str, float]] = OrderedDict()
+        self._lock = Lock()
+
+    def begin_frame(self, frame_id: int, capture_time: float):
+        """
+        starts tracing frame with frame_id, captured at capture_time
+        """
+        with self._lock:
+            self._frames[frame_id] = {"capture": capture_time}
+            while len(self._frames) > constants.LATENCY_TRACE_MAX_FRAMES:
+                self._frames.popitem(last=False)
+
+    def mark(self, frame_id: int, stage: str, stage_time: float = None):
+        """
+        records time that frame with frame_id reached stage. Only the first
+        time a frame reaches each stage is recorded.
+
+        parameters:
+
+        frame_id: int
+            id given to begin_frame(). Ignored if None or no longer traced.
+
+        stage: str
+            one of LatencyTracer.STAGES, other than "capture"
+
+        stage_time: float | None
+            time.perf_counter() time. If None, current time is used.
+        """
+        if stage_time is None:
+            stage_time = time.perf_counter()
+        with self._lock:
+            stages = self._frames.get(frame_id)
+            if stages is None or self._has_reached(stages, stage):
+                return
+            prev_stage = self._get_prev_stage(stages, stage)
+            if prev_stage is None:
+                return
+            stages[stage] = stage_time
+            prev_time = stages[prev_stage]
+            self.histograms[stage].add((stage_time - prev_time)*1000)
+            if stage == LatencyTracer.STAGES[-1]:
+                self.histograms[LatencyTracer.TOTAL].add((stage_time - stages["capture"])*1000)
+            if self.is_trace_enabled and len(self.trace_events) < constants.LATENCY_TRACE_MAX_EVENTS:
+                self.trace_events.append(
+                    self._get_trace_event(frame_id, prev_stage, stage, prev_time, stage_time))
+
+    def get_report(self) -> str:
+        """
+        returns text report of count, mean, percentiles and max of each
+        histogram.
+        """
+        lines = [f"{'stage':<12}{'count':>8}{'mean':>8}{'p50':>8}{'p90':>8}{'p99':>8}{'max':>8}  (ms)"]
+        for stage, histogram in self.histograms.items():
+            lines.append(f"{stage:<12}{histogram.count:>8}{histogram.mean_ms:>8.1f}"
+                         f"{histogram.get_percentile(50):>8.0f}"
+                         f"{histogram.get_percentile(90):>8.0f}"
+                         f"{histogram.get_percentile(99):>8.0f}"
+                         f"{histogram.max_ms:>8.1f}")
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path: str):
+        """
+        writes trace events to path in Chrome trace event JSON format
+        """
+        with self._lock:
+            events = list(self.trace_events)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": 0, "tid": tid, "args": {"name": stage}}
+                    for stage, tid in LatencyTracer._TRACE_TIDS.items()]
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, trace_file)
+
+    def _has_reached(self, stages: dict[str, float], stage: str) -> bool:
+        """
+        returns True if frame has reached stage or any stage after it
+        """
+        index = LatencyTracer.STAGES.index(stage)
+        return any(later_stage in stages for later_stage in LatencyTracer.STAGES[index:])
+
+    def _get_prev_stage(self, stages: dict[str, float], stage: str) -> str:
+        """
+        returns latest stage before stage that frame has reached
+        """
+        index = LatencyTracer.STAGES.index(stage)
+        for prev_stage in reversed(LatencyTracer.STAGES[:index]):
+            if prev_stage in stages:
+                return prev_stage
+        return None
+
+    def _get_trace_event(self, frame_id, prev_stage, stage, prev_time, stage_time) -> dict:
+        #trace event times are in microseconds
+        return {"name": f"{prev_stage} to {stage}",
+                "ph": "X",
+                "pid": 0,
+                "tid": LatencyTracer._TRACE_TIDS[stage],
+                "ts": (prev_time - self._start_time)*1e6,
+                "dur": (stage_time - prev_time)*1e6,
+                "args": {"frame_id": frame_id}}
+
+    def _new_histogram(self) -> LatencyHistogram:
+        return LatencyHistogram(constants.LATENCY_HIST_BIN_MS, constants.LATENCY_HIST_MAX_MS)
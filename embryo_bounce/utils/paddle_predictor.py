@@ -0,0 +1,199 @@
+"""
+This module contains predictors that extrapolate the hand position forward in
+time to compensate for the latency between webcam capture and rendering.
+
+Classes:
+
+PaddlePredictor: abstract base class of all predictors
+
+PassthroughPredictor: returns latest measurement without prediction
+
+AlphaBetaPredictor: alpha-beta filter
+
+KalmanPredictor: constant-velocity Kalman filter
+"""
+
+from abc import ABC, abstractmethod
+
+from utils import constants
+
+
+class PaddlePredictor(ABC):
+    """
+    Receives hand coordinate measurements with the time the measured frame
+    was captured, and predicts the coordinate at a later time.
+
+    Measurement times and prediction times must use the same clock
+    (time.perf_counter()).
+    """
+    def __init__(self):
+        self.max_lead_s = constants.PREDICTOR_MAX_LEAD_S
+        self._value: float = None
+        self._time: float = None
+
+    @property
+    def has_value(self):
+        return self._value is not None
+
+    @abstractmethod
+    def update(self, value: float, sample_time: float):
+        """
+        updates predictor with measured value from frame captured at
+        sample_time.
+        """
+        pass
+
+    def predict(self, predict_time: float) -> float:
+        """
+        returns predicted value at predict_time, or None if predictor hasn't
+        received a measurement. Predictions are never extrapolated more than
+        max_lead_s past the last measurement.
+        """
+        if self._value is None:
+            return None
+        lead = min(max(predict_time - self._time, 0), self.max_lead_s)
+        return self._value + self._get_velocity()*lead
+
+    def reset(self):
+        """
+        resets predictor, e.g. when hand is lost
+        """
+        self._value = None
+        self._time = None
+
+    def _get_velocity(self) -> float:
+        return 0
+
+
+class PassthroughPredictor(PaddlePredictor):
+    """
+    Returns latest measurement. Equivalent to not using a predictor.
+    """
+    def update(self, value: float, sample_time: float):
+        self._value = value
+        self._time = sample_time
+
+
+class AlphaBetaPredictor(PaddlePredictor):
+    """
+    Alpha-beta filter that tracks position and velocity. alpha is the
+    fraction of the position error that is corrected on each measurement and
+    beta is the equivalent for velocity. Lower values smooth more jitter but
+    respond more slowly.
+
+    Constructor Parameters:
+
+    alpha: float
+        position correction gain, between 0 and 1
+
+    beta: float
+        velocity correction gain, between 0 and 2
+    """
+    def __init__(self,
+                 alpha: float = constants.ALPHA_BETA_ALPHA,
+                 beta: float = constants.ALPHA_BETA_BETA):
+        super().__init__()
+        self.alpha = alpha
+        self.beta = beta
+        self._velocity = 0
+
+    def update(self, value: float, sample_time: float):
+        if self._value is None:
+            self._value = value
+            self._time = sample_time
+            self._velocity = 0
+            return
+        dt = sample_time - self._time
+        if dt <= 0:
+            return
+        predicted = self._value + self._velocity*dt
+        residual = value - predicted
+        self._value = predicted + self.alpha*residual
+        self._velocity += self.beta*residual/dt
+        self._time = sample_time
+
+    def reset(self):
+        super().reset()
+        self._velocity = 0
+
+    def _get_velocity(self) -> float:
+        return self._velocity
+
+
+class KalmanPredictor(PaddlePredictor):
+    """
+    Constant-velocity Kalman filter. State is (position, velocity), and
+    unmodeled acceleration is treated as white noise.
+
+    Constructor Parameters:
+
+    process_noise: float
+        variance of acceleration noise. Higher values follow fast hand
+        movements more closely.
+
+    measurement_noise: float
+        variance of measured position. Higher values smooth more jitter.
+    """
+    def __init__(self,
+                 process_noise: float = constants.KALMAN_PROCESS_NOISE,
+                 measurement_noise: float = constants.KALMAN_MEASUREMENT_NOISE):
+        super().__init__()
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self._velocity = 0
+        self._cov = None
+
+    def update(self, value: float, sample_time: float):
+        if self._value is None:
+            self._value = value
+            self._time = sample_time
+            self._velocity = 0
+            #velocity is unknown at first, so its variance starts large
+            self._cov = [[self.measurement_noise, 0], [0, 1]]
+            return
+        dt = sample_time - self._time
+        if dt <= 0:
+            return
+        #predict step with transition matrix [[1, dt], [0, 1]]
+        (p00, p01), (p10, p11) = self._cov
+        q = self.process_noise
+        p00 = p00 + dt*(p10 + p01) + dt*dt*p11 + q*dt**4/4
+        p01 = p01 + dt*p11 + q*dt**3/2
+        p10 = p10 + dt*p11 + q*dt**3/2
+        p11 = p11 + q*dt*dt
+        position = self._value + self._velocity*dt
+        #update step, only position is measured
+        innovation = value - position
+        innovation_cov = p00 + self.measurement_noise
+        gain_0 = p00/innovation_cov
+        gain_1 = p10/innovation_cov
+        self._value = position + gain_0*innovation
+        self._velocity += gain_1*innovation
+        self._cov = [[(1 - gain_0)*p00, (1 - gain_0)*p01],
+                     [p10 - gain_1*p00, p11 - gain_1*p01]]
+        self._time = sample_time
+
+    def reset(self):
+        super().reset()
+        self._velocity = 0
+        self._cov = None
+
+    def _get_velocity(self) -> float:
+        return self._velocity
+
+
+PREDICTORS = {"none": PassthroughPredictor,
+              "alpha_beta": AlphaBetaPredictor,
+              "kalman": KalmanPredictor}
+
+
+def create_predictor(name: str) -> PaddlePredictor:
+    """
+    returns new predictor from its name in PREDICTORS, or None if name is None
+    """
+    if name is None:
+        return None
+    try:
+        return PREDICTORS[name]()
+    except KeyError:
+        raise ValueError(f"unknown paddle predictor {name}. Options are {list(PREDICTORS)}")
@@ -0,0 +1,30 @@
+"""
+This module contains functions that make the camera preview shown in the
+top left of the game from webcam images.
+"""
+
+import cv2
+import numpy as np
+
+from utils import constants
+
+
+def get_preview_size(shape: tuple) -> tuple[int, int]:
+    """
+    returns (width, height) of preview of image with shape. Height is
+    constants.CAM_H and width is determined by aspect ratio of image.
+    """
+    aspect_ratio = shape[1]/shape[0]
+    return (int(constants.CAM_H*aspect_ratio), constants.CAM_H)
+
+
+def make_preview(image: np.ndarray) -> np.ndarray:
+    """
+    returns RGB webcam image resized to preview size and rotated to pygame
+    orientation, so it can be blitted with pygame.surfarray.blit_array()
+    """
+    #image is already RGB, converted once by FrameStream when captured
+    preview = cv2.resize(image, get_preview_size(image.shape))
+    #frame requires rotation to match pygame orientation. rot90 is a view, so
+    #it's only copied once, by whatever stores the preview.
+    return np.rot90(preview)
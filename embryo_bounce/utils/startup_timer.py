@@ -0,0 +1,73 @@
+"""
+This module contains the StartupTimer class which measures how long each
+step of starting the game takes, and startup_timer, the timer used by the
+game.
+"""
+
+from threading import Lock
+import time
+
+
+class StartupTimer(object):
+    """
+    Records wall-clock time of startup steps since the timer was created.
+    Methods are thread-safe, so steps done on background threads can be
+    marked too.
+
+    instance attributes:
+
+    self.start_time: float
+        time.perf_counter() time that timer was created
+
+    self.marks: list[tuple[str, float]]
+        (step, time.perf_counter() time) of each step in order marked
+    """
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.marks: list[tuple[str, float]] = []
+        self._lock = Lock()
+
+    def mark(self, step: str):
+        """
+        records that step has finished
+        """
+        with self._lock:
+            self.marks.append((step, time.perf_counter()))
+
+    def get_elapsed_ms(self, step: str) -> float:
+        """
+        returns milliseconds from start to step, or None if step hasn't been
+        marked
+        """
+        with self._lock:
+            for marked_step, mark_time in self.marks:
+                if marked_step == step:
+                    return (mark_time - self.start_time)*1000
+        return None
+
+    def get_report(self, budgets_ms: dict[str, float] = None) -> str:
+        """
+        returns text report of time of each step since start and since
+        previous step. Steps in budgets_ms are flagged if they took longer
+        than their budget since start.
+        """
+        budgets_ms = budgets_ms or {}
+        lines = [f"{'step':<24}{'total':>8}{'step':>8}{'budget':>8}  (ms)"]
+        prev_time = self.start_time
+        with self._lock:
+            marks = sorted(self.marks, key=lambda mark: mark[1])
+        for step, mark_time in marks:
+            total_ms = (mark_time - self.start_time)*1000
+            line = f"{step:<24}{total_ms:>8.0f}{(mark_time - prev_time)*1000:>8.0f}"
+            if step in budgets_ms:
+                line += f"{budgets_ms[step]:>8.0f}"
+                if total_ms > budgets_ms[step]:
+                    line += "  over budget"
+            lines.append(line)
+            prev_time = mark_time
+        return "\n".join(lines)
+
+
+#main.py imports this module before anything else, so game startup is timed
+#from launch
+startup_timer = StartupTimer()
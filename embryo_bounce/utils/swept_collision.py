@@ -0,0 +1,251 @@
+"""
+functions for swept (continuous) collision detection of a moving circle
+against axis-aligned rectangles, so fast objects can't pass through thin ones
+between steps
+"""
+
+import math
+
+import numpy as np
+
+#distance in pixels within which a circle is considered touching a rect
+CONTACT_EPSILON = 1e-6
+
+
+def get_time_of_impact(x: float, y: float,
+                       dx: float, dy: float,
+                       radius: float,
+                       rect: tuple[float, float, float, float]) -> tuple[float, float, float]:
+    """
+    returns (t, normal_x, normal_y) of first contact of circle moving from
+    (x, y) to (x + dx, y + dy) with rect, where t is the fraction of the move
+    in [0, 1] and normal is the unit surface normal pointing at the circle.
+    Returns None if circle doesn't hit rect during move.
+
+    The circle hits rect when its center enters rect expanded by radius with
+    rounded corners (their Minkowski sum), which is the union of rect grown
+    by radius horizontally, rect grown by radius vertically and a circle of
+    radius at each corner. Since the center starts outside all of them, the
+    first entry into any of them is the time of impact.
+
+    If circle already touches or overlaps rect, it's a hit at t = 0 if it's
+    moving further in, and no hit if it's moving out.
+
+    Parameters:
+
+    x, y: float
+        center of circle at start of move
+
+    dx, dy: float
+        displacement of circle over move
+
+    radius: float
+        radius of circle
+
+    rect: tuple[float, float, float, float]
+        (left, top, right, bottom) of rect
+    """
+    left, top, right, bottom = rect
+    #broad phase: circle can't touch rect if box it sweeps doesn't overlap it
+    reach = radius + CONTACT_EPSILON
+    if (min(x, x + dx) - reach > right or max(x, x + dx) + reach < left
+            or min(y, y + dy) - reach > bottom or max(y, y + dy) + reach < top):
+        return None
+    #closest point in rect to center
+    closest_x = min(max(x, left), right)
+    closest_y = min(max(y, top), bottom)
+    offset_x = x - closest_x
+    offset_y = y - closest_y
+    distance = math.hypot(offset_x, offset_y)
+    if distance <= radius + CONTACT_EPSILON:
+        normal_x, normal_y = _get_contact_normal(x, y, rect, offset_x, offset_y, distance)
+        if normal_x*dx + normal_y*dy < 0:
+            return (0.0, normal_x, normal_y)
+        return None
+    hits = [_get_box_entry(x, y, dx, dy, (left - radius, top, right + radius, bottom)),
+            _get_box_entry(x, y, dx, dy, (left, top - radius, right, bottom + radius))]
+    for corner in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        hits.append(_get_circle_entry(x, y, dx, dy, corner, radius))
+    hits = [hit for hit in hits if hit is not None]
+    if not hits:
+        return None
+    return min(hits)
+
+
+def _get_contact_normal(x: float, y: float,
+                        rect: tuple[float, float, float, float],
+                        offset_x: float, offset_y: float,
+                        distance: float) -> tuple[float, float]:
+    """
+    returns normal of rect at point closest to (x, y). If (x, y) is inside
+    rect, it's the normal of the nearest side.
+    """
+    if distance > 0:
+        return (offset_x/distance, offset_y/distance)
+    left, top, right, bottom = rect
+    sides = [(x - left, -1.0, 0.0), (right - x, 1.0, 0.0),
+             (y - top, 0.0, -1.0), (bottom - y, 0.0, 1.0)]
+    _, normal_x, normal_y = min(sides)
+    return (normal_x, normal_y)
+
+
+def _get_box_entry(x: float, y: float,
+                   dx: float, dy: float,
+                   box: tuple[float, float, float, float]) -> tuple[float, float, float]:
+    """
+    returns (t, normal_x, normal_y) of where segment from (x, y) enters box,
+    or None if it doesn't in t in [0, 1]. (x, y) must be outside box.
+    """
+    left, top, right, bottom = box
+    t_enter = -math.inf
+    t_exit = math.inf
+    normal = (0.0, 0.0)
+    for start, delta, low, high, axis_normal in ((x, dx, left, right, (1.0, 0.0)),
+                                                 (y, dy, top, bottom, (0.0, 1.0))):
+        if delta == 0:
+            if not low <= start <= high:
+                return None
+            continue
+        t_low = (low - start)/delta
+        t_high = (high - start)/delta
+        #normal of low side points at negative side
+        sign = -1.0
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+            sign = 1.0
+        if t_low > t_enter:
+            t_enter = t_low
+            normal = (sign*axis_normal[0], sign*axis_normal[1])
+        t_exit = min(t_exit, t_high)
+    if t_enter > t_exit or not 0 <= t_enter <= 1:
+        return None
+    return (t_enter, normal[0], normal[1])
+
+
+def _get_circle_entry(x: float, y: float,
+                      dx: float, dy: float,
+                      center: tuple[float, float],
+                      radius: float) -> tuple[float, float, float]:
+    """
+    returns (t, normal_x, normal_y) of where segment from (x, y) enters
+    circle, or None if it doesn't in t in [0, 1]. (x, y) must be outside
+    circle.
+    """
+    offset_x = x - center[0]
+    offset_y = y - center[1]
+    #solves |offset + t*delta| = radius for t
+    a = dx*dx + dy*dy
+    b = 2*(offset_x*dx + offset_y*dy)
+    c = offset_x*offset_x + offset_y*offset_y - radius*radius
+    discriminant = b*b - 4*a*c
+    if a == 0 or discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant))/(2*a)
+    if not 0 <= t <= 1:
+        return None
+    return (t, (offset_x + dx*t)/radius, (offset_y + dy*t)/radius)
+
+
+def get_times_of_impact(x: np.ndarray, y: np.ndarray,
+                        dx: np.ndarray, dy: np.ndarray,
+                        radius: np.ndarray,
+                        rect: tuple[float, float, float, float]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    get_time_of_impact() for arrays of circles at once. Returns arrays
+    (t, normal_x, normal_y), where t is inf for circles that don't hit rect.
+    """
+    left, top, right, bottom = rect
+    offset_x = x - np.clip(x, left, right)
+    offset_y = y - np.clip(y, top, bottom)
+    distance = np.hypot(offset_x, offset_y)
+    touching = distance <= radius + CONTACT_EPSILON
+    #circles that aren't touching are swept against each part of rounded rect
+    t, normal_x, normal_y = _get_box_entries(x, y, dx, dy, (left - radius, top, right + radius, bottom))
+    parts = [_get_box_entries(x, y, dx, dy, (left, top - radius, right, bottom + radius))]
+    for corner in ((left, top), (right, top), (left, bottom), (right, bottom)):
+        parts.append(_get_circle_entries(x, y, dx, dy, corner, radius))
+    for part_t, part_normal_x, part_normal_y in parts:
+        is_first = part_t < t
+        t = np.where(is_first, part_t, t)
+        normal_x = np.where(is_first, part_normal_x, normal_x)
+        normal_y = np.where(is_first, part_normal_y, normal_y)
+    if touching.any():
+        contact_x, contact_y = _get_contact_normals(x, y, rect, offset_x, offset_y, distance)
+        is_moving_in = contact_x*dx + contact_y*dy < 0
+        t = np.where(touching, np.where(is_moving_in, 0.0, np.inf), t)
+        normal_x = np.where(touching, contact_x, normal_x)
+        normal_y = np.where(touching, contact_y, normal_y)
+    return (t, normal_x, normal_y)
+
+
+def _get_contact_normals(x: np.ndarray, y: np.ndarray,
+                         rect: tuple[float, float, float, float],
+                         offset_x: np.ndarray, offset_y: np.ndarray,
+                         distance: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    _get_contact_normal() for arrays of points
+    """
+    left, top, right, bottom = rect
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normal_x = offset_x/distance
+        normal_y = offset_y/distance
+    #points inside rect use normal of nearest side
+    inside = distance == 0
+    side = np.argmin([x - left, right - x, y - top, bottom - y], axis=0)
+    normal_x = np.where(inside, np.array([-1.0, 1.0, 0.0, 0.0])[side], normal_x)
+    normal_y = np.where(inside, np.array([0.0, 0.0, -1.0, 1.0])[side], normal_y)
+    return (normal_x, normal_y)
+
+
+def _get_box_entries(x: np.ndarray, y: np.ndarray,
+                     dx: np.ndarray, dy: np.ndarray,
+                     box: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    _get_box_entry() for arrays of segments. Sides of box can be arrays.
+    """
+    left, top, right, bottom = box
+    shape = np.shape(x)
+    t_enter = np.full(shape, -np.inf)
+    t_exit = np.full(shape, np.inf)
+    normal_x = np.zeros(shape)
+    normal_y = np.zeros(shape)
+    is_missed = np.zeros(shape, dtype=bool)
+    for start, delta, low, high, is_x in ((x, dx, left, right, True),
+                                          (y, dy, top, bottom, False)):
+        is_still = delta == 0
+        is_missed |= is_still & ((start < low) | (start > high))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_low = np.where(is_still, -np.inf, (low - start)/delta)
+            t_high = np.where(is_still, np.inf, (high - start)/delta)
+        #normal of low side points at negative side
+        sign = np.where(t_low > t_high, 1.0, -1.0)
+        t_near = np.minimum(t_low, t_high)
+        is_later = t_near > t_enter
+        t_enter = np.where(is_later, t_near, t_enter)
+        normal_x = np.where(is_later, sign if is_x else 0.0, normal_x)
+        normal_y = np.where(is_later, 0.0 if is_x else sign, normal_y)
+        t_exit = np.minimum(t_exit, np.maximum(t_low, t_high))
+    is_hit = ~is_missed & (t_enter <= t_exit) & (0 <= t_enter) & (t_enter <= 1)
+    return (np.where(is_hit, t_enter, np.inf), normal_x, normal_y)
+
+
+def _get_circle_entries(x: np.ndarray, y: np.ndarray,
+                        dx: np.ndarray, dy: np.ndarray,
+                        center: tuple[float, float],
+                        radius: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    _get_circle_entry() for arrays of segments
+    """
+    offset_x = x - center[0]
+    offset_y = y - center[1]
+    a = dx*dx + dy*dy
+    b = 2*(offset_x*dx + offset_y*dy)
+    c = offset_x*offset_x + offset_y*offset_y - radius*radius
+    discriminant = b*b - 4*a*c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (-b - np.sqrt(discriminant))/(2*a)
+    is_hit = (a > 0) & (discriminant >= 0) & (0 <= t) & (t <= 1)
+    t = np.where(is_hit, t, 0.0)
+    normal_x = (offset_x + dx*t)/radius
+    normal_y = (offset_y + dy*t)/radius
+    return (np.where(is_hit, t, np.inf), normal_x, normal_y)